@@ -1,5 +1,7 @@
 # main.py
 
+import argparse
+import os
 import sys
 import time
 
@@ -15,27 +17,53 @@ except ImportError:
     # print("pip install -r requirements.txt")
     sys.exit(1)
 
-def initialize_exchanges():
+from market_cache import MarketCache, DEFAULT_CACHE_DIR, DEFAULT_TTL_S, MISS, STALE
+from poller import TickerPoller
+from scanner import CrossExchangeScanner, load_config
+from triangular import MarketGraph
+
+def report_refresh_error(exchange_id, e):
+    print(f"Warning: Background market refresh failed for {exchange_id}: {e}")
+
+def initialize_exchanges(exchange_ids, cache=None, offline=False):
     """
-    Initializes and returns public instances of Binance and Kraken exchanges.
+    Initializes and returns public instances of the configured exchanges,
+    keyed by their ccxt id. With a MarketCache, markets are warmed from disk
+    and only fetched over the network when missing or stale.
     """
-    # Requirement 3: Connect to Binance and Kraken using PUBLIC APIs only.
+    # Requirement 3: Connect using PUBLIC APIs only.
     # No API keys are provided, so ccxt will use the public endpoints.
     try:
-        binance = ccxt.binance({
-            'options': {
-                'defaultType': 'spot',
-            },
-        })
-        kraken = ccxt.kraken()
+        exchanges = {}
+        for exchange_id in exchange_ids:
+            exchange_class = getattr(ccxt, exchange_id)
+            exchanges[exchange_id] = exchange_class({
+                'options': {
+                    'defaultType': 'spot',
+                },
+            })
         
-        # Optional: Load markets to verify connection, though fetch_ticker will do this implicitly.
-        binance.load_markets()
-        kraken.load_markets()
+        # Warm markets from the local cache first; only cache misses block on the network.
+        for exchange_id, exchange in exchanges.items():
+            status = cache.warm(exchange_id, exchange, offline) if cache else MISS
+            if status == MISS:
+                if offline:
+                    print(f"No cached markets for {exchange_id} and --offline was given.")
+                    sys.exit(1)
+                exchange.load_markets()
+                if cache:
+                    cache.store(exchange_id, exchange)
+            elif status == STALE and not offline:
+                cache.refresh_in_background(exchange_id, exchange, on_error=report_refresh_error)
+            print(f"Markets for {exchange_id}: {len(exchange.markets)} ({status if cache else 'network'}).")
         
-        print("Successfully connected to Binance and Kraken public APIs.")
-        return binance, kraken
+        names = ", ".join(exchange.name for exchange in exchanges.values())
+        print(f"Successfully connected to {names} public APIs.")
+        return exchanges
         
+    except AttributeError as e:
+        print(f"Unknown exchange in configuration: {e}")
+        sys.exit(1)
     except ccxt.NetworkError as e:
         print(f"Network Error during initialization: {e}")
         print("Please check your internet connection.")
@@ -48,84 +76,118 @@ def initialize_exchanges():
         print(f"An unexpected error occurred during initialization: {e}")
         sys.exit(1)
 
-def fetch_prices(binance, kraken, symbol='BTC/USDT'):
+def report_errors(errors):
     """
-    Fetches the last traded price for a given symbol from two exchanges.
+    Prints per-exchange polling failures without stopping the loop.
     """
-    try:
-        # Requirement 4 (part 1): Fetch BTC/USDT price from both.
-        binance_ticker = binance.fetch_ticker(symbol)
-        kraken_ticker = kraken.fetch_ticker(symbol)
+    for exchange_id, e in errors.items():
+        if isinstance(e, ccxt.NetworkError):
+            print(f"Network Error while fetching prices from {exchange_id}: {e}")
+        elif isinstance(e, ccxt.ExchangeError):
+            print(f"Exchange Error while fetching prices from {exchange_id}: {e}")
+        else:
+            print(f"An unexpected error occurred while fetching prices from {exchange_id}: {e}")
 
-        binance_price = binance_ticker.get('last')
-        kraken_price = kraken_ticker.get('last')
+def report_opportunity(opportunity):
+    print("\n" + "!" * 25)
+    print(f"  Arbitrage Opportunity Found! Spread: {opportunity.spread_pct:.3f}%")
+    print(f"  -> BUY {opportunity.symbol} on {opportunity.buy_exchange} at ${opportunity.buy_price:,.2f}")
+    print(f"  -> SELL {opportunity.symbol} on {opportunity.sell_exchange} at ${opportunity.sell_price:,.2f}")
+    print("!" * 25 + "\n")
 
-        if binance_price is None or kraken_price is None:
-            print(f"Warning: Could not fetch 'last' price for {symbol} from one or both exchanges.")
-            return None, None
+def report_cycle(cycle):
+    print("\n" + "~" * 25)
+    print(f"  Cyclic Arbitrage Found! Net: {cycle.profit_pct:.3f}%")
+    for leg in cycle.legs:
+        venue = leg.exchange or "transfer"
+        print(f"  -> {leg.action.upper():<8} {leg.symbol} on {venue} (rate {leg.rate:.8g})")
+    print("~" * 25 + "\n")
 
-        return binance_price, kraken_price
-    
-    except ccxt.NetworkError as e:
-        print(f"Network Error while fetching prices: {e}")
-    except ccxt.ExchangeError as e:
-        print(f"Exchange Error while fetching prices: {e}")
-    except Exception as e:
-        print(f"An unexpected error occurred while fetching prices: {e}")
-        
-    return None, None
+def build_market_graph(exchanges, settings):
+    """
+    Builds the currency graph from every loaded market for cyclic arbitrage.
+    """
+    graph = MarketGraph()
+    for exchange_id, exchange in exchanges.items():
+        graph.add_markets(exchange_id, exchange.markets)
+    if settings.get('cross_venue'):
+        graph.add_transfer_edges(settings.get('transfer_cost_pct', 0.0))
+    print(f"Market graph: {len(graph.nodes)} currencies, {len(graph.src)} edges.")
+    return graph
 
-def main():
+def main(config_path=None, offline=False):
     """
     Main function to run the arbitrage bot loop.
     """
-    binance, kraken = initialize_exchanges()
-    
-    SYMBOL = 'BTC/USDT'
-    ARBITRAGE_THRESHOLD_PERCENT = 0.5 # Requirement 4: 0.5% spread
+    config = load_config(config_path) if config_path else load_config()
+    cache_settings = config.get('market_cache', {})
+    cache = None
+    if cache_settings.get('enabled', True):
+        cache = MarketCache(
+            os.path.expanduser(cache_settings.get('path', DEFAULT_CACHE_DIR)),
+            cache_settings.get('ttl_s', DEFAULT_TTL_S),
+            library_version=getattr(ccxt, '__version__', None),
+        )
+    exchanges = initialize_exchanges(config['exchanges'], cache, offline)
+    scanner = CrossExchangeScanner.from_config(config)
+    triangular = config.get('triangular', {})
+    graph = build_market_graph(exchanges, triangular) if triangular.get('enabled') else None
+    # The graph needs every market, so poll everything when it is enabled
+    poller = TickerPoller(exchanges, None if graph else scanner.pairs)
+    pairs = set(scanner.pairs)
+    poll_interval = config.get('poll_interval_s', 5)
 
-    print(f"\nStarting arbitrage bot for {SYMBOL}...")
-    print(f"Looking for opportunities with a spread greater than {ARBITRAGE_THRESHOLD_PERCENT}%.")
+    print(f"\nStarting arbitrage bot for {', '.join(scanner.pairs)} across {len(exchanges)} exchanges...")
+    print(f"Looking for opportunities with a spread greater than {scanner.min_spread_pct}%.")
     print("-" * 60)
 
     # Requirement 5: Use a simple 'while True' loop.
     while True:
-        binance_price, kraken_price = fetch_prices(binance, kraken, SYMBOL)
+        # One bulk fetch_tickers per exchange, all exchanges in parallel
+        result = poller.poll()
+        report_errors(result.errors)
 
-        if binance_price and kraken_price:
-            # Requirement 4 (part 2): Calculate spread.
-            higher_price = max(binance_price, kraken_price)
-            lower_price = min(binance_price, kraken_price)
-            
-            spread_percentage = ((higher_price - lower_price) / lower_price) * 100
+        if graph:
+            for quote in result.quotes:
+                graph.update_ticker(quote.exchange, quote.symbol, quote.bid, quote.ask)
+        # Check each symbol once, after the whole cycle's quotes are in
+        opportunities = scanner.update_many(quote for quote in result.quotes if quote.symbol in pairs)
 
-            # Get current timestamp for logging
-            timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        # Get current timestamp for logging
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
 
+        for symbol in scanner.pairs:
+            best = scanner.spread(symbol)
+            if best is None:
+                continue
+            buy_price, buy_ex, sell_price, sell_ex = best
+            spread_percentage = (sell_price - buy_price) / buy_price * 100
             print(
-                f"[{timestamp}] "
-                f"Binance: ${binance_price:,.2f} | "
-                f"Kraken: ${kraken_price:,.2f} | "
+                f"[{timestamp}] {symbol} | "
+                f"Best Ask: {buy_ex} ${buy_price:,.2f} | "
+                f"Best Bid: {sell_ex} ${sell_price:,.2f} | "
                 f"Spread: {spread_percentage:.3f}%"
             )
+        print(f"[{timestamp}] Cycle: {len(result.quotes)} quotes in {result.duration * 1000:.0f}ms")
 
-            # Requirement 4 (part 3): Check for arbitrage opportunity.
-            if spread_percentage > ARBITRAGE_THRESHOLD_PERCENT:
-                buy_exchange = "Binance" if binance_price < kraken_price else "Kraken"
-                sell_exchange = "Kraken" if binance_price < kraken_price else "Binance"
-                
-                print("\n" + "!" * 25)
-                print(f"  Arbitrage Opportunity Found! Spread: {spread_percentage:.3f}%")
-                print(f"  -> BUY {SYMBOL} on {buy_exchange} at ${lower_price:,.2f}")
-                print(f"  -> SELL {SYMBOL} on {sell_exchange} at ${higher_price:,.2f}")
-                print("!" * 25 + "\n")
+        # Requirement 4 (part 3): Check for arbitrage opportunity.
+        for opportunity in opportunities.values():
+            report_opportunity(opportunity)
+        if graph:
+            for cycle in graph.find_cycles(triangular.get('min_profit_pct', 0.0)):
+                report_cycle(cycle)
         
-        # Requirement 5: sleep for 5 seconds.
-        time.sleep(5)
+        # Requirement 5: sleep between cycles (5 seconds by default), net of the cycle time.
+        time.sleep(max(0.0, poll_interval - result.duration))
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=str, default=None, help="Path to config.json")
+    parser.add_argument("--offline", action="store_true", help="Start from cached market metadata only")
+    args = parser.parse_args()
+
     try:
-        main()
+        main(args.config, args.offline)
     except KeyboardInterrupt:
         print("\nBot stopped by user.")
         sys.exit(0)
\ No newline at end of file
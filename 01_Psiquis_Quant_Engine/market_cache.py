@@ -0,0 +1,115 @@
+# market_cache.py
+
+"""
+On-disk cache of exchange market and currency metadata.
+
+`load_markets()` is the slowest part of a restart and costs rate-limit
+budget on every rolling deploy. The cache stores each exchange's markets
+and currencies as JSON, stamped with a schema version, the ccxt version
+and the time it was saved. At startup an exchange is warmed from the cache
+immediately; stale entries are refreshed in a background thread, and in
+offline mode the cache is used as-is with no network at all.
+
+The Live Alpha scanner keeps its own asyncio flavour of this cache with
+the same file format, so both can share one cache directory.
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+
+CACHE_SCHEMA = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'psiquis', 'markets')
+DEFAULT_TTL_S = 6 * 3600
+
+# warm() outcomes
+MISS = 'miss'
+FRESH = 'fresh'
+STALE = 'stale'
+
+
+class MarketCache:
+    """
+    Per-exchange JSON files under `directory`, valid for `ttl` seconds.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL_S, library_version=None):
+        self.directory = directory
+        self.ttl = ttl
+        self.library_version = library_version
+
+    def _path(self, exchange_id):
+        return os.path.join(self.directory, f"{exchange_id}.json")
+
+    def load(self, exchange_id):
+        """
+        Returns (entry, is_fresh), or (None, False) when there is no usable
+        entry (missing, unreadable, or written by another schema/ccxt version).
+        """
+        try:
+            with open(self._path(exchange_id)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None, False
+        if entry.get('schema') != CACHE_SCHEMA or entry.get('exchange') != exchange_id:
+            return None, False
+        if self.library_version and entry.get('library_version') != self.library_version:
+            return None, False
+        return entry, time.time() - entry.get('saved_at', 0) < self.ttl
+
+    def store(self, exchange_id, exchange):
+        """Writes the exchange's loaded markets/currencies atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {
+            'schema': CACHE_SCHEMA,
+            'exchange': exchange_id,
+            'library_version': self.library_version,
+            'saved_at': time.time(),
+            'markets': exchange.markets,
+            'currencies': exchange.currencies,
+        }
+        path = self._path(exchange_id)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp, path)
+
+    def warm(self, exchange_id, exchange, offline=False):
+        """
+        Installs cached markets on `exchange` without touching the network.
+        Returns FRESH, STALE or MISS. In offline mode a stale entry counts
+        as fresh since it cannot be refreshed anyway.
+        """
+        entry, fresh = self.load(exchange_id)
+        if entry is None:
+            return MISS
+        exchange.set_markets(entry['markets'], entry.get('currencies'))
+        return FRESH if fresh or offline else STALE
+
+    def refresh(self, exchange_id, exchange):
+        """
+        Reloads markets over the network and rewrites the cache entry.
+
+        The markets are loaded on a separate instance of the same exchange
+        class, since pollers may be using `exchange` from other threads
+        meanwhile, and then installed on it in one set_markets() call, which
+        only rebinds its market tables.
+        """
+        loader = type(exchange)({'options': copy.deepcopy(exchange.options)})
+        loader.load_markets(reload=True)
+        self.store(exchange_id, loader)
+        exchange.set_markets(loader.markets, loader.currencies)
+
+    def refresh_in_background(self, exchange_id, exchange, on_error=None):
+        """Runs refresh() on a daemon thread; errors go to `on_error`."""
+        def worker():
+            try:
+                self.refresh(exchange_id, exchange)
+            except Exception as e:
+                if on_error:
+                    on_error(exchange_id, e)
+        thread = threading.Thread(target=worker, name=f"market-cache-{exchange_id}", daemon=True)
+        thread.start()
+        return thread
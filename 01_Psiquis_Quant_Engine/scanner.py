@@ -0,0 +1,199 @@
+# scanner.py
+
+"""
+Cross-exchange arbitrage scanner for N venues x M symbols.
+
+For every symbol the scanner keeps two ladders of venues, one ordered by
+bid (highest first) and one by ask (lowest first). A quote update only
+re-positions its own venue with a binary search, and the opportunity
+check reads the tops of both ladders, so nothing compares every venue
+pair on every tick.
+"""
+
+import json
+import os
+import time
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+
+Quote = namedtuple('Quote', ['exchange', 'symbol', 'bid', 'ask', 'timestamp'])
+
+Opportunity = namedtuple(
+    'Opportunity',
+    ['symbol', 'buy_exchange', 'buy_price', 'sell_exchange', 'sell_price', 'spread_pct', 'timestamp'],
+)
+
+
+def load_config(path=DEFAULT_CONFIG_PATH):
+    """
+    Loads the engine configuration (exchanges, pairs, min_spread_pct, ...).
+    """
+    with open(path) as f:
+        config = json.load(f)
+    for key in ('exchanges', 'pairs', 'min_spread_pct'):
+        if key not in config:
+            raise KeyError(f"Missing required key '{key}' in {path}")
+    return config
+
+
+class _Ladder:
+    """
+    Venues for one symbol and side, kept sorted so index 0 is the best.
+    Keys are stored negated for bids so both sides sort ascending.
+    """
+
+    __slots__ = ('descending', 'entries', 'keys')
+
+    def __init__(self, descending):
+        self.descending = descending
+        self.entries = []  # Sorted list of (key, exchange)
+        self.keys = {}     # exchange -> current key
+
+    def update(self, exchange, price):
+        old = self.keys.pop(exchange, None)
+        if old is not None:
+            i = bisect_left(self.entries, (old, exchange))
+            del self.entries[i]
+        if price is None:
+            return
+        key = -price if self.descending else price
+        self.keys[exchange] = key
+        insort(self.entries, (key, exchange))
+
+    def ranked(self):
+        """Yields (price, exchange) from the best venue outwards."""
+        sign = -1 if self.descending else 1
+        for key, exchange in self.entries:
+            yield sign * key, exchange
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class BestQuoteIndex:
+    """
+    Per-symbol best bid / best ask across every venue.
+    """
+
+    def __init__(self):
+        self.bids = {}
+        self.asks = {}
+        self.quotes = {}
+
+    def update(self, quote):
+        """Inserts or replaces one venue's quote in O(log N)."""
+        symbol = quote.symbol
+        if symbol not in self.bids:
+            self.bids[symbol] = _Ladder(descending=True)
+            self.asks[symbol] = _Ladder(descending=False)
+        self.quotes[(quote.exchange, symbol)] = quote
+        self.bids[symbol].update(quote.exchange, quote.bid)
+        self.asks[symbol].update(quote.exchange, quote.ask)
+
+    def remove(self, exchange, symbol):
+        if self.quotes.pop((exchange, symbol), None) is not None:
+            self.bids[symbol].update(exchange, None)
+            self.asks[symbol].update(exchange, None)
+
+    def _fresh(self, ladder, symbol, now, max_age):
+        for price, exchange in ladder.ranked():
+            if max_age is None or now - self.quotes[(exchange, symbol)].timestamp <= max_age:
+                yield price, exchange
+
+    def best(self, symbol, now=None, max_age=None, depth=2):
+        """
+        Returns the top `depth` fresh (price, exchange) entries for each side
+        as (bids, asks). Quotes older than `max_age` seconds are skipped.
+        """
+        if symbol not in self.bids:
+            return [], []
+        now = time.time() if now is None else now
+        bids, asks = [], []
+        for price, exchange in self._fresh(self.bids[symbol], symbol, now, max_age):
+            bids.append((price, exchange))
+            if len(bids) == depth:
+                break
+        for price, exchange in self._fresh(self.asks[symbol], symbol, now, max_age):
+            asks.append((price, exchange))
+            if len(asks) == depth:
+                break
+        return bids, asks
+
+
+class CrossExchangeScanner:
+    """
+    Config-driven scanner: feed it quotes as they arrive and it reports the
+    best cross-venue opportunity for the affected symbol.
+    """
+
+    def __init__(self, exchanges, pairs, min_spread_pct, max_quote_age=None):
+        self.exchanges = list(exchanges)
+        self.pairs = list(pairs)
+        self.min_spread_pct = min_spread_pct
+        self.max_quote_age = max_quote_age
+        self.index = BestQuoteIndex()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config['exchanges'], config['pairs'], config['min_spread_pct'],
+                   config.get('max_quote_age_s'))
+
+    def update(self, quote, now=None):
+        """
+        Applies one quote and returns an Opportunity for its symbol if the
+        best cross-venue spread clears `min_spread_pct`, else None.
+        """
+        self.index.update(quote)
+        return self.check(quote.symbol, now)
+
+    def update_many(self, quotes, now=None):
+        """
+        Applies a batch of quotes, then checks every symbol they touched once
+        against the final state of the batch. Returns {symbol: Opportunity}
+        for the symbols that clear `min_spread_pct`.
+        """
+        changed = {}
+        for quote in quotes:
+            self.index.update(quote)
+            changed[quote.symbol] = True
+        opportunities = {}
+        for symbol in changed:
+            opportunity = self.check(symbol, now)
+            if opportunity:
+                opportunities[symbol] = opportunity
+        return opportunities
+
+    def spread(self, symbol, now=None):
+        """
+        Best buy-low/sell-high pairing on two different venues, as
+        (buy_price, buy_exchange, sell_price, sell_exchange), or None.
+        """
+        bids, asks = self.index.best(symbol, now, self.max_quote_age, depth=2)
+        if not bids or not asks:
+            return None
+        (bid, bid_ex), (ask, ask_ex) = bids[0], asks[0]
+        if bid_ex != ask_ex:
+            return ask, ask_ex, bid, bid_ex
+        # Both tops sit on the same venue: pair each top with the runner-up
+        # on the other side and keep the better of the two.
+        candidates = []
+        if len(asks) > 1:
+            candidates.append((asks[1][0], asks[1][1], bid, bid_ex))
+        if len(bids) > 1:
+            candidates.append((ask, ask_ex, bids[1][0], bids[1][1]))
+        if not candidates:
+            return None
+        return max(candidates, key=lambda c: (c[2] - c[0]) / c[0])
+
+    def check(self, symbol, now=None):
+        best = self.spread(symbol, now)
+        if best is None:
+            return None
+        buy_price, buy_ex, sell_price, sell_ex = best
+        spread_pct = (sell_price - buy_price) / buy_price * 100
+        if spread_pct <= self.min_spread_pct:
+            return None
+        return Opportunity(symbol, buy_ex, buy_price, sell_ex, sell_price, spread_pct,
+                           time.time() if now is None else now)
@@ -0,0 +1,77 @@
+import importlib.util
+import json
+import os
+import time
+
+# The Live Alpha scanner also has a market_cache module, so this one is
+# loaded from its file in case that one is already imported
+_spec = importlib.util.spec_from_file_location(
+    'quant_market_cache_under_test',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'market_cache.py'))
+market_cache = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(market_cache)
+FRESH, MISS, STALE, MarketCache = market_cache.FRESH, market_cache.MISS, market_cache.STALE, market_cache.MarketCache
+
+
+class FakeExchange:
+    """Just enough of a ccxt exchange for the cache."""
+
+    loads = []
+
+    def __init__(self, config=None):
+        self.options = dict((config or {}).get('options', {}))
+        self.markets = None
+        self.currencies = None
+
+    def load_markets(self, reload=False):
+        FakeExchange.loads.append(self)
+        self.set_markets({'BTC/USDT': {'symbol': 'BTC/USDT', 'version': 2}}, {'BTC': {'code': 'BTC'}})
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = dict(markets)
+        self.currencies = currencies
+
+
+def loaded_exchange():
+    exchange = FakeExchange({'options': {'defaultType': 'spot'}})
+    exchange.set_markets({'BTC/USDT': {'symbol': 'BTC/USDT', 'version': 1}}, {'BTC': {'code': 'BTC'}})
+    return exchange
+
+
+def test_store_then_warm(tmp_path):
+    cache = MarketCache(str(tmp_path), ttl=60, library_version='4.0')
+    cache.store('binance', loaded_exchange())
+    exchange = FakeExchange()
+    assert cache.warm('binance', exchange) == FRESH
+    assert exchange.markets['BTC/USDT']['version'] == 1
+    assert cache.warm('kraken', FakeExchange()) == MISS
+
+
+def test_expired_and_foreign_entries(tmp_path):
+    cache = MarketCache(str(tmp_path), ttl=60, library_version='4.0')
+    cache.store('binance', loaded_exchange())
+    path = tmp_path / 'binance.json'
+    entry = json.loads(path.read_text())
+    entry['saved_at'] = time.time() - 120
+    path.write_text(json.dumps(entry))
+    assert cache.warm('binance', FakeExchange()) == STALE
+    assert cache.warm('binance', FakeExchange(), offline=True) == FRESH
+    # Written by another ccxt version: not used at all
+    assert MarketCache(str(tmp_path), library_version='5.0').warm('binance', FakeExchange()) == MISS
+    path.write_text('{truncated')
+    assert cache.warm('binance', FakeExchange()) == MISS
+
+
+def test_refresh_loads_on_a_separate_instance(tmp_path):
+    cache = MarketCache(str(tmp_path))
+    exchange = loaded_exchange()
+    markets = exchange.markets
+    FakeExchange.loads.clear()
+    cache.refresh('binance', exchange)
+    # The live instance never reloads itself, and its old table is left intact
+    assert len(FakeExchange.loads) == 1 and FakeExchange.loads[0] is not exchange
+    assert FakeExchange.loads[0].options == {'defaultType': 'spot'}
+    assert markets['BTC/USDT']['version'] == 1
+    assert exchange.markets['BTC/USDT']['version'] == 2
+    entry, fresh = cache.load('binance')
+    assert fresh and entry['markets']['BTC/USDT']['version'] == 2
@@ -0,0 +1,53 @@
+from poller import TickerPoller, ticker_to_quote
+
+
+class FakeExchange:
+    def __init__(self, tickers, bulk=True, fail=False):
+        self.markets = {symbol: {} for symbol in tickers}
+        self.tickers = tickers
+        self.has = {'fetchTickers': bulk}
+        self.fail = fail
+        self.calls = []
+
+    def fetch_tickers(self, symbols=None):
+        self.calls.append(('fetch_tickers', symbols))
+        if self.fail:
+            raise ConnectionError('down')
+        return {s: t for s, t in self.tickers.items() if symbols is None or s in symbols}
+
+    def fetch_ticker(self, symbol):
+        self.calls.append(('fetch_ticker', symbol))
+        return self.tickers[symbol]
+
+
+def test_ticker_falls_back_to_last_price():
+    quote = ticker_to_quote('x', 'BTC/USDT', {'bid': None, 'ask': 101.0, 'last': 100.0}, 5.0)
+    assert (quote.bid, quote.ask, quote.timestamp) == (100.0, 101.0, 5.0)
+    assert ticker_to_quote('x', 'BTC/USDT', {}, 5.0) is None
+
+
+def test_polls_only_listed_pairs_in_one_bulk_call():
+    bulk = FakeExchange({'BTC/USDT': {'bid': 1.0, 'ask': 2.0}})
+    single = FakeExchange({'BTC/USDT': {'bid': 1.5, 'ask': 2.5}, 'ETH/USDT': {'bid': 3.0, 'ask': 4.0}}, bulk=False)
+    poller = TickerPoller({'bulk': bulk, 'single': single}, ['BTC/USDT', 'ETH/USDT'])
+    try:
+        result = poller.poll()
+    finally:
+        poller.close()
+    assert bulk.calls == [('fetch_tickers', ['BTC/USDT'])]
+    assert sorted(call[1] for call in single.calls) == ['BTC/USDT', 'ETH/USDT']
+    assert sorted((q.exchange, q.symbol) for q in result.quotes) == [
+        ('bulk', 'BTC/USDT'), ('single', 'BTC/USDT'), ('single', 'ETH/USDT')]
+    assert set(result.latencies) == {'bulk', 'single'} and not result.errors
+
+
+def test_failures_are_reported_per_exchange():
+    good = FakeExchange({'BTC/USDT': {'bid': 1.0, 'ask': 2.0}})
+    bad = FakeExchange({'BTC/USDT': {'bid': 1.0, 'ask': 2.0}}, fail=True)
+    poller = TickerPoller({'good': good, 'bad': bad}, None)
+    try:
+        result = poller.poll()
+    finally:
+        poller.close()
+    assert [q.exchange for q in result.quotes] == ['good']
+    assert isinstance(result.errors['bad'], ConnectionError)
@@ -0,0 +1,62 @@
+import pytest
+
+from scanner import BestQuoteIndex, CrossExchangeScanner, Quote, _Ladder
+
+
+def test_ladder_repositions_venues():
+    asks = _Ladder(descending=False)
+    asks.update('a', 101.0)
+    asks.update('b', 100.0)
+    asks.update('c', 102.0)
+    assert list(asks.ranked()) == [(100.0, 'b'), (101.0, 'a'), (102.0, 'c')]
+    asks.update('b', 103.0)
+    assert list(asks.ranked())[0] == (101.0, 'a')
+    asks.update('a', None)
+    assert len(asks) == 2 and 'a' not in asks.keys
+
+
+def test_bid_ladder_is_highest_first():
+    bids = _Ladder(descending=True)
+    for venue, price in (('a', 99.0), ('b', 99.5), ('c', 98.0)):
+        bids.update(venue, price)
+    assert [venue for _, venue in bids.ranked()] == ['b', 'a', 'c']
+
+
+def test_index_skips_stale_quotes():
+    index = BestQuoteIndex()
+    index.update(Quote('a', 'BTC/USDT', 100.0, 100.5, timestamp=0.0))
+    index.update(Quote('b', 'BTC/USDT', 101.0, 101.5, timestamp=9.0))
+    bids, asks = index.best('BTC/USDT', now=10.0, max_age=5.0)
+    assert bids == [(101.0, 'b')] and asks == [(101.5, 'b')]
+    index.remove('b', 'BTC/USDT')
+    assert index.best('BTC/USDT', now=10.0) == ([(100.0, 'a')], [(100.5, 'a')])
+
+
+def test_scanner_reports_cross_venue_spread():
+    scanner = CrossExchangeScanner(['a', 'b', 'c'], ['BTC/USDT'], min_spread_pct=0.5)
+    assert scanner.update(Quote('a', 'BTC/USDT', 99.9, 100.0, 0.0), now=0.0) is None
+    assert scanner.update(Quote('b', 'BTC/USDT', 100.1, 100.2, 0.0), now=0.0) is None
+    opportunity = scanner.update(Quote('c', 'BTC/USDT', 101.0, 101.1, 0.0), now=0.0)
+    assert (opportunity.buy_exchange, opportunity.sell_exchange) == ('a', 'c')
+    assert opportunity.spread_pct == pytest.approx(1.0)
+
+
+def test_scanner_pairs_runner_up_when_tops_share_a_venue():
+    scanner = CrossExchangeScanner(['a', 'b', 'c'], ['X/USDT'], min_spread_pct=0.0)
+    scanner.update(Quote('a', 'X/USDT', 110.0, 100.0, 0.0), now=0.0)  # Crossed on one venue
+    scanner.update(Quote('b', 'X/USDT', 104.0, 105.0, 0.0), now=0.0)
+    scanner.update(Quote('c', 'X/USDT', 99.0, 103.0, 0.0), now=0.0)
+    buy_price, buy_ex, sell_price, sell_ex = scanner.spread('X/USDT', now=0.0)
+    assert buy_ex != sell_ex
+    assert (buy_ex, sell_ex) == ('c', 'a')  # 103 -> 110 beats 100 -> 104
+
+
+def test_batch_reports_only_spreads_still_open_at_its_end():
+    scanner = CrossExchangeScanner(['a', 'b'], ['X/USDT'], min_spread_pct=0.5)
+    scanner.update_many([Quote('a', 'X/USDT', 99.9, 100.0, 0.0), Quote('b', 'X/USDT', 100.0, 100.1, 0.0)], now=0.0)
+    # a moves up first, opening a spread against b's stale ask; b then follows
+    batch = [Quote('a', 'X/USDT', 101.0, 101.1, 0.0), Quote('b', 'X/USDT', 101.0, 101.1, 0.0)]
+    assert scanner.update_many(batch, now=0.0) == {}
+    assert scanner.check('X/USDT', now=0.0) is None
+    opportunities = scanner.update_many([Quote('b', 'X/USDT', 102.0, 102.1, 0.0)], now=0.0)
+    assert opportunities['X/USDT'].sell_exchange == 'b'
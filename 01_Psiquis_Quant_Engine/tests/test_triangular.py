@@ -0,0 +1,69 @@
+import pytest
+
+from triangular import MarketGraph
+
+MARKETS = {
+    'BTC/USDT': {'base': 'BTC', 'quote': 'USDT'},
+    'ETH/USDT': {'base': 'ETH', 'quote': 'USDT'},
+    'ETH/BTC': {'base': 'ETH', 'quote': 'BTC'},
+}
+
+
+def triangle(eth_btc):
+    graph = MarketGraph(default_fee=0.0)
+    graph.add_markets('x', MARKETS)
+    graph.update_ticker('x', 'BTC/USDT', 100.0, 100.0)
+    graph.update_ticker('x', 'ETH/USDT', 10.0, 10.0)
+    graph.update_ticker('x', 'ETH/BTC', eth_btc, eth_btc)
+    return graph
+
+
+def test_consistent_prices_have_no_cycle():
+    assert triangle(0.1).find_cycles() == []
+
+
+def test_finds_mispriced_triangle():
+    cycles = triangle(0.09).find_cycles()
+    assert len(cycles) == 1
+    cycle = cycles[0]
+    # USDT -> BTC -> ETH -> USDT: 1 / 100 / 0.09 * 10
+    assert cycle.profit_pct == pytest.approx((10 / 9 - 1) * 100)
+    assert cycle.nodes[0] == cycle.nodes[-1]
+    assert sorted((leg.symbol, leg.action) for leg in cycle.legs) == [
+        ('BTC/USDT', 'buy'), ('ETH/BTC', 'buy'), ('ETH/USDT', 'sell')]
+
+
+def test_fees_can_remove_the_edge():
+    graph = MarketGraph(default_fee=0.05)
+    graph.add_markets('x', MARKETS)
+    for symbol, price in (('BTC/USDT', 100.0), ('ETH/USDT', 10.0), ('ETH/BTC', 0.095)):
+        graph.update_ticker('x', symbol, price, price)
+    # 5.3% gross, but three 5% fees
+    assert graph.find_cycles() == []
+
+
+def test_incremental_scan_after_a_clean_scan():
+    graph = triangle(0.1)
+    assert graph.find_cycles() == []
+    assert graph._potential is not None
+    graph.update_ticker('x', 'ETH/BTC', 0.09, 0.09)
+    cycles = graph.find_cycles(min_profit_pct=5.0)
+    assert len(cycles) == 1 and cycles[0].profit_pct == pytest.approx((10 / 9 - 1) * 100)
+    # A rise in rates never creates a cycle, and there is nothing to re-relax
+    graph.update_ticker('x', 'ETH/BTC', 0.1, 0.1)
+    assert graph.find_cycles() == []
+
+
+def test_cycle_across_venues_through_transfers():
+    graph = MarketGraph(default_fee=0.0)
+    graph.add_markets('a', {'BTC/USDT': MARKETS['BTC/USDT']})
+    graph.add_markets('b', {'BTC/USDT': MARKETS['BTC/USDT']})
+    graph.add_transfer_edges(cost_pct=0.1)
+    graph.update_ticker('a', 'BTC/USDT', 99.0, 100.0)
+    graph.update_ticker('b', 'BTC/USDT', 103.0, 104.0)
+    cycles = graph.find_cycles()
+    assert cycles
+    best = cycles[0]
+    assert ('a', 'BTC/USDT', 'buy') in [(leg.exchange, leg.symbol, leg.action) for leg in best.legs]
+    assert ('b', 'BTC/USDT', 'sell') in [(leg.exchange, leg.symbol, leg.action) for leg in best.legs]
+    assert best.profit_pct == pytest.approx((103 / 100 * 0.999 * 0.999 - 1) * 100)
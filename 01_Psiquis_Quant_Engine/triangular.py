@@ -0,0 +1,302 @@
+# triangular.py
+
+"""
+Triangular / cyclic arbitrage detection over the full market graph.
+
+Every (exchange, currency) pair is a node. Each loaded market BASE/QUOTE
+contributes two edges: selling BASE at the bid and buying BASE with QUOTE
+at the ask, weighted by -log(rate) after taker fees. Optional transfer
+edges join the same currency across venues. A profitable cycle is then a
+negative-weight cycle.
+
+The first scan (and any scan after a cycle was found) runs a vectorized
+Bellman-Ford over all edges. Otherwise the node potentials from the last
+clean scan are kept, and a ticker update only re-relaxes the edges it
+touched, so a few changed tickers cost a few relaxations instead of a
+full recompute.
+"""
+
+import math
+import sys
+from collections import deque, namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("The 'numpy' library is not installed.")
+    print("Please install it by running: pip install numpy")
+    sys.exit(1)
+
+# One leg of a cycle: trade `symbol` on `exchange` ('sell' base at the bid,
+# 'buy' base at the ask) or move `currency` between venues ('transfer').
+Leg = namedtuple('Leg', ['exchange', 'symbol', 'action', 'rate'])
+
+ArbitrageCycle = namedtuple('ArbitrageCycle', ['nodes', 'legs', 'profit_pct'])
+
+DEFAULT_FEE = 0.001
+_EPS = 1e-12
+
+
+class MarketGraph:
+    """
+    Currency graph for one or more venues with incremental edge updates.
+    """
+
+    def __init__(self, default_fee=DEFAULT_FEE):
+        self.default_fee = default_fee
+        self.nodes = []          # index -> (exchange, currency)
+        self.node_index = {}     # (exchange, currency) -> index
+        self.src = []
+        self.dst = []
+        self.fees = []
+        self.edge_info = []      # index -> (exchange, symbol, action)
+        self.market_edges = {}   # (exchange, symbol) -> (sell_edge, buy_edge)
+        self.out_edges = []      # node -> [edge index, ...]
+        self.weights = np.zeros(0)
+        self._new_weights = []   # Weights of edges added since the last freeze
+        self._src = np.zeros(0, dtype=np.int64)
+        self._dst = np.zeros(0, dtype=np.int64)
+        self._potential = None   # Feasible potentials from the last clean scan
+        self._changed = set()    # Edges whose weight dropped since then
+
+    # --- Construction -------------------------------------------------
+
+    def _node(self, exchange, currency):
+        key = (exchange, currency)
+        index = self.node_index.get(key)
+        if index is None:
+            index = self.node_index[key] = len(self.nodes)
+            self.nodes.append(key)
+            self.out_edges.append([])
+        return index
+
+    def _edge(self, u, v, fee, info, weight=math.inf):
+        index = len(self.src)
+        self.src.append(u)
+        self.dst.append(v)
+        self.fees.append(fee)
+        self.edge_info.append(info)
+        self.out_edges[u].append(index)
+        self._new_weights.append(weight)
+        return index
+
+    def _freeze(self):
+        """Moves edges added since the last call into the numpy arrays."""
+        if not self._new_weights:
+            return
+        self.weights = np.concatenate([self.weights, self._new_weights])
+        self._new_weights = []
+        self._src = np.asarray(self.src, dtype=np.int64)
+        self._dst = np.asarray(self.dst, dtype=np.int64)
+        self._potential = None
+
+    def add_market(self, exchange, symbol, base, quote, fee=None):
+        """Adds the two trade edges for one spot market (no prices yet)."""
+        if (exchange, symbol) in self.market_edges:
+            return
+        fee = self.default_fee if fee is None else fee
+        b = self._node(exchange, base)
+        q = self._node(exchange, quote)
+        sell = self._edge(b, q, fee, (exchange, symbol, 'sell'))
+        buy = self._edge(q, b, fee, (exchange, symbol, 'buy'))
+        self.market_edges[(exchange, symbol)] = (sell, buy)
+
+    def add_markets(self, exchange_id, markets):
+        """Adds every active spot market from a ccxt `markets` dict."""
+        for symbol, market in markets.items():
+            if market.get('active') is False or not market.get('spot', True):
+                continue
+            base, quote = market.get('base'), market.get('quote')
+            if not base or not quote:
+                continue
+            self.add_market(exchange_id, symbol, base, quote, market.get('taker'))
+
+    def add_transfer_edges(self, cost_pct=0.0):
+        """
+        Links each currency across venues so cycles may span exchanges.
+        `cost_pct` is charged per transfer.
+        """
+        by_currency = {}
+        for index, (exchange, currency) in enumerate(self.nodes):
+            by_currency.setdefault(currency, []).append(index)
+        weight = -math.log(1 - cost_pct / 100)
+        existing = {
+            (self.src[e], self.dst[e])
+            for e, info in enumerate(self.edge_info) if info[2] == 'transfer'
+        }
+        for currency, members in by_currency.items():
+            for u in members:
+                for v in members:
+                    if u != v and (u, v) not in existing:
+                        self._edge(u, v, 0.0, (None, currency, 'transfer'), weight)
+
+    # --- Updates ------------------------------------------------------
+
+    def update_ticker(self, exchange, symbol, bid, ask):
+        """
+        Re-weights the two edges of one market in place. Unknown markets
+        and missing prices are ignored (a missing side disables its edge).
+        """
+        edges = self.market_edges.get((exchange, symbol))
+        if edges is None:
+            return
+        sell, buy = edges
+        self._freeze()
+        w = self.weights
+        new_sell = -math.log(bid * (1 - self.fees[sell])) if bid else math.inf
+        new_buy = -math.log((1 - self.fees[buy]) / ask) if ask else math.inf
+        if new_sell < w[sell]:
+            self._changed.add(sell)
+        if new_buy < w[buy]:
+            self._changed.add(buy)
+        w[sell] = new_sell
+        w[buy] = new_buy
+
+    # --- Detection ----------------------------------------------------
+
+    def find_cycles(self, min_profit_pct=0.0, max_cycles=10):
+        """
+        Returns profitable cycles (best first) as ArbitrageCycle tuples.
+        """
+        self._freeze()
+        if self._potential is None:
+            cycles = self._full_scan(max_cycles)
+        else:
+            cycles = self._incremental_scan(max_cycles)
+        self._changed.clear()
+        result = [c for c in cycles if c.profit_pct > min_profit_pct]
+        result.sort(key=lambda c: c.profit_pct, reverse=True)
+        return result
+
+    def _full_scan(self, max_cycles):
+        n = len(self.nodes)
+        if n == 0:
+            return []
+        src, dst, w = self._src, self._dst, self.weights
+        finite = np.isfinite(w)
+        src, dst, edge_ids = src[finite], dst[finite], np.nonzero(finite)[0]
+        w = w[finite]
+        dist = np.zeros(n)  # Virtual source at distance 0 to every node
+        pred = np.full(n, -1, dtype=np.int64)
+
+        for round_ in range(1, n + 1):
+            cand = dist[src] + w
+            improved = cand < dist[dst] - _EPS
+            if not improved.any():
+                self._potential = dist
+                return []
+            best = dist.copy()
+            np.minimum.at(best, dst[improved], cand[improved])
+            winners = improved & (cand <= best[dst])
+            pred[dst[winners]] = edge_ids[winners]
+            dist = best
+            # Check the predecessor graph every few rounds instead of
+            # waiting for all n rounds
+            if round_ % 4 == 0 or round_ == n:
+                cycles = self._extract_cycles(pred, np.unique(dst[winners]), max_cycles)
+                if cycles:
+                    self._potential = None
+                    return cycles
+        return []
+
+    def _incremental_scan(self, max_cycles):
+        if not self._changed:
+            return []
+        n = len(self.nodes)
+        dist = self._potential
+        w = self.weights
+        src, dst = self.src, self.dst
+        pred = np.full(n, -1, dtype=np.int64)
+        hops = [0] * n
+        queue = deque()
+        queued = set()
+
+        for e in self._changed:
+            u, v = src[e], dst[e]
+            if dist[u] + w[e] < dist[v] - _EPS:
+                dist[v] = dist[u] + w[e]
+                pred[v] = e
+                hops[v] = 1
+                if v not in queued:
+                    queue.append(v)
+                    queued.add(v)
+
+        while queue:
+            u = queue.popleft()
+            queued.discard(u)
+            du = dist[u]
+            for e in self.out_edges[u]:
+                v = dst[e]
+                nd = du + w[e]
+                if nd < dist[v] - _EPS:
+                    dist[v] = nd
+                    pred[v] = e
+                    hops[v] = hops[u] + 1
+                    if hops[v] >= n:
+                        # Relaxation path longer than the graph: a negative cycle
+                        self._potential = None
+                        return self._extract_cycles(pred, [v], max_cycles)
+                    if hops[v] % 8 == 0:
+                        # Long relaxation chains usually mean we are looping
+                        # around a cycle; look for it in the predecessor graph
+                        cycle = self._walk_cycle(pred, v)
+                        if cycle and sum(w[c] for c in cycle) < -_EPS:
+                            self._potential = None
+                            return [self._describe(cycle, float(sum(w[c] for c in cycle)))]
+                    if v not in queued:
+                        queue.append(v)
+                        queued.add(v)
+        return []
+
+    def _extract_cycles(self, pred, starts, max_cycles):
+        n = len(self.nodes)
+        seen_cycles = set()
+        cycles = []
+        # Walks that end inside a cycle cost n steps each, so cap the starts
+        for start in list(starts)[:max(64, 8 * max_cycles)]:
+            v = int(start)
+            # Step back n times to be sure we are inside any cycle
+            for _ in range(n):
+                e = pred[v]
+                if e < 0:
+                    break
+                v = self.src[e]
+            else:
+                cycle = self._walk_cycle(pred, v)
+                if cycle is None:
+                    continue
+                key = frozenset(cycle)
+                if key in seen_cycles:
+                    continue
+                seen_cycles.add(key)
+                total = float(sum(self.weights[e] for e in cycle))
+                if total < -_EPS:
+                    cycles.append(self._describe(cycle, total))
+                    if len(cycles) >= max_cycles:
+                        break
+        return cycles
+
+    def _walk_cycle(self, pred, v):
+        edges = []
+        visited = set()
+        while v not in visited:
+            visited.add(v)
+            e = pred[v]
+            if e < 0:
+                return None
+            edges.append(int(e))
+            v = self.src[e]
+        # Trim the tail leading into the cycle
+        while self.dst[edges[0]] != v:
+            edges.pop(0)
+        edges.reverse()
+        return edges
+
+    def _describe(self, cycle, total_weight):
+        nodes = [self.nodes[self.src[e]] for e in cycle]
+        nodes.append(self.nodes[self.dst[cycle[-1]]])
+        legs = []
+        for e in cycle:
+            exchange, symbol, action = self.edge_info[e]
+            legs.append(Leg(exchange, symbol, action, math.exp(-self.weights[e])))
+        return ArbitrageCycle(nodes, legs, (math.exp(-total_weight) - 1) * 100)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# benchmark.py
+
+"""
+Throughput benchmarks for the Automator ETL.
+
+Generates realistic synthetic transaction CSVs (10k to 100M rows, written
+in chunks so memory stays flat), with configurable rates of dirty amounts
+like the 'invalid' row of the demo file. Then runs DataPipeline in each mode:
+full, streaming, incremental, columnar and parallel. Every mode runs in a
+fresh process, so peak RSS is measured per mode. Results (rows/s, peak RSS,
+per-stage wall time) are appended as JSON lines to a results file and can be
+compared against a baseline run to catch throughput regressions.
+
+    python benchmark.py --rows 10000 1000000 --modes full streaming
+    python benchmark.py --rows 1000000 --baseline bench_results.jsonl --tolerance 0.15
+"""
+
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    print("Error: The 'pandas' and 'numpy' libraries are required to run this script.")
+    print("Please install them using: pip install pandas numpy")
+    sys.exit(1)
+
+MODES = ('full', 'streaming', 'incremental', 'columnar', 'parallel')
+
+DESCRIPTIONS = np.array([
+    'Office Supplies', 'Software Subscription', 'Client Dinner', 'Travel Expense',
+    'Cloud Hosting', 'Consulting Fees', 'Wire Transfer', 'Payroll', 'Market Data Feed',
+    'Exchange Fees', 'Legal Services', 'Hardware Purchase', 'Insurance Premium',
+])
+DIRTY_AMOUNTS = np.array(['invalid', 'N/A', '', '12,50', '--'])
+
+
+def generate_transactions(path: str, rows: int, dirty_rate: float = 0.01, seed: int = 0,
+                          start_date: str = '2015-01-01', years: int = 10,
+                          chunk_rows: int = 1_000_000, files: int = 1) -> List[str]:
+    """
+    Writes `rows` synthetic transactions as CSV, split across `files` files.
+
+    Amounts are log-normal; a `dirty_rate` fraction of them is replaced with
+    unparseable values. Dates are spread uniformly over `years` years.
+    Returns the written paths.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64(start_date, 'D')
+    days = int(365.25 * years)
+    if files > 1:
+        os.makedirs(path, exist_ok=True)
+        paths = [os.path.join(path, f"transactions-{i:04d}.csv") for i in range(files)]
+    else:
+        paths = [path]
+    per_file = -(-rows // files)
+
+    next_id = 1
+    for file_path in paths:
+        file_rows = min(per_file, rows - next_id + 1)
+        with open(file_path, 'w', newline='') as f:
+            f.write("transaction_id,date,amount,description\n")
+            written = 0
+            while written < file_rows:
+                n = min(chunk_rows, file_rows - written)
+                amounts = np.round(rng.lognormal(mean=4.5, sigma=1.2, size=n), 2).astype(str).astype(object)
+                dirty = rng.random(n) < dirty_rate
+                amounts[dirty] = rng.choice(DIRTY_AMOUNTS, int(dirty.sum()))
+                chunk = pd.DataFrame({
+                    'transaction_id': np.arange(next_id, next_id + n),
+                    'date': (start + rng.integers(0, days, n)).astype(str),
+                    'amount': amounts,
+                    'description': rng.choice(DESCRIPTIONS, n),
+                })
+                chunk.to_csv(f, header=False, index=False)
+                written += n
+                next_id += n
+    return paths
+
+
+def _peak_rss_mb(who: int) -> float:
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_mode(mode: str, source: str, workdir: str, chunk_size: int, workers: Optional[int]) -> Dict[str, Any]:
+    """Runs one mode from scratch and returns its timings. Executed in a child process."""
+    from etl_pipeline import DataPipeline
+    from parallel_etl import ParallelPipeline
+
+    db_path = os.path.join(workdir, f"{mode}.db")
+    columnar = os.path.join(workdir, f"{mode}.columnar")
+    for stale in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(stale):
+            os.remove(stale)
+    shutil.rmtree(columnar, ignore_errors=True)
+
+    stages: Dict[str, float] = {}
+    rows_loaded = None
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        if mode == 'parallel':
+            results = ParallelPipeline(source, db_path, 'transactions', workers=workers).run()
+            rows_loaded = sum(r.rows_loaded for r in results)
+        else:
+            pipeline = DataPipeline(
+                source, db_path, 'transactions',
+                columnar_path=columnar if mode == 'columnar' else None,
+            )
+            if mode in ('full', 'columnar'):
+                for stage in ('extract', 'transform', 'load'):
+                    t0 = time.perf_counter()
+                    getattr(pipeline, stage)()
+                    stages[stage] = time.perf_counter() - t0
+                rows_loaded = len(pipeline.df)
+            elif mode == 'streaming':
+                rows_loaded = pipeline.run_streaming(chunk_size)
+            elif mode == 'incremental':
+                rows_loaded = pipeline.run_incremental()
+        stages['total'] = time.perf_counter() - started
+        if mode == 'incremental':
+            # Timed as a stage of its own, outside 'total', so it does not dilute rows/s
+            t0 = time.perf_counter()
+            pipeline.run_incremental()
+            stages['noop_rerun'] = time.perf_counter() - t0
+
+    return {
+        'rows_loaded': rows_loaded,
+        'stages_s': stages,
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF),
+        'peak_child_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def _child(conn, *args) -> None:
+    try:
+        conn.send(('ok', _run_mode(*args)))
+    except Exception as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def run_isolated(mode: str, source: str, workdir: str, chunk_size: int, workers: Optional[int]) -> Dict[str, Any]:
+    """Runs a mode in a fresh spawned process so peak RSS belongs to that mode alone."""
+    ctx = multiprocessing.get_context('spawn')
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_child, args=(child, mode, source, workdir, chunk_size, workers))
+    process.start()
+    child.close()
+    try:
+        status, payload = parent.recv()
+    except EOFError:
+        status, payload = 'error', f"benchmark process exited with code {process.exitcode}"
+    process.join()
+    if status != 'ok':
+        raise RuntimeError(payload)
+    return payload
+
+
+def benchmark(rows_list: Sequence[int], modes: Sequence[str], workdir: str, dirty_rate: float,
+              chunk_size: int, files: int, workers: Optional[int], seed: int) -> List[Dict[str, Any]]:
+    os.makedirs(workdir, exist_ok=True)
+    results = []
+    for rows in rows_list:
+        tag = f"{rows}-{dirty_rate}-{seed}"
+        single = os.path.join(workdir, f"transactions-{tag}.csv")
+        sharded = os.path.join(workdir, f"transactions-{tag}-x{files}")
+        if not os.path.exists(single):
+            print(f"[SETUP] Generating {rows:,} rows -> {single}")
+            generate_transactions(single, rows, dirty_rate, seed)
+        if 'parallel' in modes and not os.path.isdir(sharded):
+            print(f"[SETUP] Generating {rows:,} rows in {files} files -> {sharded}")
+            generate_transactions(sharded, rows, dirty_rate, seed, files=files)
+
+        for mode in modes:
+            source = sharded if mode == 'parallel' else single
+            try:
+                outcome = run_isolated(mode, source, workdir, chunk_size, workers)
+            except RuntimeError as e:
+                print(f"[ERROR] {mode} @ {rows:,} rows failed: {e}")
+                continue
+            total = outcome['stages_s']['total']
+            result = {
+                'timestamp': time.time(),
+                'mode': mode,
+                'rows': rows,
+                'dirty_rate': dirty_rate,
+                'chunk_size': chunk_size if mode == 'streaming' else None,
+                'files': files if mode == 'parallel' else 1,
+                'rows_per_s': rows / total if total > 0 else None,
+                **outcome,
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'cpus': os.cpu_count(),
+            }
+            results.append(result)
+            print(f"{mode:<12}{rows:>12,}{result['rows_per_s']:>14,.0f}{total:>10.2f}s"
+                  f"{outcome['peak_rss_mb']:>10.0f}MB  "
+                  + ' '.join(f"{k}={v:.2f}s" for k, v in outcome['stages_s'].items() if k != 'total'))
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> List[str]:
+    """
+    Compares rows/s with the most recent baseline entry for the same mode and
+    row count. Returns one message per regression beyond `tolerance`.
+    """
+    baseline = {}
+    with open(baseline_path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                baseline[(entry['mode'], entry['rows'])] = entry
+    regressions = []
+    for result in results:
+        base = baseline.get((result['mode'], result['rows']))
+        if not base or not base.get('rows_per_s') or not result.get('rows_per_s'):
+            continue
+        change = result['rows_per_s'] / base['rows_per_s'] - 1
+        if change < -tolerance:
+            regressions.append(
+                f"{result['mode']} @ {result['rows']:,} rows: {result['rows_per_s']:,.0f} rows/s "
+                f"vs baseline {base['rows_per_s']:,.0f} ({change:+.0%})"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the Automator ETL on synthetic data.")
+    parser.add_argument("--rows", type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help="Dataset sizes to benchmark (default: 10k 100k 1M).")
+    parser.add_argument("--modes", nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument("--dirty-rate", type=float, default=0.01, help="Fraction of unparseable amounts.")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Chunk size for streaming mode.")
+    parser.add_argument("--files", type=int, default=8, help="Files the dataset is split into for parallel mode.")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for parallel mode.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default='bench_data', help="Where datasets and databases are kept.")
+    parser.add_argument("--output", default='bench_results.jsonl', help="JSON-lines results file (appended).")
+    parser.add_argument("--baseline", default=None, help="Results file to compare rows/s against.")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed rows/s drop versus the baseline before failing (default 10%%).")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    print(f"{'MODE':<12}{'ROWS':>12}{'ROWS/S':>14}{'TOTAL':>11}{'PEAK RSS':>10}  STAGES")
+    results = benchmark(args.rows, args.modes, args.workdir, args.dirty_rate, args.chunk_size,
+                        args.files, args.workers, args.seed)
+    # Compare before appending, so a baseline file can also be the output file
+    regressions = compare(results, args.baseline, args.tolerance) if args.baseline else []
+    with open(args.output, 'a') as f:
+        for result in results:
+            f.write(json.dumps(result) + '\n')
+    print(f"[SUCCESS] {len(results)} results appended to '{args.output}'.")
+
+    if regressions:
+        print("[FAILURE] Throughput regressions:")
+        for message in regressions:
+            print(f"  - {message}")
+        sys.exit(1)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# bulk_loader.py
+
+"""
+High-throughput SQLite bulk loader for the Automator pipelines.
+
+Each appended frame is written with one prepared `executemany` call, fed
+by a lazy row iterator over the column lists, into a staging table
+inside a single explicit transaction, with WAL journaling and relaxed
+synchronous/cache pragmas for the load window (the database's own journal
+mode is put back afterwards). Secondary indexes are built
+only once the data is in, and the staging table is swapped into place in
+the same transaction, so readers see either the old table or the complete
+new one, never a half-loaded table.
+"""
+
+import sqlite3
+from typing import Dict, Optional, Sequence
+
+from pandas import DataFrame, Series
+from pandas.api import types as ptypes
+
+# Explicit storage types for the known transaction columns
+COLUMN_TYPES: Dict[str, str] = {
+    'transaction_id': 'INTEGER',
+    'date': 'TEXT',
+    'amount': 'REAL',
+    'description': 'TEXT',
+    'tax': 'REAL',
+}
+DEFAULT_INDEXES = ('date', 'transaction_id')
+
+LOAD_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA cache_size = -262144',  # 256 MiB page cache
+    'PRAGMA temp_store = MEMORY',
+)
+
+
+def sqlite_type(name: str, dtype) -> str:
+    """
+    Returns the SQLite column type for a dataframe column, preferring the
+    explicit COLUMN_TYPES mapping over the pandas dtype.
+    """
+    if name in COLUMN_TYPES:
+        return COLUMN_TYPES[name]
+    if ptypes.is_bool_dtype(dtype) or ptypes.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if ptypes.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def column_values(series: Series) -> list:
+    """
+    Converts a column to a list of values sqlite3 can bind. Plain NumPy
+    columns go through tolist() (NaN binds as NULL); timestamps become ISO
+    text and nullable extension types map NA to None.
+    """
+    if ptypes.is_datetime64_any_dtype(series.dtype):
+        return series.dt.strftime('%Y-%m-%d %H:%M:%S').tolist()
+    if ptypes.is_extension_array_dtype(series.dtype):
+        return series.astype(object).where(series.notna(), None).tolist()
+    return series.tolist()
+
+
+class SQLiteBulkLoader:
+    """
+    Loads dataframes into `table_name`, replacing it atomically on commit().
+
+    Usage:
+        with SQLiteBulkLoader(db_path, 'transactions') as loader:
+            for chunk in chunks:
+                loader.append(chunk)
+    Leaving the block normally commits; an exception rolls everything back
+    and leaves the existing table untouched.
+    """
+
+    def __init__(self, db_path: str, table_name: str, indexes: Sequence[str] = DEFAULT_INDEXES):
+        """
+        Args:
+            db_path (str): The path to the destination SQLite database file.
+            table_name (str): The table to replace.
+            indexes (Sequence[str]): Columns that get a secondary index after the load.
+        """
+        self.db_path = db_path
+        self.table_name = table_name
+        self.staging_name = f"{table_name}__staging"
+        self.indexes = tuple(indexes)
+        self.columns: Optional[Sequence[str]] = None
+        self.rows = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._insert_sql: Optional[str] = None
+        self._journal_mode: Optional[str] = None
+
+    def open(self) -> None:
+        """Connects, applies the load pragmas and begins the load transaction."""
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None)
+        self._journal_mode = self._conn.execute('PRAGMA journal_mode').fetchone()[0]
+        for pragma in LOAD_PRAGMAS:
+            self._conn.execute(pragma)
+        self._conn.execute('BEGIN IMMEDIATE')
+        self._conn.execute(f'DROP TABLE IF EXISTS {quote(self.staging_name)}')
+
+    def _create_staging(self, df: DataFrame) -> None:
+        self.columns = list(df.columns)
+        ddl = ', '.join(f'{quote(c)} {sqlite_type(c, df[c].dtype)}' for c in self.columns)
+        self._conn.execute(f'CREATE TABLE {quote(self.staging_name)} ({ddl})')
+        self._insert_sql = (
+            f'INSERT INTO {quote(self.staging_name)} ({", ".join(quote(c) for c in self.columns)}) '
+            f'VALUES ({", ".join("?" for _ in self.columns)})'
+        )
+
+    def append(self, df: DataFrame) -> int:
+        """
+        Appends a dataframe to the staging table. The first call fixes the
+        column layout; later frames must have the same columns.
+
+        Returns:
+            int: The number of rows appended.
+        """
+        if self._conn is None:
+            self.open()
+        if self.columns is None:
+            self._create_staging(df)
+        elif list(df.columns) != self.columns:
+            raise ValueError(f"Column mismatch: expected {self.columns}, got {list(df.columns)}.")
+        self._conn.executemany(self._insert_sql, zip(*[column_values(df[c]) for c in self.columns]))
+        self.rows += len(df)
+        return len(df)
+
+    def execute(self, sql: str, params: Sequence = ()) -> sqlite3.Cursor:
+        """Runs a statement inside the load transaction, so it commits with the swap."""
+        if self._conn is None:
+            self.open()
+        return self._conn.execute(sql, params)
+
+    def commit(self) -> int:
+        """
+        Builds the secondary indexes, swaps the staging table into place and
+        commits. Returns the number of rows loaded.
+        Raises:
+            ValueError: If nothing was appended. The load is rolled back, as it is
+                on any other failure here, so the write lock is always released.
+        """
+        if self._conn is None:
+            self.open()
+        conn = self._conn
+        try:
+            if self.columns is None:
+                raise ValueError("No data was appended; refusing to replace the table with nothing.")
+            conn.execute(f'DROP TABLE IF EXISTS {quote(self.table_name)}')
+            conn.execute(f'ALTER TABLE {quote(self.staging_name)} RENAME TO {quote(self.table_name)}')
+            for column in self.indexes:
+                if column in self.columns:
+                    conn.execute(
+                        f'CREATE INDEX {quote(f"ix_{self.table_name}_{column}")} '
+                        f'ON {quote(self.table_name)} ({quote(column)})'
+                    )
+            conn.execute('COMMIT')
+        except BaseException:
+            self.rollback()
+            raise
+        self.close()
+        return self.rows
+
+    def rollback(self) -> None:
+        if self._conn is not None:
+            if self._conn.in_transaction:
+                self._conn.execute('ROLLBACK')
+            self.close()
+
+    def close(self) -> None:
+        """Puts the database's journal mode back and disconnects."""
+        if self._conn is not None:
+            if self._journal_mode and self._journal_mode.lower() != 'wal' and not self._conn.in_transaction:
+                try:
+                    self._conn.execute(f'PRAGMA journal_mode = {self._journal_mode}')
+                except sqlite3.OperationalError:
+                    pass  # Another connection still has the database open; WAL stays on
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> 'SQLiteBulkLoader':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
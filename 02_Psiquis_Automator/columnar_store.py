@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# columnar_store.py
+
+"""
+Date-partitioned columnar output for the Automator pipelines.
+
+Transactions are written as one `.npy` file per column, grouped into parts
+under a directory per period of the partition column (month by default):
+
+    <root>/manifest.json
+    <root>/data/2023-01/part-<id>/amount.npy
+    <root>/data/2023-01/part-<id>/date.npy
+    ...
+
+The manifest lists every part with its row count and per-column min/max.
+ColumnarReader uses those statistics to skip whole parts for a date range
+or a simple predicate, then memory-maps only the columns a query asks for,
+so a range scan touches only the files and pages it needs. Writes become
+visible atomically when the manifest is replaced.
+"""
+
+import json
+import operator
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+MANIFEST = 'manifest.json'
+STORE_FORMAT = 'psiquis-columnar-v1'
+
+# Partition granularity -> numpy datetime unit
+GRANULARITIES = {'year': 'Y', 'month': 'M', 'day': 'D'}
+
+OPERATORS = {
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le,
+    '>': operator.gt, '>=': operator.ge,
+}
+
+Predicate = Tuple[str, str, Any]
+
+
+def _to_array(series: pd.Series) -> np.ndarray:
+    """Converts a column to a fixed-width NumPy array that can be memory-mapped."""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series.to_numpy(dtype='datetime64[ns]')
+    if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_numeric_dtype(series.dtype):
+        if pd.api.types.is_extension_array_dtype(series.dtype):
+            return series.to_numpy(dtype='float64', na_value=np.nan)
+        return series.to_numpy()
+    values = series.astype(object).where(series.notna(), '').astype(str).to_numpy()
+    return values.astype('U') if len(values) else np.zeros(0, dtype='U1')
+
+
+def _stat(value: Any) -> Any:
+    """Makes a column min/max JSON-serializable."""
+    if isinstance(value, np.datetime64):
+        return str(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _bounds(values: np.ndarray) -> Optional[List[Any]]:
+    """[min, max] of the non-null values, or None if there are none."""
+    if values.dtype.kind == 'M':
+        values = values[~np.isnat(values)]
+    elif values.dtype.kind == 'f':
+        values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    if values.dtype.kind == 'U':
+        # No min/max ufunc loops for fixed-width strings
+        strings = values.tolist()
+        return [min(strings), max(strings)]
+    return [_stat(values.min()), _stat(values.max())]
+
+
+def _comparable(values: np.ndarray, value: Any) -> Any:
+    """Converts a predicate value to the column's type (dates arrive as strings)."""
+    if np.issubdtype(values.dtype, np.datetime64):
+        return np.datetime64(value, 'ns')
+    return value
+
+
+class ColumnarWriter:
+    """
+    Writes dataframes into a partitioned column store. Nothing is visible to
+    readers until commit(); in 'overwrite' mode the commit also retires the
+    previous contents.
+    """
+
+    def __init__(self, root: str, partition_column: str = 'date', granularity: str = 'month',
+                 mode: str = 'overwrite', buffer_rows: int = 1_000_000):
+        """
+        Args:
+            root (str): The store directory.
+            partition_column (str): Date column that decides each row's partition.
+            granularity (str): 'year', 'month' or 'day' partitions.
+            mode (str): 'overwrite' replaces the store on commit; 'append' adds to it.
+            buffer_rows (int): Rows buffered across write() calls before parts are
+                flushed, so small chunks still produce reasonably large parts.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity '{granularity}'; use one of {list(GRANULARITIES)}.")
+        if mode not in ('overwrite', 'append'):
+            raise ValueError("mode must be 'overwrite' or 'append'.")
+        self.root = root
+        self.partition_column = partition_column
+        self.granularity = granularity
+        self.mode = mode
+        self.buffer_rows = buffer_rows
+        self.rows = 0
+        self._buffer: Dict[str, List[Dict[str, np.ndarray]]] = {}
+        self._buffered = 0
+        self._parts: List[Dict[str, Any]] = []
+        self._schema: Optional[Dict[str, str]] = None
+
+    def write(self, df: DataFrame) -> int:
+        """
+        Buffers one frame (or chunk), split by partition; parts are written
+        once the buffer is full or on commit().
+
+        Returns:
+            int: The number of rows written.
+        Raises:
+            KeyError: If the partition column is missing.
+        """
+        if self.partition_column not in df.columns:
+            raise KeyError(f"The partition column '{self.partition_column}' is missing from the data.")
+        if not len(df):
+            return 0
+        dates = pd.to_datetime(df[self.partition_column], errors='coerce').to_numpy(dtype='datetime64[ns]')
+        keys = dates.astype(f'datetime64[{GRANULARITIES[self.granularity]}]').astype(str)
+        # Rows with no usable date share one partition
+        keys[np.isnat(dates)] = 'unknown'
+
+        columns = {c: _to_array(df[c]) for c in df.columns}
+        columns[self.partition_column] = dates
+        schema = {c: a.dtype.str for c, a in columns.items()}
+        if self._schema is None:
+            self._schema = schema
+        elif list(schema) != list(self._schema):
+            raise ValueError(f"Column mismatch: expected {list(self._schema)}, got {list(schema)}.")
+
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        bounds = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+        for rows in np.split(order, bounds):
+            self._buffer.setdefault(str(keys[rows[0]]), []).append({c: a[rows] for c, a in columns.items()})
+        self._buffered += len(df)
+        self.rows += len(df)
+        if self._buffered >= self.buffer_rows:
+            self.flush()
+        return len(df)
+
+    def flush(self) -> None:
+        """Writes every buffered partition as one new part."""
+        for partition, pieces in self._buffer.items():
+            if len(pieces) == 1:
+                self._write_part(partition, pieces[0])
+            else:
+                self._write_part(partition, {c: np.concatenate([p[c] for p in pieces]) for c in pieces[0]})
+        self._buffer = {}
+        self._buffered = 0
+
+    def _write_part(self, partition: str, columns: Dict[str, np.ndarray]) -> None:
+        name = f"part-{uuid.uuid4().hex[:12]}"
+        rel = os.path.join('data', partition, name)
+        os.makedirs(os.path.join(self.root, rel))
+        stats = {}
+        for column, values in columns.items():
+            np.save(os.path.join(self.root, rel, f"{column}.npy"), values)
+            bounds = _bounds(values)
+            if bounds is not None:
+                stats[column] = bounds
+        self._parts.append({
+            'partition': partition,
+            'path': rel,
+            'rows': len(next(iter(columns.values()))),
+            'stats': stats,
+        })
+
+    def commit(self) -> int:
+        """Publishes the written parts by replacing the manifest. Returns the row count."""
+        self.flush()
+        previous = load_manifest(self.root)
+        parts = self._parts
+        if self.mode == 'append' and previous is not None:
+            if previous['schema'] and self._schema and list(previous['schema']) != list(self._schema):
+                raise ValueError("Appended data does not match the store's columns.")
+            parts = previous['parts'] + parts
+        manifest = {
+            'format': STORE_FORMAT,
+            'partition_column': self.partition_column,
+            'granularity': self.granularity,
+            'schema': self._schema or (previous or {}).get('schema') or {},
+            'parts': sorted(parts, key=lambda p: p['partition']),
+            'rows': sum(p['rows'] for p in parts),
+            'updated_at': time.time(),
+        }
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f"{MANIFEST}.{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(self.root, MANIFEST))
+        if self.mode == 'overwrite' and previous is not None:
+            live = {p['path'] for p in manifest['parts']}
+            for part in previous['parts']:
+                if part['path'] not in live:
+                    shutil.rmtree(os.path.join(self.root, part['path']), ignore_errors=True)
+        self._parts = []
+        return manifest['rows']
+
+    def abort(self) -> None:
+        """Deletes parts written since the last commit."""
+        self._buffer = {}
+        self._buffered = 0
+        for part in self._parts:
+            shutil.rmtree(os.path.join(self.root, part['path']), ignore_errors=True)
+        self._parts = []
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+
+def load_manifest(root: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(root, MANIFEST)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get('format') != STORE_FORMAT:
+        raise ValueError(f"{root} is not a {STORE_FORMAT} store.")
+    return manifest
+
+
+class ColumnarReader:
+    """
+    Scans a column store, pruning parts by date range and predicate
+    statistics and reading only the requested columns.
+    """
+
+    def __init__(self, root: str):
+        manifest = load_manifest(root)
+        if manifest is None:
+            raise FileNotFoundError(f"No column store found at '{root}'.")
+        self.root = root
+        self.manifest = manifest
+        self.partition_column = manifest['partition_column']
+        self.columns = list(manifest['schema'])
+
+    def _might_match(self, part: Dict[str, Any], predicates: Sequence[Predicate]) -> bool:
+        for column, op, value in predicates:
+            bounds = part['stats'].get(column)
+            if bounds is None:
+                if column in self.manifest['schema'] and part['rows'] and op != '!=':
+                    # Column is all-null in this part; no comparison can hold
+                    return False
+                continue
+            low, high = bounds
+            if np.dtype(self.manifest['schema'][column]).kind == 'M':
+                low, high, value = np.datetime64(low, 'ns'), np.datetime64(high, 'ns'), np.datetime64(value, 'ns')
+            if (op == '==' and not low <= value <= high) or (op == '<' and not low < value) or \
+                    (op == '<=' and not low <= value) or (op == '>' and not high > value) or \
+                    (op == '>=' and not high >= value) or (op == '!=' and low == high == value):
+                return False
+        return True
+
+    def parts(self, start: Optional[str] = None, end: Optional[str] = None,
+              where: Iterable[Predicate] = ()) -> List[Dict[str, Any]]:
+        """
+        Parts that may hold rows with `start <= partition column < end` and
+        matching every `where` predicate.
+        """
+        predicates = self._predicates(start, end, where)
+        return [p for p in self.manifest['parts'] if self._might_match(p, predicates)]
+
+    def _predicates(self, start, end, where) -> List[Predicate]:
+        predicates = list(where)
+        for column, _, _ in predicates:
+            if column not in self.manifest['schema']:
+                raise KeyError(f"Unknown column '{column}'.")
+        if start is not None:
+            predicates.append((self.partition_column, '>=', start))
+        if end is not None:
+            predicates.append((self.partition_column, '<', end))
+        return predicates
+
+    def _load(self, part: Dict[str, Any], column: str) -> np.ndarray:
+        return np.load(os.path.join(self.root, part['path'], f"{column}.npy"), mmap_mode='r')
+
+    def scan(self, columns: Optional[Sequence[str]] = None, start: Optional[str] = None,
+             end: Optional[str] = None, where: Iterable[Predicate] = ()) -> DataFrame:
+        """
+        Returns the matching rows as a dataframe.
+
+        Args:
+            columns (Optional[Sequence[str]]): Columns to return; default all.
+            start (Optional[str]): Inclusive lower bound on the partition column.
+            end (Optional[str]): Exclusive upper bound on the partition column.
+            where (Iterable[Predicate]): (column, op, value) predicates, all of which
+                must hold; op is one of ==, !=, <, <=, >, >=.
+        """
+        columns = list(columns) if columns is not None else self.columns
+        for column in columns:
+            if column not in self.manifest['schema']:
+                raise KeyError(f"Unknown column '{column}'.")
+        predicates = self._predicates(start, end, where)
+        frames = []
+        for part in self.manifest['parts']:
+            if not self._might_match(part, predicates):
+                continue
+            mask = None
+            for column, op, value in predicates:
+                values = self._load(part, column)
+                hit = OPERATORS[op](values, _comparable(values, value))
+                mask = hit if mask is None else mask & hit
+            if mask is not None and not mask.any():
+                continue
+            data = {}
+            for column in columns:
+                values = self._load(part, column)
+                data[column] = values[mask] if mask is not None else np.array(values)
+            frames.append(DataFrame(data))
+        if not frames:
+            schema = self.manifest['schema']
+            return DataFrame({c: np.zeros(0, dtype=np.dtype(schema[c])) for c in columns})
+        return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query a date-partitioned column store.")
+    parser.add_argument("root", help="Store directory written by DataPipeline --columnar.")
+    parser.add_argument("--start", default=None, help="Inclusive start date, e.g. 2023-01-01.")
+    parser.add_argument("--end", default=None, help="Exclusive end date.")
+    parser.add_argument("--columns", default=None, help="Comma-separated columns to read.")
+    parser.add_argument("--where", action="append", default=[], metavar="COL OP VALUE",
+                        help="Predicate such as 'amount >= 100' (repeatable).")
+    args = parser.parse_args()
+
+    predicates = []
+    for clause in args.where:
+        column, op, value = clause.split(None, 2)
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+        predicates.append((column, op, value))
+
+    reader = ColumnarReader(args.root)
+    selected = reader.parts(args.start, args.end, predicates)
+    started = time.perf_counter()
+    result = reader.scan(args.columns.split(',') if args.columns else None, args.start, args.end, predicates)
+    print(f"[INFO] Scanned {len(selected)}/{len(reader.manifest['parts'])} parts, "
+          f"{len(result):,} rows in {time.perf_counter() - started:.3f}s.")
+    print(result.head(20).to_string())
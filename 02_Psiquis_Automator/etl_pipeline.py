@@ -7,9 +7,14 @@ This script extracts data from a CSV file, performs a transformation,
 and loads the result into a SQLite database.
 """
 
+import io
+import os
 import sys
+import time
+import hashlib
 import sqlite3
-from typing import Optional
+import contextlib
+from typing import Optional, Tuple
 
 # Requirement 1 & 2: Robustly import pandas and handle its absence.
 try:
@@ -20,13 +25,63 @@ except ImportError:
     print("Please install it using: pip install pandas")
     sys.exit(1)
 
+from bulk_loader import SQLiteBulkLoader, column_values, quote, sqlite_type
+from columnar_store import ColumnarWriter
+from transform_spec import DEFAULT_SPEC, TransformSpec
+
+
+WATERMARK_TABLE = 'etl_watermarks'
+WATERMARK_DDL = (
+    f'CREATE TABLE IF NOT EXISTS "{WATERMARK_TABLE}" ('
+    'source TEXT NOT NULL, target TEXT NOT NULL, size INTEGER, mtime_ns INTEGER, '
+    'byte_offset INTEGER, boundary_hash TEXT, max_key, updated_at REAL, '
+    'PRIMARY KEY (source, target))'
+)
+# Bytes just before the stored offset that must be unchanged for a file to
+# count as append-only (otherwise it is reloaded in full).
+BOUNDARY_BYTES = 64 * 1024
+# Rows per chunk when parsing an incremental delta without a chunk_size.
+INCREMENTAL_CHUNK_ROWS = 100_000
+# Seconds a file must have been left alone before a last row without a
+# trailing newline is taken as complete rather than still being written.
+TAIL_SETTLE_S = 1.0
+
+
+class _DeltaReader(io.RawIOBase):
+    """
+    The CSV header followed by bytes [start, end) of the source file, as one
+    readable stream, so the delta is parsed in chunks without copying it.
+    """
+
+    def __init__(self, f, header: bytes, start: int, end: int):
+        self._f = f
+        self._header = header
+        self._remaining = max(0, end - start)
+        f.seek(start)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._header:
+            n = min(len(buffer), len(self._header))
+            buffer[:n] = self._header[:n]
+            self._header = self._header[n:]
+            return n
+        data = self._f.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
 
 class DataPipeline:
     """
     Encapsulates the ETL process for financial data.
     """
 
-    def __init__(self, csv_path: str, db_path: str, table_name: str):
+    def __init__(self, csv_path: str, db_path: str, table_name: str, chunk_size: Optional[int] = None,
+                 incremental: bool = False, key_column: str = 'transaction_id',
+                 spec: TransformSpec = DEFAULT_SPEC, columnar_path: Optional[str] = None):
         """
         Initializes the DataPipeline with source and destination paths.
 
@@ -34,10 +89,23 @@ class DataPipeline:
             csv_path (str): The path to the source CSV file.
             db_path (str): The path to the destination SQLite database file.
             table_name (str): The name of the table to create/replace in the database.
+            chunk_size (Optional[int]): If set, run() streams the file in chunks of
+                this many rows instead of loading it into memory at once.
+            incremental (bool): If set, run() only loads rows added since the last
+                run and upserts them by `key_column` (see run_incremental()).
+            key_column (str): The unique key used for upserts in incremental mode.
+            spec (TransformSpec): The casts, filters and derived columns to apply.
+            columnar_path (Optional[str]): If set, full and streaming loads also write a
+                date-partitioned column store there (see columnar_store.py).
         """
         self.csv_path = csv_path
         self.db_path = db_path
         self.table_name = table_name
+        self.chunk_size = chunk_size
+        self.incremental = incremental
+        self.key_column = key_column
+        self.spec = spec
+        self.columnar_path = columnar_path
         self.df: Optional[DataFrame] = None
         print(f"[INFO] DataPipeline initialized for source '{csv_path}' and destination '{db_path}'.")
 
@@ -49,7 +117,7 @@ class DataPipeline:
         """
         print(f"[INFO] Stage 1/3: EXTRACING data from '{self.csv_path}'...")
         try:
-            self.df = pd.read_csv(self.csv_path)
+            self.df = pd.read_csv(self.csv_path, **self.spec.read_options())
             print(f"[SUCCESS] Extracted {len(self.df)} rows successfully.")
         except FileNotFoundError:
             print(f"[ERROR] Source file not found at '{self.csv_path}'.")
@@ -57,36 +125,38 @@ class DataPipeline:
 
     def transform(self) -> None:
         """
-        Transforms the extracted data by adding a 'tax' column.
-        The 'amount' column is assumed to exist.
+        Transforms the extracted data with the pipeline's spec (by default:
+        coerce 'amount', drop invalid rows, add a 'tax' column).
         Raises:
             ValueError: If the dataframe has not been extracted yet.
-            KeyError: If the 'amount' column is missing from the dataframe.
+            KeyError: If a column the spec requires is missing from the dataframe.
         """
         print("[INFO] Stage 2/3: TRANSFORMING data...")
         if self.df is None:
             raise ValueError("Dataframe is not loaded. Please run extract() first.")
         
-        if 'amount' not in self.df.columns:
-            raise KeyError("The required column 'amount' is missing from the source data.")
+        self.df, dropped = self.transform_frame(self.df)
+        if dropped:
+            print(f"[WARNING] Dropped {dropped} invalid or filtered rows.")
+        derived = ', '.join(f"'{name}'" for name in self.spec.derived) or 'no'
+        print(f"[SUCCESS] Transformation complete. {derived} column(s) added.")
 
-        # Ensure 'amount' is a numeric type, coercing errors to NaN
-        self.df['amount'] = pd.to_numeric(self.df['amount'], errors='coerce')
-        
-        # Drop rows where 'amount' could not be converted to a number
-        original_rows = len(self.df)
-        self.df.dropna(subset=['amount'], inplace=True)
-        if len(self.df) < original_rows:
-            print(f"[WARNING] Dropped {original_rows - len(self.df)} rows with non-numeric 'amount'.")
+    def transform_frame(self, df: DataFrame, extra: Tuple[str, ...] = ()) -> Tuple[DataFrame, int]:
+        """
+        Applies the business transformation to one frame (or chunk), keeping
+        the `extra` columns even if the spec's output leaves them out.
 
-        # Requirement 3: Add a 'tax' column
-        self.df['tax'] = self.df['amount'] * 0.15
-        print("[SUCCESS] Transformation complete. 'tax' column added.")
+        Returns:
+            Tuple[DataFrame, int]: The transformed frame and the number of rows dropped.
+        Raises:
+            KeyError: If a column the spec requires is missing from the dataframe.
+        """
+        return self.spec.apply(df, extra)
 
     def load(self) -> None:
         """
         Loads the transformed data into a SQLite database table.
-        This will replace the table if it already exists.
+        This will replace the table if it already exists, atomically (see SQLiteBulkLoader).
         Raises:
             ValueError: If the dataframe has not been transformed yet.
             sqlite3.Error: If there is an issue with the database operation.
@@ -96,27 +166,250 @@ class DataPipeline:
             raise ValueError("Dataframe is empty. Please run extract() and transform() first.")
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                self.df.to_sql(
-                    self.table_name,
-                    conn,
-                    if_exists='replace',
-                    index=False
-                )
-                print(f"[SUCCESS] Data loaded into table '{self.table_name}'.")
+            with self._columnar_writer() as columnar, SQLiteBulkLoader(self.db_path, self.table_name) as loader:
+                loader.append(self.df)
+                if columnar is not None:
+                    columnar.write(self.df)
+                self._reset_watermarks(loader)
+            print(f"[SUCCESS] Data loaded into table '{self.table_name}'.")
+            if self.columnar_path:
+                print(f"[SUCCESS] Column store written to '{self.columnar_path}'.")
+        except sqlite3.Error as e:
+            print(f"[ERROR] Failed to load data into SQLite database: {e}")
+            raise
+
+    def _columnar_writer(self):
+        """
+        A ColumnarWriter for `columnar_path`, or a null context. Entered before the
+        SQLite loader so it only publishes after the SQLite commit succeeded.
+        """
+        if not self.columnar_path:
+            return contextlib.nullcontext()
+        return ColumnarWriter(self.columnar_path)
+
+    def run_streaming(self, chunk_size: int) -> int:
+        """
+        Streams the CSV through transform and load in fixed-size chunks, so peak
+        memory is bounded by the chunk size rather than the file size.
+        Chunks are bulk-loaded into a staging table that replaces the target table
+        only once the whole file is in.
+
+        Args:
+            chunk_size (int): Number of CSV rows per chunk.
+        Returns:
+            int: The number of rows loaded.
+        Raises:
+            FileNotFoundError: If the CSV file does not exist.
+            KeyError: If the 'amount' column is missing from the source data.
+            sqlite3.Error: If there is an issue with the database operation.
+        """
+        print(f"[INFO] STREAMING '{self.csv_path}' -> '{self.db_path}' (table: '{self.table_name}') "
+              f"in chunks of {chunk_size:,} rows...")
+        try:
+            reader = pd.read_csv(self.csv_path, chunksize=chunk_size, **self.spec.read_options())
+        except FileNotFoundError:
+            print(f"[ERROR] Source file not found at '{self.csv_path}'.")
+            raise
+
+        rows_read = rows_loaded = dropped = 0
+        started = time.perf_counter()
+        try:
+            with reader, self._columnar_writer() as columnar, \
+                    SQLiteBulkLoader(self.db_path, self.table_name) as loader:
+                for i, chunk in enumerate(reader, start=1):
+                    rows_read += len(chunk)
+                    chunk, chunk_dropped = self.transform_frame(chunk)
+                    dropped += chunk_dropped
+                    rows_loaded += loader.append(chunk)
+                    if columnar is not None:
+                        columnar.write(chunk)
+                    elapsed = time.perf_counter() - started
+                    print(f"[PROGRESS] Chunk {i}: {rows_loaded:,} rows loaded "
+                          f"({rows_read / elapsed:,.0f} rows/s)")
+                self._reset_watermarks(loader)
         except sqlite3.Error as e:
             print(f"[ERROR] Failed to load data into SQLite database: {e}")
             raise
 
+        elapsed = time.perf_counter() - started
+        if dropped:
+            print(f"[WARNING] Dropped {dropped} invalid or filtered rows.")
+        rate = rows_read / elapsed if elapsed > 0 else float('inf')
+        print(f"[SUCCESS] Streamed {rows_loaded:,} rows into '{self.table_name}' "
+              f"in {elapsed:.2f}s ({rate:,.0f} rows/s).")
+        return rows_loaded
+
+    def _read_watermark(self, conn: sqlite3.Connection) -> Optional[tuple]:
+        conn.execute(WATERMARK_DDL)
+        return conn.execute(
+            f'SELECT size, mtime_ns, byte_offset, boundary_hash, max_key FROM "{WATERMARK_TABLE}" '
+            'WHERE source = ? AND target = ?',
+            (os.path.abspath(self.csv_path), self.table_name),
+        ).fetchone()
+
+    def _reset_watermarks(self, loader: SQLiteBulkLoader) -> None:
+        """A full load replaces the table, so incremental state for it is void."""
+        loader.execute(WATERMARK_DDL)
+        loader.execute(f'DELETE FROM "{WATERMARK_TABLE}" WHERE target = ?', (self.table_name,))
+
+    @staticmethod
+    def _line_end(f, start: int, end: int) -> int:
+        """The offset just past the last newline in [start, end), or `start` if there is none."""
+        pos = end
+        while pos > start:
+            block_start = max(start, pos - BOUNDARY_BYTES)
+            f.seek(block_start)
+            i = f.read(pos - block_start).rfind(b'\n')
+            if i >= 0:
+                return block_start + i + 1
+            pos = block_start
+        return start
+
+    @staticmethod
+    def _boundary_hash(f, offset: int) -> str:
+        start = max(0, offset - BOUNDARY_BYTES)
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+    def _upsert(self, conn: sqlite3.Connection, df: DataFrame) -> None:
+        """
+        Creates the target table keyed on `key_column` if needed and upserts `df`.
+        """
+        key = self.key_column
+        if key not in df.columns:
+            raise KeyError(f"The key column '{key}' is missing from the source data.")
+        types = {c: sqlite_type(c, df[c].dtype) for c in df.columns}
+        conn.execute(pd.io.sql.get_schema(df, self.table_name, keys=key, dtype=types).replace(
+            'CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1))
+        # Tables written by a full (replace) load have no key constraint yet
+        table = quote(self.table_name)
+        index = f"ux_{self.table_name}_{key}"
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (index,)).fetchone():
+            # A full load may have written the same key more than once; keep the last row per key
+            removed = conn.execute(
+                f'DELETE FROM {table} WHERE {quote(key)} IS NOT NULL AND rowid NOT IN '
+                f'(SELECT MAX(rowid) FROM {table} WHERE {quote(key)} IS NOT NULL GROUP BY {quote(key)})'
+            ).rowcount
+            if removed:
+                print(f"[WARNING] Removed {removed} duplicate '{key}' rows from '{self.table_name}' "
+                      f"(kept the last one per key) before switching it to upserts.")
+            try:
+                conn.execute(f'CREATE UNIQUE INDEX {quote(index)} ON {table} ({quote(key)})')
+            except sqlite3.IntegrityError as e:
+                raise sqlite3.IntegrityError(
+                    f"Cannot make '{key}' a unique key of table '{self.table_name}': {e}") from e
+        columns = ', '.join(quote(c) for c in df.columns)
+        params = ', '.join('?' for _ in df.columns)
+        updates = ', '.join(f'{quote(c)} = excluded.{quote(c)}' for c in df.columns if c != key)
+        sql = f'INSERT INTO {table} ({columns}) VALUES ({params}) ON CONFLICT ({quote(key)}) DO '
+        sql += f'UPDATE SET {updates}' if updates else 'NOTHING'
+        conn.executemany(sql, zip(*[column_values(df[c]) for c in df.columns]))
+
+    def run_incremental(self) -> int:
+        """
+        Loads only what changed since the last run and upserts it by `key_column`.
+
+        A watermark per (file, table) records the bytes consumed, the mtime, the
+        offset to resume from and a hash of the bytes just before that offset. On the
+        next run: an unchanged file is skipped; a file that only grew is parsed from
+        the stored offset; anything else (truncated or rewritten) is re-read in full.
+        The delta is parsed in chunks, so memory stays bounded on a first run over a
+        large file. A last row without a trailing newline is loaded once the file
+        has not been modified for TAIL_SETTLE_S, and re-read if the file grows later.
+        Upserts make every case idempotent, and the watermark is committed in the same
+        transaction as the rows so an interrupted run is simply repeated.
+
+        Returns:
+            int: The number of rows upserted.
+        Raises:
+            FileNotFoundError: If the CSV file does not exist.
+            KeyError: If the 'amount' or key column is missing from the source data.
+            sqlite3.Error: If there is an issue with the database operation.
+        """
+        print(f"[INFO] INCREMENTAL load '{self.csv_path}' -> '{self.db_path}' (table: '{self.table_name}')...")
+        started = time.perf_counter()
+        try:
+            stat = os.stat(self.csv_path)
+        except FileNotFoundError:
+            print(f"[ERROR] Source file not found at '{self.csv_path}'.")
+            raise
+
+        try:
+            with sqlite3.connect(self.db_path) as conn, open(self.csv_path, 'rb') as f:
+                mark = self._read_watermark(conn)
+                offset, max_key = 0, None
+                if mark is not None:
+                    size, mtime_ns, mark_offset, boundary, max_key = mark
+                    if size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+                        print("[SUCCESS] Source unchanged since last run; nothing to load.")
+                        return 0
+                    if stat.st_size >= mark_offset and self._boundary_hash(f, mark_offset) == boundary:
+                        offset = mark_offset
+                    else:
+                        print("[WARNING] Source was rewritten since last run; reloading it in full.")
+
+                f.seek(0)
+                header = f.readline()
+                start = max(offset, len(header))
+                # Resume point: the end of the last complete line. A last row without a
+                # newline is loaded once the file has settled, but the resume point stays
+                # before it so the row is re-read (and re-upserted) if the file grows.
+                line_end = self._line_end(f, start, stat.st_size)
+                end = line_end
+                if line_end < stat.st_size and time.time() - stat.st_mtime >= TAIL_SETTLE_S:
+                    end = stat.st_size
+
+                reader = pd.read_csv(io.BufferedReader(_DeltaReader(f, header, start, end)),
+                                     chunksize=self.chunk_size or INCREMENTAL_CHUNK_ROWS,
+                                     **self.spec.read_options((self.key_column,)))
+                rows_read = rows_loaded = dropped = 0
+                with conn, reader:
+                    for chunk in reader:
+                        rows_read += len(chunk)
+                        chunk, chunk_dropped = self.transform_frame(chunk, (self.key_column,))
+                        dropped += chunk_dropped
+                        if not len(chunk):
+                            continue
+                        self._upsert(conn, chunk)
+                        rows_loaded += len(chunk)
+                        chunk_max = chunk[self.key_column].max()
+                        chunk_max = chunk_max.item() if hasattr(chunk_max, 'item') else chunk_max
+                        max_key = chunk_max if max_key is None else max(max_key, chunk_max)
+                    # `size` records what was consumed, so a tail that was held back is
+                    # retried on the next run instead of counting as unchanged
+                    conn.execute(
+                        f'INSERT OR REPLACE INTO "{WATERMARK_TABLE}" VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                        (os.path.abspath(self.csv_path), self.table_name, end, stat.st_mtime_ns,
+                         line_end, self._boundary_hash(f, line_end), max_key, time.time()),
+                    )
+                if dropped:
+                    print(f"[WARNING] Dropped {dropped} invalid or filtered rows.")
+        except sqlite3.Error as e:
+            print(f"[ERROR] Failed to load data into SQLite database: {e}")
+            raise
+
+        elapsed = time.perf_counter() - started
+        print(f"[SUCCESS] Upserted {rows_loaded:,} of {rows_read:,} new rows into '{self.table_name}' "
+              f"from byte {offset:,} in {elapsed:.2f}s.")
+        return rows_loaded
+
     def run(self) -> None:
         """
         Executes the full ETL pipeline in sequence.
+        Uses run_incremental() or run_streaming() when the pipeline was created
+        with `incremental` or a `chunk_size`.
         """
         try:
+            if self.incremental:
+                self.run_incremental()
+                return
+            if self.chunk_size:
+                self.run_streaming(self.chunk_size)
+                return
             self.extract()
             self.transform()
             self.load()
-        except (FileNotFoundError, ValueError, KeyError, sqlite3.Error):
+        except (FileNotFoundError, ValueError, KeyError, sqlite3.Error, pd.errors.ParserError):
             print("[FAILURE] ETL pipeline execution failed.")
             # Re-raise the exception to be caught by the main execution block
             raise
@@ -124,31 +417,53 @@ class DataPipeline:
 
 # Requirement 4: Main execution block
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the financial ETL pipeline.")
+    parser.add_argument("--csv", default=None,
+                        help="Source CSV file (default: a dummy data.csv created for demonstration).")
+    parser.add_argument("--db", default='finance.db', help="Destination SQLite database.")
+    parser.add_argument("--table", default='transactions', help="Destination table.")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Stream the CSV in chunks of this many rows (bounded memory).")
+    parser.add_argument("--spec", default=None,
+                        help="JSON transform spec (casts, filters, derived, output); default: amount/tax rules.")
+    parser.add_argument("--columnar", default=None, metavar="DIR",
+                        help="Also write a date-partitioned column store to DIR.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only load rows added since the last run, upserting by transaction_id.")
+    args = parser.parse_args()
+
     # Configuration
-    CSV_FILE = 'data.csv'
-    DB_FILE = 'finance.db'
-    TABLE_NAME = 'transactions'
+    CSV_FILE = args.csv or 'data.csv'
+    DB_FILE = args.db
+    TABLE_NAME = args.table
 
     # To make this script runnable out-of-the-box, let's create a dummy data.csv
-    try:
-        with open(CSV_FILE, 'w') as f:
-            f.write("transaction_id,date,amount,description\n")
-            f.write("1,2023-01-15,150.75,Office Supplies\n")
-            f.write("2,2023-01-16,99.99,Software Subscription\n")
-            f.write("3,2023-01-18,500.00,Client Dinner\n")
-            f.write("4,2023-01-19,invalid,Data Entry Error\n")
-            f.write("5,2023-01-20,250.50,Travel Expense\n")
-        print(f"[SETUP] Created dummy '{CSV_FILE}' for demonstration.")
-    except IOError as e:
-        print(f"[ERROR] Could not create dummy CSV file: {e}")
-        sys.exit(1)
+    # (only when no source file was given, so real files are never overwritten)
+    if args.csv is None:
+        try:
+            with open(CSV_FILE, 'w') as f:
+                f.write("transaction_id,date,amount,description\n")
+                f.write("1,2023-01-15,150.75,Office Supplies\n")
+                f.write("2,2023-01-16,99.99,Software Subscription\n")
+                f.write("3,2023-01-18,500.00,Client Dinner\n")
+                f.write("4,2023-01-19,invalid,Data Entry Error\n")
+                f.write("5,2023-01-20,250.50,Travel Expense\n")
+            print(f"[SETUP] Created dummy '{CSV_FILE}' for demonstration.")
+        except IOError as e:
+            print(f"[ERROR] Could not create dummy CSV file: {e}")
+            sys.exit(1)
 
     # Execute the pipeline
-    pipeline = DataPipeline(csv_path=CSV_FILE, db_path=DB_FILE, table_name=TABLE_NAME)
+    pipeline = DataPipeline(csv_path=CSV_FILE, db_path=DB_FILE, table_name=TABLE_NAME,
+                            chunk_size=args.chunk_size, incremental=args.incremental,
+                            spec=TransformSpec.from_file(args.spec) if args.spec else DEFAULT_SPEC,
+                            columnar_path=args.columnar)
     try:
         pipeline.run()
         print("\n" + "="*50)
-        print("Pipeline Finished. Data saved to finance.db")
+        print(f"Pipeline Finished. Data saved to {DB_FILE}")
         print("="*50)
     except Exception:
         print("\n[CRITICAL] The pipeline process was terminated due to a critical error.")
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# parallel_etl.py
+
+"""
+Parallel multi-file ETL for batches of daily CSV drops.
+
+Files matched by a glob (or every *.csv in a directory) are parsed and
+transformed in parallel on a process pool. At most `queue_size` files are
+in flight at once, which bounds memory and gives the pool backpressure,
+and every finished frame is handed to a single writer (this process) that
+bulk-loads it with SQLiteBulkLoader, so there is never any SQLite lock
+contention. Per-file outcomes are recorded in an `etl_files` table that
+commits together with the data, or on their own if every file failed.
+"""
+
+import contextlib
+import glob
+import os
+import sys
+import time
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Optional, Set
+
+try:
+    import pandas as pd
+except ImportError:
+    print("Error: The 'pandas' library is required to run this script.")
+    print("Please install it using: pip install pandas")
+    sys.exit(1)
+
+from bulk_loader import SQLiteBulkLoader
+from etl_pipeline import WATERMARK_DDL, WATERMARK_TABLE
+from transform_spec import DEFAULT_SPEC, TransformSpec
+
+FILES_TABLE = 'etl_files'
+FILES_DDL = (
+    f'CREATE TABLE IF NOT EXISTS "{FILES_TABLE}" ('
+    'source TEXT NOT NULL, target TEXT NOT NULL, status TEXT NOT NULL, rows INTEGER, '
+    'dropped INTEGER, error TEXT, seconds REAL, loaded_at REAL, PRIMARY KEY (source, target))'
+)
+FILES_INSERT = f'INSERT OR REPLACE INTO "{FILES_TABLE}" VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+
+
+class FileResult(NamedTuple):
+    path: str
+    ok: bool
+    rows_read: int
+    dropped: int
+    rows_loaded: int
+    error: Optional[str]
+    seconds: float
+
+
+def resolve_sources(source: str) -> List[str]:
+    """
+    Expands a directory (every *.csv inside it) or a glob pattern into a
+    sorted list of files.
+    """
+    if os.path.isdir(source):
+        source = os.path.join(source, '*.csv')
+    return sorted(path for path in glob.glob(source) if os.path.isfile(path))
+
+
+def transform_file(path: str, spec: TransformSpec = DEFAULT_SPEC):
+    """
+    Worker: extracts and transforms one file with `spec`.
+    Returns (path, frame or None, rows_read, dropped, error, seconds).
+    """
+    started = time.perf_counter()
+    try:
+        df = pd.read_csv(path, **spec.read_options())
+        rows_read = len(df)
+        df, dropped = spec.apply(df)
+        return path, df, rows_read, dropped, None, time.perf_counter() - started
+    except Exception as e:
+        return path, None, 0, 0, f"{type(e).__name__}: {e}", time.perf_counter() - started
+
+
+class ParallelPipeline:
+    """
+    Runs the ETL over many files with parallel transforms and a single writer.
+    """
+
+    def __init__(self, source: str, db_path: str, table_name: str, workers: Optional[int] = None,
+                 queue_size: Optional[int] = None, spec: TransformSpec = DEFAULT_SPEC):
+        """
+        Args:
+            source (str): A directory or glob pattern of CSV files.
+            db_path (str): The path to the destination SQLite database file.
+            table_name (str): The table to replace with the combined data.
+            workers (Optional[int]): Transform processes; defaults to the CPU count.
+            queue_size (Optional[int]): Maximum files in flight (being parsed or
+                waiting for the writer); defaults to twice the worker count.
+            spec (TransformSpec): The casts, filters and derived columns to apply.
+        """
+        self.source = source
+        self.db_path = db_path
+        self.table_name = table_name
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = max(queue_size or 2 * self.workers, self.workers)
+        self.spec = spec
+        self.results: List[FileResult] = []
+        print(f"[INFO] ParallelPipeline initialized for '{source}' -> '{db_path}' "
+              f"with {self.workers} workers.")
+
+    def _write(self, loader: SQLiteBulkLoader, outcome) -> FileResult:
+        path, df, rows_read, dropped, error, seconds = outcome
+        rows_loaded = 0
+        if error is None:
+            try:
+                rows_loaded = loader.append(df)
+            except ValueError as e:
+                # Schema mismatch with the files already loaded
+                error = str(e)
+        result = FileResult(path, error is None, rows_read, dropped, rows_loaded, error, seconds)
+        loader.execute(FILES_INSERT, self._file_row(result))
+        return result
+
+    def _file_row(self, result: FileResult) -> tuple:
+        status = 'ok' if result.ok else 'failed'
+        return (os.path.abspath(result.path), self.table_name, status, result.rows_loaded, result.dropped,
+                result.error, result.seconds, time.time())
+
+    def _record_files(self) -> None:
+        """Writes the `etl_files` rows for every result in a transaction of their own."""
+        with contextlib.closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute(FILES_DDL)
+            conn.executemany(FILES_INSERT, [self._file_row(r) for r in self.results])
+
+    def run(self) -> List[FileResult]:
+        """
+        Processes every matched file and atomically replaces the table with the
+        rows of the files that succeeded.
+
+        Returns:
+            List[FileResult]: One result per file, in completion order.
+        Raises:
+            FileNotFoundError: If no files match the source.
+            ValueError: If every file failed. The table is left as it was, but the
+                failures are still recorded in `etl_files`.
+            sqlite3.Error: If there is an issue with the database operation.
+        """
+        paths = resolve_sources(self.source)
+        if not paths:
+            print(f"[ERROR] No CSV files found for '{self.source}'.")
+            raise FileNotFoundError(self.source)
+        print(f"[INFO] Processing {len(paths)} files...")
+
+        started = time.perf_counter()
+        self.results = []
+        pending = iter(paths)
+        in_flight: Set[Future] = set()
+        all_failed = False
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool, \
+                    SQLiteBulkLoader(self.db_path, self.table_name) as loader:
+                loader.execute(FILES_DDL)
+                while True:
+                    for path in pending:
+                        in_flight.add(pool.submit(transform_file, path, self.spec))
+                        if len(in_flight) >= self.queue_size:
+                            break
+                    if not in_flight:
+                        break
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = self._write(loader, future.result())
+                        self.results.append(result)
+                        if not result.ok:
+                            print(f"[WARNING] {result.path}: {result.error}")
+                    loaded = sum(r.rows_read for r in self.results)
+                    print(f"[PROGRESS] {len(self.results)}/{len(paths)} files "
+                          f"({loaded / (time.perf_counter() - started):,.0f} rows/s)")
+                if not any(r.ok for r in self.results):
+                    all_failed = True
+                    raise ValueError("Every file failed; keeping the existing table.")
+                # The table is replaced, so incremental state for it is void
+                loader.execute(WATERMARK_DDL)
+                loader.execute(f'DELETE FROM "{WATERMARK_TABLE}" WHERE target = ?', (self.table_name,))
+        except sqlite3.Error as e:
+            print(f"[ERROR] Failed to load data into SQLite database: {e}")
+            raise
+        except ValueError:
+            if all_failed:
+                # The load was rolled back, and the failure rows with it
+                self._record_files()
+                print(f"[ERROR] Every file failed; see the '{FILES_TABLE}' table.")
+            raise
+
+        elapsed = time.perf_counter() - started
+        ok = [r for r in self.results if r.ok]
+        rows = sum(r.rows_loaded for r in ok)
+        rate = sum(r.rows_read for r in self.results) / elapsed if elapsed > 0 else float('inf')
+        print(f"[SUCCESS] Loaded {rows:,} rows from {len(ok)}/{len(paths)} files into "
+              f"'{self.table_name}' in {elapsed:.2f}s ({rate:,.0f} rows/s).")
+        return self.results
+
+    def failures(self) -> Dict[str, str]:
+        return {r.path: r.error for r in self.results if not r.ok}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the ETL pipeline over many CSV files in parallel.")
+    parser.add_argument("source", help="Directory or glob pattern of CSV files, e.g. 'drops/*.csv'.")
+    parser.add_argument("--db", default='finance.db', help="Destination SQLite database.")
+    parser.add_argument("--table", default='transactions', help="Destination table.")
+    parser.add_argument("--workers", type=int, default=None, help="Transform processes (default: CPU count).")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="Maximum files in flight (default: 2 x workers).")
+    parser.add_argument("--spec", default=None, help="JSON transform spec (default: amount/tax rules).")
+    args = parser.parse_args()
+
+    pipeline = ParallelPipeline(args.source, args.db, args.table, workers=args.workers,
+                                queue_size=args.queue_size,
+                                spec=TransformSpec.from_file(args.spec) if args.spec else DEFAULT_SPEC)
+    try:
+        pipeline.run()
+    except Exception:
+        print("\n[CRITICAL] The pipeline process was terminated due to a critical error.")
+        sys.exit(1)
+    if pipeline.failures():
+        print(f"[WARNING] {len(pipeline.failures())} files failed; see the '{FILES_TABLE}' table.")
+        sys.exit(2)
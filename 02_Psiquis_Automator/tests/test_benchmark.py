@@ -0,0 +1,56 @@
+import json
+import time
+
+import pandas as pd
+
+import etl_pipeline
+from benchmark import _run_mode, compare, generate_transactions
+
+
+def test_generator_writes_contiguous_ids_across_files(tmp_path):
+    paths = generate_transactions(str(tmp_path / 'drops'), rows=25, files=3, chunk_rows=4, seed=1)
+    frames = [pd.read_csv(path) for path in paths]
+    assert [len(df) for df in frames] == [9, 9, 7]
+    combined = pd.concat(frames)
+    assert combined['transaction_id'].tolist() == list(range(1, 26))
+    assert list(combined.columns) == ['transaction_id', 'date', 'amount', 'description']
+
+
+def test_generator_is_seeded_and_dirties_amounts(tmp_path):
+    a = generate_transactions(str(tmp_path / 'a.csv'), rows=200, dirty_rate=0.5, seed=3)[0]
+    b = generate_transactions(str(tmp_path / 'b.csv'), rows=200, dirty_rate=0.5, seed=3)[0]
+    with open(a) as fa, open(b) as fb:
+        assert fa.read() == fb.read()
+    amounts = pd.to_numeric(pd.read_csv(a, keep_default_na=False)['amount'], errors='coerce')
+    assert 50 < amounts.isna().sum() < 150
+    assert generate_transactions(str(tmp_path / 'c.csv'), rows=50, dirty_rate=0.0)
+    assert pd.to_numeric(pd.read_csv(tmp_path / 'c.csv')['amount']).notna().all()
+
+
+def test_compare_flags_only_regressions_beyond_tolerance(tmp_path):
+    baseline = tmp_path / 'baseline.jsonl'
+    with open(baseline, 'w') as f:
+        for mode, rate in (('full', 900.0), ('full', 1000.0), ('streaming', 1000.0)):
+            f.write(json.dumps({'mode': mode, 'rows': 10, 'rows_per_s': rate}) + '\n')
+    results = [
+        {'mode': 'full', 'rows': 10, 'rows_per_s': 850.0},       # -15% against the latest entry
+        {'mode': 'streaming', 'rows': 10, 'rows_per_s': 950.0},  # -5%: within tolerance
+        {'mode': 'parallel', 'rows': 10, 'rows_per_s': 1.0},     # No baseline
+    ]
+    regressions = compare(results, str(baseline), tolerance=0.10)
+    assert len(regressions) == 1 and regressions[0].startswith('full @ 10 rows')
+
+
+def test_incremental_rerun_is_timed_outside_the_total(tmp_path, monkeypatch):
+    calls = []
+
+    def run_incremental(self):
+        calls.append(self)
+        if len(calls) == 2:
+            time.sleep(0.2)  # The no-op rerun
+        return 5
+
+    monkeypatch.setattr(etl_pipeline.DataPipeline, 'run_incremental', run_incremental)
+    outcome = _run_mode('incremental', str(tmp_path / 'data.csv'), str(tmp_path), 100, None)
+    assert outcome['rows_loaded'] == 5
+    assert outcome['stages_s']['noop_rerun'] >= 0.2 > outcome['stages_s']['total']
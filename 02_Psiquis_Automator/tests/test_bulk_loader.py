@@ -0,0 +1,70 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from bulk_loader import SQLiteBulkLoader, column_values, sqlite_type
+
+
+def _frame(ids, amount=1.0):
+    return pd.DataFrame({
+        'transaction_id': ids,
+        'date': ['2023-01-15'] * len(ids),
+        'amount': [amount] * len(ids),
+    })
+
+
+def _table(db, sql):
+    with sqlite3.connect(db) as conn:
+        return conn.execute(sql).fetchall()
+
+
+def test_loads_chunks_and_builds_indexes(tmp_path):
+    db = str(tmp_path / 'finance.db')
+    with SQLiteBulkLoader(db, 'transactions') as loader:
+        loader.append(_frame([1, 2]))
+        loader.append(_frame([3]))
+    assert loader.rows == 3
+    assert _table(db, 'SELECT transaction_id FROM transactions ORDER BY 1') == [(1,), (2,), (3,)]
+    indexes = {name for (name,) in _table(db, "SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert indexes == {'ix_transactions_date', 'ix_transactions_transaction_id'}
+
+
+def test_failed_load_leaves_the_old_table(tmp_path):
+    db = str(tmp_path / 'finance.db')
+    with SQLiteBulkLoader(db, 'transactions') as loader:
+        loader.append(_frame([1]))
+    with pytest.raises(ValueError):
+        with SQLiteBulkLoader(db, 'transactions') as loader:
+            loader.append(_frame([7, 8]))
+            loader.append(pd.DataFrame({'other': [1]}))  # Column mismatch
+    assert _table(db, 'SELECT transaction_id FROM transactions') == [(1,)]
+    assert not _table(db, "SELECT name FROM sqlite_master WHERE name = 'transactions__staging'")
+
+
+def test_refuses_to_replace_with_nothing(tmp_path):
+    db = str(tmp_path / 'finance.db')
+    with pytest.raises(ValueError):
+        with SQLiteBulkLoader(db, 'transactions'):
+            pass  # e.g. a CSV with a header and no rows
+    # The failed commit released the write lock
+    with sqlite3.connect(db, timeout=0) as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute('ROLLBACK')
+
+
+def test_journal_mode_is_restored_after_the_load(tmp_path):
+    db = str(tmp_path / 'finance.db')
+    with SQLiteBulkLoader(db, 'transactions') as loader:
+        loader.append(_frame([1]))
+        assert loader.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+    assert _table(db, 'PRAGMA journal_mode') == [('delete',)]
+
+
+def test_column_types_and_values():
+    assert sqlite_type('amount', 'int64') == 'REAL'  # Explicit mapping wins
+    assert sqlite_type('count', pd.Series([1]).dtype) == 'INTEGER'
+    assert sqlite_type('ratio', pd.Series([0.5]).dtype) == 'REAL'
+    assert sqlite_type('note', pd.Series(['x']).dtype) == 'TEXT'
+    assert column_values(pd.Series(pd.to_datetime(['2023-01-15 10:00']))) == ['2023-01-15 10:00:00']
+    assert column_values(pd.Series([1, None], dtype='Int64')) == [1, None]
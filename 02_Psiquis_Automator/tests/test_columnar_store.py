@@ -0,0 +1,72 @@
+import os
+
+import pandas as pd
+import pytest
+
+from columnar_store import ColumnarReader, ColumnarWriter, load_manifest
+
+
+def _frame():
+    return pd.DataFrame({
+        'transaction_id': [1, 2, 3, 4],
+        'date': ['2023-01-15', '2023-02-01', '2023-01-20', 'not a date'],
+        'amount': [10.0, 250.0, 40.0, 5.0],
+        'description': ['a', 'b', None, 'd'],
+    })
+
+
+def test_partitions_by_month_and_prunes_by_range(tmp_path):
+    root = str(tmp_path / 'store')
+    with ColumnarWriter(root) as writer:
+        writer.write(_frame())
+    reader = ColumnarReader(root)
+    assert sorted(p['partition'] for p in reader.manifest['parts']) == ['2023-01', '2023-02', 'unknown']
+    assert [p['partition'] for p in reader.parts('2023-01-01', '2023-02-01')] == ['2023-01']
+
+    january = reader.scan(['transaction_id', 'description'], '2023-01-01', '2023-02-01')
+    assert sorted(january['transaction_id']) == [1, 3]
+    assert sorted(january['description']) == ['', 'a']
+
+
+def test_predicates_prune_parts_and_filter_rows(tmp_path):
+    root = str(tmp_path / 'store')
+    with ColumnarWriter(root) as writer:
+        writer.write(_frame())
+    reader = ColumnarReader(root)
+    assert [p['partition'] for p in reader.parts(where=[('amount', '>=', 100)])] == ['2023-02']
+    assert reader.scan(['transaction_id'], where=[('amount', '<', 20)])['transaction_id'].tolist() == [1, 4]
+    assert reader.scan(['amount'], where=[('amount', '>', 1000)]).empty
+    with pytest.raises(KeyError):
+        reader.scan(['missing'])
+
+
+def test_append_and_overwrite(tmp_path):
+    root = str(tmp_path / 'store')
+    with ColumnarWriter(root) as writer:
+        writer.write(_frame())
+    first = {p['path'] for p in load_manifest(root)['parts']}
+    with ColumnarWriter(root, mode='append') as writer:
+        writer.write(_frame().head(1))
+    assert load_manifest(root)['rows'] == 5
+
+    with ColumnarWriter(root) as writer:
+        writer.write(_frame().head(2))
+    manifest = load_manifest(root)
+    assert manifest['rows'] == 2
+    # Parts retired by the overwrite are deleted
+    assert not any(os.path.exists(os.path.join(root, path)) for path in first)
+
+
+def test_aborted_write_is_invisible(tmp_path):
+    root = str(tmp_path / 'store')
+    with ColumnarWriter(root) as writer:
+        writer.write(_frame())
+    with pytest.raises(RuntimeError):
+        with ColumnarWriter(root, buffer_rows=1) as writer:
+            writer.write(_frame())
+            raise RuntimeError('load failed')
+    assert load_manifest(root)['rows'] == 4
+    parts = {p['path'] for p in load_manifest(root)['parts']}
+    on_disk = {os.path.join('data', d, p) for d in os.listdir(os.path.join(root, 'data'))
+               for p in os.listdir(os.path.join(root, 'data', d))}
+    assert on_disk == parts
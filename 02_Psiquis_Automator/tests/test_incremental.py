@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+from etl_pipeline import DataPipeline
+from transform_spec import TransformSpec
+
+HEADER = "transaction_id,date,amount,description\n"
+
+
+def _write(path, text, mode='w', age=None):
+    with open(path, mode) as f:
+        f.write(text)
+    if age is not None:
+        past = time.time() - age
+        os.utime(path, (past, past))
+
+
+def _rows(db):
+    with sqlite3.connect(db) as conn:
+        return dict(conn.execute('SELECT transaction_id, amount FROM transactions').fetchall())
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / 'data.csv'), str(tmp_path / 'finance.db')
+
+
+def _pipeline(csv, db, **kwargs):
+    return DataPipeline(csv, db, 'transactions', incremental=True, **kwargs)
+
+
+def test_appends_are_upserted_once(paths):
+    csv, db = paths
+    _write(csv, HEADER + "1,2023-01-15,10.0,a\n2,2023-01-16,20.0,b\n")
+    assert _pipeline(csv, db).run_incremental() == 2
+    assert _pipeline(csv, db).run_incremental() == 0
+
+    _write(csv, "2,2023-01-16,25.0,b fixed\n3,2023-01-17,30.0,c\n", mode='a')
+    assert _pipeline(csv, db).run_incremental() == 2
+    assert _rows(db) == {1: 10.0, 2: 25.0, 3: 30.0}
+
+
+def test_delta_is_parsed_in_chunks(paths):
+    csv, db = paths
+    _write(csv, HEADER + ''.join(f"{i},2023-01-15,{i}.5,row\n" for i in range(1, 101)))
+    assert _pipeline(csv, db, chunk_size=7).run_incremental() == 100
+    assert len(_rows(db)) == 100
+
+
+def test_unterminated_last_row_waits_for_the_file_to_settle(paths):
+    csv, db = paths
+    _write(csv, HEADER + "1,2023-01-15,10.0,a\n", age=60)
+    _pipeline(csv, db).run_incremental()
+
+    # Appended just now, without a trailing newline: may still be being written
+    _write(csv, "1,2023-01-15,11.0,a updated", mode='a')
+    assert _pipeline(csv, db).run_incremental() == 0
+    assert _rows(db) == {1: 10.0}
+
+    # Once the file has settled the row counts as complete, and is not skipped as unchanged
+    past = time.time() - 60
+    os.utime(csv, (past, past))
+    assert _pipeline(csv, db).run_incremental() == 1
+    assert _rows(db) == {1: 11.0}
+    assert _pipeline(csv, db).run_incremental() == 0
+
+
+def test_unterminated_row_is_reread_when_completed(paths):
+    csv, db = paths
+    _write(csv, HEADER + "1,2023-01-15,10.0,a\n2,2023-01-16,2", age=60)
+    assert _pipeline(csv, db).run_incremental() == 2
+    assert _rows(db)[2] == 2.0
+
+    _write(csv, "0.0,b\n3,2023-01-17,30.0,c\n", mode='a', age=60)
+    assert _pipeline(csv, db).run_incremental() == 2
+    assert _rows(db) == {1: 10.0, 2: 20.0, 3: 30.0}
+
+
+def test_full_load_with_duplicate_keys_switches_to_upserts(paths):
+    csv, db = paths
+    _write(csv, HEADER + "1,2023-01-15,10.0,a\n1,2023-01-15,12.0,a again\n2,2023-01-16,20.0,b\n")
+    DataPipeline(csv, db, 'transactions').run()
+
+    other = csv.replace('data.csv', 'more.csv')
+    _write(other, HEADER + "3,2023-01-17,30.0,c\n")
+    assert _pipeline(other, db).run_incremental() == 1
+    assert _rows(db) == {1: 12.0, 2: 20.0, 3: 30.0}
+
+
+def test_spec_output_without_the_key_still_upserts(paths):
+    csv, db = paths
+    spec = TransformSpec(casts={'amount': 'numeric'}, derived={'tax': 'amount * 0.15'},
+                         output=['date', 'amount', 'tax'])
+    _write(csv, HEADER + "1,2023-01-15,10.0,a\n2,2023-01-16,20.0,b\n")
+    assert _pipeline(csv, db, spec=spec).run_incremental() == 2
+    _write(csv, "2,2023-01-16,25.0,b fixed\n", mode='a')
+    assert _pipeline(csv, db, spec=spec).run_incremental() == 1
+    assert _rows(db) == {1: 10.0, 2: 25.0}
+    with sqlite3.connect(db) as conn:
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(transactions)')]
+    assert columns == ['date', 'amount', 'tax', 'transaction_id']
@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+
+from parallel_etl import FILES_TABLE, ParallelPipeline, resolve_sources
+
+HEADER = "transaction_id,date,amount,description\n"
+
+
+@pytest.fixture
+def drops(tmp_path):
+    directory = tmp_path / 'drops'
+    directory.mkdir()
+    (directory / 'day1.csv').write_text(HEADER + "1,2023-01-15,10.0,a\n2,2023-01-15,oops,b\n")
+    (directory / 'day2.csv').write_text(HEADER + "3,2023-01-16,20.0,c\n")
+    (directory / 'broken.csv').write_text("transaction_id,date\n4,2023-01-17\n")
+    (directory / 'notes.txt').write_text("not a drop")
+    return directory
+
+
+def test_resolves_directories_and_globs(drops):
+    names = [p.rsplit('/', 1)[-1] for p in resolve_sources(str(drops))]
+    assert names == ['broken.csv', 'day1.csv', 'day2.csv']
+    assert len(resolve_sources(str(drops / 'day*.csv'))) == 2
+
+
+def test_loads_good_files_and_records_every_outcome(drops, tmp_path):
+    db = str(tmp_path / 'finance.db')
+    pipeline = ParallelPipeline(str(drops), db, 'transactions', workers=2, queue_size=2)
+    results = pipeline.run()
+    assert len(results) == 3
+    assert list(pipeline.failures()) == [str(drops / 'broken.csv')]
+    with sqlite3.connect(db) as conn:
+        rows = conn.execute('SELECT transaction_id, tax FROM transactions ORDER BY 1').fetchall()
+        files = dict(conn.execute(f'SELECT source, status FROM "{FILES_TABLE}"').fetchall())
+    assert rows == [(1, pytest.approx(1.5)), (3, pytest.approx(3.0))]
+    assert sorted(files.values()) == ['failed', 'ok', 'ok']
+
+
+def test_no_matching_files(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ParallelPipeline(str(tmp_path / '*.csv'), str(tmp_path / 'finance.db'), 'transactions', workers=1).run()
+
+
+def test_failures_are_recorded_when_every_file_fails(drops, tmp_path):
+    db = str(tmp_path / 'finance.db')
+    with pytest.raises(ValueError):
+        ParallelPipeline(str(drops / 'broken.csv'), db, 'transactions', workers=1).run()
+    with sqlite3.connect(db) as conn:
+        files = conn.execute(f'SELECT source, status, error FROM "{FILES_TABLE}"').fetchall()
+        tables = conn.execute("SELECT name FROM sqlite_master WHERE name = 'transactions'").fetchall()
+    assert [(source, status) for source, status, _ in files] == [(str(drops / 'broken.csv'), 'failed')]
+    assert "amount" in files[0][2] and tables == []
@@ -0,0 +1,47 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+from etl_pipeline import DataPipeline
+from transform_spec import TransformSpec
+
+HEADER = "transaction_id,date,amount,description\n"
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'etl_pipeline.py')
+
+
+def _csv(path, rows=50):
+    lines = [f"{i},2023-01-{i % 28 + 1:02d},{'bad' if i % 7 == 0 else f'{i}.25'},row {i}\n" for i in range(1, rows + 1)]
+    path.write_text(HEADER + ''.join(lines))
+    return str(path)
+
+
+def _dump(db):
+    with sqlite3.connect(db) as conn:
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(transactions)')]
+        return columns, conn.execute('SELECT * FROM transactions ORDER BY transaction_id').fetchall()
+
+
+def test_chunked_load_matches_one_shot(tmp_path):
+    csv = _csv(tmp_path / 'data.csv')
+    spec = TransformSpec(casts={'amount': 'numeric'}, filters=['amount > 5'], derived={'tax': 'amount * 0.15'})
+    one_shot, chunked = str(tmp_path / 'one.db'), str(tmp_path / 'chunked.db')
+    DataPipeline(csv, one_shot, 'transactions', spec=spec).run()
+    # A chunk size that does not divide the row count, so the last chunk is short
+    assert DataPipeline(csv, chunked, 'transactions', spec=spec).run_streaming(chunk_size=8) == 39
+    assert _dump(chunked) == _dump(one_shot)
+    columns, rows = _dump(chunked)
+    assert columns == ['transaction_id', 'date', 'amount', 'description', 'tax'] and len(rows) == 39
+
+
+def test_cli_loads_the_given_file_without_overwriting_it(tmp_path):
+    csv = _csv(tmp_path / 'drop.csv', rows=10)
+    with open(csv) as f:
+        original = f.read()
+    db = str(tmp_path / 'out.db')
+    subprocess.run([sys.executable, SCRIPT, '--csv', csv, '--db', db, '--chunk-size', '3'],
+                   cwd=tmp_path, check=True, capture_output=True)
+    with open(csv) as f:
+        assert f.read() == original
+    assert not (tmp_path / 'data.csv').exists()
+    assert len(_dump(db)[1]) == 9
@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from transform_spec import DEFAULT_SPEC, TransformSpec, references
+
+
+def test_references_skip_strings_and_attributes():
+    assert references("date.dt.year == 2023 and description != 'amount'") == {'date', 'description'}
+
+
+def test_default_spec_drops_bad_amounts_and_adds_tax():
+    df = pd.DataFrame({'transaction_id': [1, 2, 3], 'amount': ['10', 'oops', '20']})
+    out, dropped = DEFAULT_SPEC.apply(df)
+    assert dropped == 1
+    assert out['transaction_id'].tolist() == [1, 3]
+    assert out['tax'].tolist() == pytest.approx([1.5, 3.0])
+
+
+def test_filters_use_derived_columns_and_output_prunes():
+    spec = TransformSpec.from_dict({
+        'casts': {'amount': 'numeric', 'date': 'datetime'},
+        'filters': ['net > 5'],
+        'derived': {'net': 'amount - fee', 'year': 'date.dt.year', 'unused': 'amount * 2'},
+        'output': ['transaction_id', 'net', 'year'],
+    })
+    pre, post, source, _ = spec._compile()
+    assert pre == ['net'] and post == ['year']
+    assert source == {'transaction_id', 'amount', 'fee', 'date'}
+    df = pd.DataFrame({
+        'transaction_id': [1, 2, 3],
+        'amount': [10, 3, 12],
+        'fee': [1, 1, 1],
+        'date': ['2023-01-15', '2024-02-01', 'not a date'],
+    })
+    out, dropped = spec.apply(df)
+    assert dropped == 2
+    assert out.columns.tolist() == ['transaction_id', 'net', 'year']
+    assert out.values.tolist() == [[1, 9, 2023]]
+
+
+def test_read_options_push_strict_casts_and_columns():
+    spec = TransformSpec(casts={'transaction_id': 'int64', 'amount': 'numeric'}, output=['transaction_id', 'amount'])
+    options = spec.read_options(extra=['key'])
+    assert options['dtype'] == {'transaction_id': 'int64'}
+    usecols = options['usecols']
+    assert usecols('key') and usecols('amount') and not usecols('description')
+
+
+def test_missing_required_column():
+    with pytest.raises(KeyError, match='amount'):
+        DEFAULT_SPEC.apply(pd.DataFrame({'transaction_id': [1]}))
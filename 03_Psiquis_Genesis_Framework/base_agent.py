@@ -1,24 +1,89 @@
-import uuid
 import abc
+import itertools
 import logging
+import os
+import time
 from typing import Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+
+_root_logger = logging.getLogger("GenesisAgent")
+_class_loggers: Dict[type, logging.Logger] = {}
+
+# Ids are a per-process prefix plus a counter: unique across processes,
+# and much cheaper than a uuid4 per agent
+_id_prefix = f"{os.getpid():x}{os.urandom(4).hex()}"
+_id_counter = itertools.count(1)
+
+
+class AgentLogger(logging.LoggerAdapter):
+    """
+    Prefixes messages with the agent id. One logger is shared per agent
+    class, so agents do not each add an entry to the logging registry.
+    """
+
+    def process(self, msg, kwargs):
+        kwargs.setdefault('extra', self.extra)  # Also available to formatters as %(agent_id)s
+        return f"[{self.extra['agent_id']}] {msg}", kwargs
+
 
 class GenesisAgent(abc.ABC):
     """
     Abstract Base Class for all autonomous agents within the Psiquis Genesis Framework.
     Enforces strict typing, lifecycle management, and neural fabric connectivity.
+
+    The core state lives in __slots__ and the logger and vector memory are
+    only created when first used, so an idle agent costs a few hundred
+    bytes. Subclasses should declare their own __slots__ to stay compact.
     """
-    
+
+    __slots__ = ('id', 'config', 'state', '_created', '_logger', '_memory', '__weakref__')
+
     def __init__(self, agent_id: Optional[str] = None, config: Dict[str, Any] = None):
-        self.id = agent_id or str(uuid.uuid4())
+        self.id = agent_id or f"{_id_prefix}-{next(_id_counter)}"
         self.config = config or {}
-        self.created_at = datetime.utcnow()
         self.state = "INITIALIZED"
-        self.memory_vector = []  # Placeholder for vector embeddings
-        
-        self.logger = logging.getLogger(f"GenesisAgent.{self.__class__.__name__}.{self.id}")
-        self.logger.info(f"Agent initialized with config: {self.config.keys()}")
+        self._created = time.time()
+        self._logger = None  # AgentLogger, created on first use
+        self._memory = None  # VectorMemory, created on first use
+
+        if _root_logger.isEnabledFor(logging.INFO):
+            self.logger.info(f"Agent initialized with config: {self.config.keys()}")
+
+    @property
+    def created_at(self) -> datetime:
+        """Creation time as a naive UTC datetime."""
+        return datetime.fromtimestamp(self._created, timezone.utc).replace(tzinfo=None)
+
+    @property
+    def logger(self) -> AgentLogger:
+        if self._logger is None:
+            cls = type(self)
+            base = _class_loggers.get(cls)
+            if base is None:
+                base = _class_loggers[cls] = logging.getLogger(f"GenesisAgent.{cls.__name__}")
+            self._logger = AgentLogger(base, {'agent_id': self.id})
+        return self._logger
+
+    @property
+    def memory_vector(self):
+        """
+        The agent's embedding memory (a VectorMemory). Created on first use
+        from config 'memory_dim' (default 384), 'memory_capacity' (default
+        10000) and 'memory_eviction' ('lru' or 'ring'); assign one VectorMemory
+        to several agents to share it.
+        """
+        if self._memory is None:
+            from .vector_memory import LRU, VectorMemory
+            self._memory = VectorMemory(
+                self.config.get('memory_dim', 384),
+                self.config.get('memory_capacity', 10_000),
+                eviction=self.config.get('memory_eviction', LRU),
+            )
+        return self._memory
+
+    @memory_vector.setter
+    def memory_vector(self, memory):
+        self._memory = memory
 
     @abc.abstractmethod
     async def perceive(self, environment_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,134 @@
+"""
+Agent runtime benchmark: memory per agent and registry throughput.
+
+Creates N lightweight agents, registers them with a GenesisEngine, looks
+each one up by id, queries by type and unregisters them all, reporting
+operations per second for each step. Memory per agent is measured with
+tracemalloc in a separate pass, for the bare agents and for what the
+engine adds on top (registry and scheduler entries).
+
+    python -m 03_Psiquis_Genesis_Framework.benchmark --agents 10000 100000
+"""
+
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from typing import Any, Dict, List, Sequence
+
+from .base_agent import GenesisAgent
+from .genesis_core import GenesisEngine
+
+
+class IdleAgent(GenesisAgent):
+    __slots__ = ()
+
+    async def perceive(self, environment_data):
+        return environment_data
+
+    async def reason(self, context):
+        return context
+
+    async def act(self, decision):
+        pass
+
+
+class OtherAgent(IdleAgent):
+    __slots__ = ()
+
+
+def _make_agents(n: int) -> List[GenesisAgent]:
+    # Every tenth agent has a different type, so by_type() has something to skip
+    return [OtherAgent() if i % 10 == 0 else IdleAgent() for i in range(n)]
+
+
+def _rate(n: int, seconds: float) -> float:
+    return n / seconds if seconds > 0 else float('inf')
+
+
+def _measure_memory(n: int, rate_hz: float) -> Dict[str, float]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        agents = _make_agents(n)
+        after_agents = tracemalloc.get_traced_memory()[0]
+        engine = GenesisEngine(verbose=False)
+        for agent in agents:
+            engine.register_agent(agent, rate_hz)
+        after_engine = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return {
+        'bytes_per_agent': (after_agents - before) / n,
+        'engine_bytes_per_agent': (after_engine - after_agents) / n,
+    }
+
+
+def run(n: int, rate_hz: float) -> Dict[str, Any]:
+    timings: Dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    agents = _make_agents(n)
+    timings['create_per_s'] = _rate(n, time.perf_counter() - t0)
+
+    engine = GenesisEngine(verbose=False)
+    t0 = time.perf_counter()
+    for agent in agents:
+        engine.register_agent(agent, rate_hz)
+    timings['register_per_s'] = _rate(n, time.perf_counter() - t0)
+
+    ids = [agent.id for agent in agents]
+    t0 = time.perf_counter()
+    for agent_id in ids:
+        engine.get_agent(agent_id)
+    timings['lookup_per_s'] = _rate(n, time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    others = engine.agents.by_type(OtherAgent)
+    timings['by_type_ms'] = (time.perf_counter() - t0) * 1e3
+    assert len(others) == len(range(0, n, 10))
+
+    t0 = time.perf_counter()
+    for agent_id in ids:
+        engine.unregister_agent(agent_id)
+    timings['unregister_per_s'] = _rate(n, time.perf_counter() - t0)
+    assert len(engine.agents) == 0
+
+    del agents, engine
+    return {'agents': n, 'rate_hz': rate_hz, **timings, **_measure_memory(n, rate_hz)}
+
+
+def benchmark(sizes: Sequence[int], rate_hz: float) -> List[Dict[str, Any]]:
+    results = []
+    print(f"{'AGENTS':>10}{'B/AGENT':>10}{'ENGINE B':>10}{'CREATE/S':>12}{'REGISTER/S':>12}"
+          f"{'LOOKUP/S':>12}{'UNREG/S':>12}{'BY_TYPE':>10}")
+    for n in sizes:
+        result = run(n, rate_hz)
+        result.update(timestamp=time.time(), python=platform.python_version())
+        results.append(result)
+        print(f"{n:>10,}{result['bytes_per_agent']:>10.0f}{result['engine_bytes_per_agent']:>10.0f}"
+              f"{result['create_per_s']:>12,.0f}{result['register_per_s']:>12,.0f}"
+              f"{result['lookup_per_s']:>12,.0f}{result['unregister_per_s']:>12,.0f}"
+              f"{result['by_type_ms']:>8.2f}ms")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark agent memory and registry throughput.")
+    parser.add_argument("--agents", type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                        help="Agent counts to benchmark (default: 1k 10k 100k).")
+    parser.add_argument("--rate-hz", type=float, default=1.0,
+                        help="Rate agents are registered with; 0 = event-driven (default 1).")
+    parser.add_argument("--output", default=None, help="JSON-lines file to append results to.")
+    args = parser.parse_args()
+
+    results = benchmark(args.agents, args.rate_hz)
+    if args.output:
+        with open(args.output, 'a') as f:
+            for result in results:
+                f.write(json.dumps(result) + '\n')
+        print(f"[SUCCESS] {len(results)} results appended to '{args.output}'.")
@@ -1,6 +1,11 @@
 import asyncio
-from typing import List
+import time
+from typing import Any, Dict, List, Optional
 from .base_agent import GenesisAgent
+from .message_bus import COALESCE_LATEST, MessageBus, Subscription
+from .profiler import TickProfiler
+from .registry import AgentRegistry
+from .scheduler import MultiRateScheduler
 
 class GenesisEngine:
     """
@@ -8,37 +13,134 @@ class GenesisEngine:
     Manages agent lifecycles, resource allocation, and inter-agent communication protocols.
     """
     
-    def __init__(self):
-        self.agents: List[GenesisAgent] = []
-        self.tick_rate = 60  # Hz
+    def __init__(self, tick_rate: float = 60, verbose: bool = True):
+        self.agents = AgentRegistry()
+        self.tick_rate = tick_rate  # Hz, default rate for agents registered without one
+        self.verbose = verbose      # Print a line per agent (un)registration
         self.is_running = False
+        self.bus = MessageBus()
+        self.inboxes: Dict[str, List[Subscription]] = {}
+        self.scheduler = MultiRateScheduler(collect_inputs=self._collect_messages)
+        self.profiler: Optional[TickProfiler] = None
 
-    def register_agent(self, agent: GenesisAgent):
+    def register_agent(self, agent: GenesisAgent, rate_hz: Optional[float] = None, priority: Optional[int] = None):
         """
         Registers a new agent into the active runtime.
+        The rate and priority default to the agent's config ('rate_hz', 'priority'),
+        then to the engine tick rate and 0. A rate of 0 makes the agent purely
+        event-driven: it only runs when notify() delivers input.
+
+        Raises:
+            ValueError: If an agent with the same id is already registered.
+        """
+        if rate_hz is None:
+            rate_hz = agent.config.get('rate_hz', self.tick_rate)
+        if priority is None:
+            priority = agent.config.get('priority', 0)
+        self.agents.add(agent)
+        self.scheduler.add(agent, rate_hz, priority)
+        if self.verbose:
+            print(f"[KERNEL] Registering agent: {agent.id} ({type(agent).__name__}) "
+                  f"@ {rate_hz or 'event-driven'}{' Hz' if rate_hz else ''}, priority {priority}")
+
+    def unregister_agent(self, agent_id: str) -> Optional[GenesisAgent]:
+        """
+        Removes an agent from the runtime, along with its bus subscriptions.
+        """
+        agent = self.agents.remove(agent_id)
+        if agent is None:
+            return None
+        self.scheduler.remove(agent_id)
+        if self.profiler is not None:
+            self.profiler.forget(agent_id)
+        for subscription in self.inboxes.pop(agent_id, ()):
+            subscription.close()
+        if self.verbose:
+            print(f"[KERNEL] Unregistered agent: {agent_id}")
+        return agent
+
+    def get_agent(self, agent_id: str) -> Optional[GenesisAgent]:
+        return self.agents.get(agent_id)
+
+    def subscribe_agent(self, agent: GenesisAgent, pattern: str, maxsize: int = 1024,
+                        policy: str = COALESCE_LATEST) -> Subscription:
+        """
+        Subscribes a registered agent to a bus topic (or glob pattern). Each
+        delivery wakes the agent, and its next perceive() receives the queued
+        messages under environment_data['messages'].
         """
-        print(f"[KERNEL] Registering agent: {agent.id} ({type(agent).__name__})")
-        self.agents.append(agent)
+        subscription = self.bus.subscribe(
+            pattern, maxsize, policy, listener=lambda _: self.scheduler.notify(agent.id))
+        self.inboxes.setdefault(agent.id, []).append(subscription)
+        return subscription
+
+    def _collect_messages(self, agent_id: str) -> List[Any]:
+        messages = []
+        for subscription in self.inboxes.get(agent_id, ()):
+            messages.extend(subscription.drain())
+        return messages
+
+    def notify(self, agent_id: str, data: Optional[Dict[str, Any]] = None):
+        """
+        Delivers new environment data to an agent and wakes it immediately.
+        """
+        self.scheduler.notify(agent_id, data)
+
+    def enable_profiling(self, history: int = 4096, lag_interval: float = 0.05,
+                         sample_interval: Optional[float] = None) -> TickProfiler:
+        """
+        Starts recording tick, phase, per-agent and event-loop lag timings
+        (see TickProfiler). Ticks are checked against a 1 / tick_rate budget.
+        With `sample_interval`, the loop's stack is also sampled for flame
+        graphs; call this from the thread that runs run_loop().
+        """
+        self.profiler = TickProfiler(self.tick_rate, history, lag_interval)
+        self.scheduler.profiler = self.profiler
+        if sample_interval:
+            self.profiler.start_sampling(sample_interval)
+        return self.profiler
+
+    def disable_profiling(self) -> Optional[TickProfiler]:
+        profiler, self.profiler = self.profiler, None
+        self.scheduler.profiler = None
+        if profiler is not None:
+            profiler.stop_sampling()
+        return profiler
+
+    def stop(self):
+        self.is_running = False
+        self.scheduler.wake()
 
     async def run_loop(self):
         """
-        Main event loop. Synchronizes agent perception and action cycles.
+        Main event loop. Each wakeup runs the perceive -> reason -> act cycle of
+        the agents whose period expired or whose inputs changed, then sleeps
+        until the next deadline or notification (see MultiRateScheduler).
         """
         self.is_running = True
         print("[KERNEL] Genesis Engine Online. Neural Fabric Active.")
-        
-        while self.is_running:
-            # 1. Perception Phase
-            perception_tasks = [agent.perceive({}) for agent in self.agents]
-            await asyncio.gather(*perception_tasks)
-            
-            # 2. Reasoning Phase
-            # ... (Complex orchestration logic would go here)
-            
-            # 3. Action Phase
-            # ...
-            
-            await asyncio.sleep(1 / self.tick_rate)
+        lag_monitor = None
+
+        try:
+            while self.is_running:
+                profiler = self.profiler
+                if profiler is not None and lag_monitor is None:
+                    lag_monitor = asyncio.get_running_loop().create_task(profiler.monitor_lag())
+                await self.scheduler.wait()
+                if not self.is_running:
+                    break
+                due = self.scheduler.collect_due()
+                if not due:
+                    continue
+                if profiler is None:
+                    await self.scheduler.dispatch(due)
+                else:
+                    started = time.perf_counter()
+                    await self.scheduler.dispatch(due)
+                    profiler.record_tick(started, time.perf_counter() - started, len(due))
+        finally:
+            if lag_monitor is not None:
+                lag_monitor.cancel()
 
 if __name__ == "__main__":
     # Example Usage
@@ -0,0 +1,387 @@
+import asyncio
+import fnmatch
+import json
+import os
+import struct
+import time
+from collections import OrderedDict, deque
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy payloads are optional
+    np = None
+
+# Backpressure policies for a full subscriber queue
+DROP_OLDEST = 'drop_oldest'        # Discard the oldest queued message
+BLOCK = 'block'                    # Make the publisher wait for space
+COALESCE_LATEST = 'coalesce_latest'  # Keep only the newest message per topic
+
+
+def freeze(payload: Any) -> Any:
+    """
+    Returns a read-only view of `payload` without copying its data, so one
+    object can be shared by every subscriber. Dicts become mapping proxies,
+    lists tuples, NumPy arrays non-writeable views and bytearrays read-only
+    memoryviews; immutable values are returned as-is. Freezing is shallow:
+    publishers must not mutate nested containers after publishing.
+    """
+    if isinstance(payload, MappingProxyType):
+        return payload
+    if isinstance(payload, dict):
+        return MappingProxyType(payload)
+    if isinstance(payload, list):
+        return tuple(payload)
+    if isinstance(payload, bytearray):
+        return memoryview(payload).toreadonly()
+    if isinstance(payload, memoryview):
+        return payload.toreadonly()
+    if np is not None and isinstance(payload, np.ndarray):
+        if not payload.flags.writeable:
+            return payload
+        view = payload.view()
+        view.flags.writeable = False
+        return view
+    return payload
+
+
+class Message:
+    """
+    One published message. The same instance is delivered to every subscriber.
+    """
+
+    __slots__ = ('topic', 'payload', 'seq', 'timestamp')
+
+    def __init__(self, topic: str, payload: Any, seq: int, timestamp: float):
+        self.topic = topic
+        self.payload = payload
+        self.seq = seq
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"Message(topic={self.topic!r}, seq={self.seq})"
+
+
+class Subscription:
+    """
+    A bounded per-subscriber queue fed by the bus.
+    """
+
+    def __init__(self, bus: 'MessageBus', pattern: str, maxsize: int = 1024, policy: str = DROP_OLDEST,
+                 listener: Optional[Callable[['Subscription'], None]] = None):
+        if policy not in (DROP_OLDEST, BLOCK, COALESCE_LATEST):
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        self.bus = bus
+        self.pattern = pattern
+        self.maxsize = maxsize
+        self.policy = policy
+        self.listener = listener  # Called after every delivery, e.g. to wake an agent
+        self.delivered = 0
+        self.dropped = 0
+        self._queue = OrderedDict() if policy == COALESCE_LATEST else deque()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+
+    def matches(self, topic: str) -> bool:
+        return self.pattern == topic or fnmatch.fnmatchcase(topic, self.pattern)
+
+    def __len__(self):
+        return len(self._queue)
+
+    def full(self) -> bool:
+        return len(self._queue) >= self.maxsize
+
+    def _put(self, message: Message) -> bool:
+        """Enqueues without waiting; returns False only for a full BLOCK queue."""
+        queue = self._queue
+        if self.policy == COALESCE_LATEST:
+            if message.topic in queue:
+                queue.pop(message.topic)
+                self.dropped += 1
+            elif len(queue) >= self.maxsize:
+                queue.popitem(last=False)
+                self.dropped += 1
+            queue[message.topic] = message
+        elif len(queue) >= self.maxsize:
+            if self.policy == BLOCK:
+                self._writable.clear()
+                return False
+            queue.popleft()
+            self.dropped += 1
+            queue.append(message)
+        else:
+            queue.append(message)
+        self.delivered += 1
+        self._readable.set()
+        if self.listener is not None:
+            self.listener(self)
+        return True
+
+    async def _put_wait(self, message: Message) -> None:
+        while not self._put(message):
+            await self._writable.wait()
+
+    def get_nowait(self) -> Message:
+        if not self._queue:
+            raise asyncio.QueueEmpty
+        if self.policy == COALESCE_LATEST:
+            message = self._queue.popitem(last=False)[1]
+        else:
+            message = self._queue.popleft()
+        if not self._queue:
+            self._readable.clear()
+        self._writable.set()
+        return message
+
+    async def get(self) -> Message:
+        while not self._queue:
+            await self._readable.wait()
+        return self.get_nowait()
+
+    def drain(self) -> List[Message]:
+        """Returns and removes everything queued."""
+        if self.policy == COALESCE_LATEST:
+            messages = list(self._queue.values())
+        else:
+            messages = list(self._queue)
+        self._queue.clear()
+        self._readable.clear()
+        self._writable.set()
+        return messages
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Message:
+        return await self.get()
+
+
+class MessageBus:
+    """
+    In-process topic pub/sub. Payloads are frozen once on publish and the
+    same Message object is handed to every matching subscriber, so fan-out
+    costs one queue append per subscriber and no copies. Subscriptions match
+    a topic exactly or by glob pattern ('market.*').
+    """
+
+    def __init__(self):
+        self.subscriptions: List[Subscription] = []
+        self._routes: Dict[str, List[Subscription]] = {}
+        self._seq = 0
+        self.published = 0
+
+    def subscribe(self, pattern: str, maxsize: int = 1024, policy: str = DROP_OLDEST,
+                  listener: Optional[Callable[[Subscription], None]] = None) -> Subscription:
+        subscription = Subscription(self, pattern, maxsize, policy, listener)
+        self.subscriptions.append(subscription)
+        self._routes.clear()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+            self._routes.clear()
+
+    def _route(self, topic: str) -> List[Subscription]:
+        route = self._routes.get(topic)
+        if route is None:
+            route = self._routes[topic] = [s for s in self.subscriptions if s.matches(topic)]
+        return route
+
+    def _message(self, topic: str, payload: Any) -> Message:
+        self._seq += 1
+        self.published += 1
+        return Message(topic, freeze(payload), self._seq, time.time())
+
+    def publish_nowait(self, topic: str, payload: Any) -> Message:
+        """
+        Publishes from synchronous code. A full BLOCK subscriber raises
+        asyncio.QueueFull before anything is delivered or a sequence number
+        is taken, so the message is either published to every subscriber or
+        not at all; use publish() to wait for space instead.
+        """
+        route = self._route(topic)
+        for subscription in route:
+            if subscription.policy == BLOCK and subscription.full():
+                raise asyncio.QueueFull(f"Subscriber '{subscription.pattern}' is full")
+        message = self._message(topic, payload)
+        for subscription in route:
+            subscription._put(message)
+        return message
+
+    async def publish(self, topic: str, payload: Any) -> Message:
+        """Publishes, waiting for space in any full BLOCK subscriber."""
+        message = self._message(topic, payload)
+        for subscription in self._route(topic):
+            if not subscription._put(message):
+                await subscription._put_wait(message)
+        return message
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'published': self.published,
+            'subscriptions': [
+                {'pattern': s.pattern, 'policy': s.policy, 'queued': len(s),
+                 'delivered': s.delivered, 'dropped': s.dropped}
+                for s in self.subscriptions
+            ],
+        }
+
+
+# --- Local socket transport -------------------------------------------------
+#
+# Frames are a 4-byte big-endian header length, a JSON header and an optional
+# binary body. JSON payloads travel in the header; bytes and NumPy arrays
+# travel as the raw body and are rebuilt with np.frombuffer on the far side,
+# without another copy. No pickle, so a peer cannot make us execute code.
+
+_LEN = struct.Struct('>I')
+
+
+def _encode(header: Dict[str, Any], payload: Any = None) -> bytes:
+    body = b''
+    if payload is not None:
+        if np is not None and isinstance(payload, np.ndarray):
+            array = np.ascontiguousarray(payload)
+            header.update(kind='ndarray', dtype=array.dtype.str, shape=list(array.shape))
+            body = memoryview(array).cast('B')
+        elif isinstance(payload, (bytes, bytearray, memoryview)):
+            header['kind'] = 'bytes'
+            body = payload
+        else:
+            header.update(kind='json', payload=dict(payload) if isinstance(payload, MappingProxyType) else payload)
+    header['body'] = len(body)
+    encoded = json.dumps(header).encode()
+    return _LEN.pack(len(encoded)) + encoded + bytes(body)
+
+
+async def _read_frame(reader: asyncio.StreamReader):
+    (length,) = _LEN.unpack(await reader.readexactly(_LEN.size))
+    header = json.loads(await reader.readexactly(length))
+    body = await reader.readexactly(header['body']) if header['body'] else b''
+    kind = header.get('kind')
+    if kind == 'ndarray':
+        if np is None:
+            raise RuntimeError("Received a NumPy payload but numpy is not installed")
+        payload = np.frombuffer(body, dtype=np.dtype(header['dtype'])).reshape(header['shape'])
+    elif kind == 'bytes':
+        payload = body
+    else:
+        payload = header.get('payload')
+    return header, payload
+
+
+class BusServer:
+    """
+    Exposes a MessageBus on a Unix domain socket. Remote peers can publish
+    into the bus and subscribe to patterns; each remote subscription gets its
+    own bounded queue with the requested policy, drained by a writer task.
+    """
+
+    def __init__(self, bus: MessageBus, path: str):
+        self.bus = bus
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        os.chmod(self.path, 0o600)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _forward(self, subscription: Subscription, writer: asyncio.StreamWriter) -> None:
+        async for message in subscription:
+            writer.write(_encode({'op': 'message', 'topic': message.topic, 'seq': message.seq,
+                                  'ts': message.timestamp}, message.payload))
+            await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscriptions, forwarders = [], []
+        try:
+            while True:
+                header, payload = await _read_frame(reader)
+                if header['op'] == 'publish':
+                    await self.bus.publish(header['topic'], payload)
+                elif header['op'] == 'subscribe':
+                    subscription = self.bus.subscribe(
+                        header['pattern'], header.get('maxsize', 1024), header.get('policy', DROP_OLDEST))
+                    subscriptions.append(subscription)
+                    forwarders.append(asyncio.create_task(self._forward(subscription, writer)))
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # Peer went away or the server is shutting down
+            pass
+        finally:
+            for task in forwarders:
+                task.cancel()
+            for subscription in subscriptions:
+                subscription.close()
+            writer.close()
+
+
+class RemoteBus:
+    """
+    Client side of BusServer for agents in another process. Received
+    messages are republished into a local MessageBus, so remote topics are
+    consumed exactly like local ones.
+    """
+
+    def __init__(self, path: str, local: Optional[MessageBus] = None):
+        self.path = path
+        self.local = local or MessageBus()
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pump: Optional[asyncio.Task] = None
+        # Overlapping remote subscriptions deliver the same message once per
+        # subscription; recent sequence numbers filter the duplicates.
+        self._recent = deque(maxlen=4096)
+        self._recent_set = set()
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        self._pump = asyncio.create_task(self._receive())
+
+    async def _receive(self) -> None:
+        try:
+            while True:
+                header, payload = await _read_frame(self._reader)
+                if header['op'] == 'message':
+                    seq = header['seq']
+                    if seq in self._recent_set:
+                        continue
+                    if len(self._recent) == self._recent.maxlen:
+                        self._recent_set.discard(self._recent[0])
+                    self._recent.append(seq)
+                    self._recent_set.add(seq)
+                    await self.local.publish(header['topic'], payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    async def publish(self, topic: str, payload: Any) -> None:
+        self._writer.write(_encode({'op': 'publish', 'topic': topic}, payload))
+        await self._writer.drain()
+
+    async def subscribe(self, pattern: str, maxsize: int = 1024, policy: str = DROP_OLDEST) -> Subscription:
+        """Subscribes on the server and returns the matching local subscription."""
+        subscription = self.local.subscribe(pattern, maxsize, policy)
+        self._writer.write(_encode({'op': 'subscribe', 'pattern': pattern, 'maxsize': maxsize, 'policy': policy}))
+        await self._writer.drain()
+        return subscription
+
+    async def close(self) -> None:
+        if self._pump is not None:
+            self._pump.cancel()
+        if self._writer is not None:
+            self._writer.close()
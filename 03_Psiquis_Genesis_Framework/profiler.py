@@ -0,0 +1,232 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Dict, Iterable, List, Optional
+
+PHASES = ('perceive', 'reason', 'act')
+
+
+def summarize(values: Iterable[float]) -> Dict[str, Any]:
+    """Count, mean, p50, p99 and max of a window of durations, in milliseconds."""
+    ordered = sorted(values)
+    if not ordered:
+        return {'count': 0}
+    n = len(ordered)
+    return {
+        'count': n,
+        'mean_ms': sum(ordered) / n * 1e3,
+        'p50_ms': ordered[n // 2] * 1e3,
+        'p99_ms': ordered[min(n - 1, int(n * 0.99))] * 1e3,
+        'max_ms': ordered[-1] * 1e3,
+    }
+
+
+class AgentTimings:
+    """
+    Running totals for one agent. Kept as aggregates rather than windows so
+    the cost stays fixed however many agents are registered.
+    """
+
+    __slots__ = ('agent_type', 'period', 'cycles', 'total', 'worst', 'last', 'overruns', 'failures')
+
+    def __init__(self, agent_type: str, period: Optional[float]):
+        self.agent_type = agent_type
+        self.period = period
+        self.cycles = 0
+        self.total = [0.0, 0.0, 0.0]  # Per phase, in PHASES order
+        self.worst = 0.0              # Longest full cycle
+        self.last = 0.0
+        self.overruns = 0             # Cycles longer than the agent's own period
+        self.failures = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        cycles = self.cycles or 1
+        return {
+            'agent': self.agent_type,
+            'cycles': self.cycles,
+            'failures': self.failures,
+            'overruns': self.overruns,
+            'mean_ms': {phase: total / cycles * 1e3 for phase, total in zip(PHASES, self.total)},
+            'mean_cycle_ms': sum(self.total) / cycles * 1e3,
+            'max_cycle_ms': self.worst * 1e3,
+            'last_cycle_ms': self.last * 1e3,
+        }
+
+
+class StackSampler:
+    """
+    Samples the Python stack of one thread at a fixed interval from a
+    background thread and counts identical stacks. collapsed() renders the
+    counts in the folded format read by flamegraph.pl, speedscope and
+    similar tools ("frame;frame;frame count" per line, root first).
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='genesis-stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{getattr(code, 'co_qualname', code.co_name)} "
+                             f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            with self._lock:
+                self.stacks[';'.join(reversed(names))] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        with self._lock:
+            stacks = self.stacks.most_common()
+        return ''.join(f"{stack} {count}\n" for stack, count in stacks)
+
+
+class TickProfiler:
+    """
+    Low-overhead timing for GenesisEngine.
+
+    Records, in fixed-size ring buffers (the last `history` entries):
+      - every tick (one scheduler wakeup): wall time and agents run; a tick
+        longer than the 1 / tick_rate budget counts as an overrun
+      - every agent cycle, split into perceive / reason / act
+      - event-loop lag: how late a `lag_interval` sleep wakes up
+    Per-agent totals (cycles, mean phase times, worst cycle, overruns of the
+    agent's own period, failures) are kept as running aggregates.
+
+    Phase times are wall times, so an agent that awaits I/O while agents of
+    the same priority run is charged for the wait too. snapshot() summarizes
+    everything; start_sampling() adds a stack sampler for flame graphs.
+    """
+
+    def __init__(self, tick_rate: float = 60, history: int = 4096, lag_interval: float = 0.05):
+        self.budget = 1.0 / tick_rate
+        self.lag_interval = lag_interval
+        self.ticks: deque = deque(maxlen=history)   # (start, duration, agents)
+        self.phases: Dict[str, deque] = {phase: deque(maxlen=history) for phase in PHASES}
+        self.lag: deque = deque(maxlen=history)
+        self.agents: Dict[str, AgentTimings] = {}
+        self.tick_count = 0
+        self.overruns = 0
+        self.sampler: Optional[StackSampler] = None
+        self.started = time.time()
+
+    def record_cycle(self, entry, perceive: float, reason: float, act: float) -> None:
+        timings = self._timings(entry)
+        timings.cycles += 1
+        total = timings.total
+        total[0] += perceive
+        total[1] += reason
+        total[2] += act
+        cycle = perceive + reason + act
+        timings.last = cycle
+        if cycle > timings.worst:
+            timings.worst = cycle
+        if timings.period and cycle > timings.period:
+            timings.overruns += 1
+        self.phases['perceive'].append(perceive)
+        self.phases['reason'].append(reason)
+        self.phases['act'].append(act)
+
+    def record_failure(self, entry) -> None:
+        self._timings(entry).failures += 1
+
+    def _timings(self, entry) -> AgentTimings:
+        timings = self.agents.get(entry.agent.id)
+        if timings is None:
+            timings = self.agents[entry.agent.id] = AgentTimings(type(entry.agent).__name__, entry.period)
+        return timings
+
+    def record_tick(self, started: float, duration: float, agents: int) -> None:
+        self.tick_count += 1
+        if duration > self.budget:
+            self.overruns += 1
+        self.ticks.append((started, duration, agents))
+
+    def forget(self, agent_id: str) -> None:
+        self.agents.pop(agent_id, None)
+
+    async def monitor_lag(self) -> None:
+        """Measures event-loop lag until cancelled. Run as a task on the engine's loop."""
+        while True:
+            expected = time.perf_counter() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.lag.append(max(0.0, time.perf_counter() - expected))
+
+    # --- Sampling ---
+
+    def start_sampling(self, interval: float = 0.005, thread_id: Optional[int] = None) -> StackSampler:
+        """
+        Starts sampling the stack of `thread_id` (default: the calling thread,
+        normally the engine's loop) every `interval` seconds.
+        """
+        self.stop_sampling()
+        self.sampler = StackSampler(thread_id, interval)
+        self.sampler.start()
+        return self.sampler
+
+    def stop_sampling(self) -> None:
+        if self.sampler is not None:
+            self.sampler.stop()
+
+    def write_collapsed(self, path: str) -> int:
+        """Writes the sampled stacks in folded format. Returns the number of samples."""
+        if self.sampler is None:
+            raise RuntimeError("Sampling was never started.")
+        with open(path, 'w') as f:
+            f.write(self.sampler.collapsed())
+        return self.sampler.samples
+
+    # --- Reporting ---
+
+    def slowest(self, top: int = 10, by: str = 'max_cycle_ms') -> List[Dict[str, Any]]:
+        """The `top` agents by a field of AgentTimings.as_dict() (e.g. 'overruns', 'mean_cycle_ms')."""
+        rows = [{'agent_id': agent_id, **timings.as_dict()} for agent_id, timings in self.agents.items()]
+        return sorted(rows, key=lambda row: row[by], reverse=True)[:top]
+
+    def snapshot(self, top: int = 10) -> Dict[str, Any]:
+        ticks = list(self.ticks)
+        return {
+            'uptime_s': time.time() - self.started,
+            'tick_budget_ms': self.budget * 1e3,
+            'ticks': self.tick_count,
+            'overruns': self.overruns,
+            'tick': summarize(duration for _, duration, _ in ticks),
+            'agents_per_tick': sum(n for _, _, n in ticks) / len(ticks) if ticks else 0,
+            'phases': {phase: summarize(window) for phase, window in self.phases.items()},
+            'loop_lag': summarize(self.lag),
+            'slowest_agents': self.slowest(top),
+            'samples': self.sampler.samples if self.sampler else 0,
+        }
+
+    def reset(self) -> None:
+        self.ticks.clear()
+        self.lag.clear()
+        for window in self.phases.values():
+            window.clear()
+        self.agents.clear()
+        self.tick_count = self.overruns = 0
+        self.started = time.time()
@@ -0,0 +1,63 @@
+from typing import Dict, Iterator, List, Optional, Type
+
+from .base_agent import GenesisAgent
+
+
+class AgentRegistry:
+    """
+    Live agents indexed by id and by concrete type. Register, unregister
+    and lookup by id are O(1) dict operations; by_type() returns the agents
+    of one class without scanning the others. Iteration follows registration
+    order.
+    """
+
+    __slots__ = ('_by_id', '_by_type')
+
+    def __init__(self):
+        self._by_id: Dict[str, GenesisAgent] = {}
+        self._by_type: Dict[type, Dict[str, GenesisAgent]] = {}
+
+    def add(self, agent: GenesisAgent) -> None:
+        if agent.id in self._by_id:
+            raise ValueError(f"Agent already registered: {agent.id}")
+        self._by_id[agent.id] = agent
+        cls = type(agent)
+        bucket = self._by_type.get(cls)
+        if bucket is None:
+            bucket = self._by_type[cls] = {}
+        bucket[agent.id] = agent
+
+    def remove(self, agent_id: str) -> Optional[GenesisAgent]:
+        agent = self._by_id.pop(agent_id, None)
+        if agent is not None:
+            bucket = self._by_type[type(agent)]
+            del bucket[agent_id]
+            if not bucket:
+                del self._by_type[type(agent)]
+        return agent
+
+    def get(self, agent_id: str) -> Optional[GenesisAgent]:
+        return self._by_id.get(agent_id)
+
+    def by_type(self, agent_type: Type[GenesisAgent], subclasses: bool = False) -> List[GenesisAgent]:
+        """
+        Agents whose class is `agent_type` or, with `subclasses`, derives from
+        it (this scans the registered classes, not the agents).
+        """
+        if not subclasses:
+            return list(self._by_type.get(agent_type, {}).values())
+        return [agent for cls, bucket in self._by_type.items() if issubclass(cls, agent_type)
+                for agent in bucket.values()]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of agents per class name."""
+        return {cls.__name__: len(bucket) for cls, bucket in self._by_type.items()}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self._by_id
+
+    def __iter__(self) -> Iterator[GenesisAgent]:
+        return iter(self._by_id.values())
@@ -0,0 +1,206 @@
+import asyncio
+import heapq
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .base_agent import GenesisAgent
+
+
+class ScheduledAgent:
+    """
+    Scheduling state for one registered agent.
+    """
+
+    __slots__ = ('agent', 'period', 'priority', 'next_due', 'pending', 'runs',
+                 'missed_deadlines', 'max_lateness', 'last_run', 'busy')
+
+    def __init__(self, agent: GenesisAgent, period: Optional[float], priority: int, now: float):
+        self.agent = agent
+        self.period = period          # Seconds between periodic wakeups; None = event-driven only
+        self.priority = priority      # Higher runs first within a wakeup
+        self.next_due = now + period if period else None
+        self.pending: Optional[Dict[str, Any]] = None  # Latest input not yet perceived
+        self.runs = 0
+        self.missed_deadlines = 0
+        self.max_lateness = 0.0
+        self.last_run = None
+        self.busy = 0.0               # Total seconds spent in this agent's cycles
+
+
+class MultiRateScheduler:
+    """
+    Event-driven, multi-rate scheduler for GenesisEngine.
+
+    Each agent has its own rate (or none, for purely event-driven agents) and
+    priority. An agent runs a perceive -> reason -> act cycle only when its
+    period expires or when new input is delivered with notify(). Deadlines
+    advance by whole periods from the previous deadline rather than from the
+    end of the work, so the effective rate does not drift with work time; a
+    deadline that has already passed when the agent gets to run counts as
+    missed and is skipped rather than replayed in a burst. Between wakeups the
+    loop sleeps until the earliest deadline or the next notify(), so idle
+    agents cost nothing.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic,
+                 collect_inputs: Optional[Callable[[str], List[Any]]] = None):
+        self.clock = clock
+        self.collect_inputs = collect_inputs  # agent_id -> queued messages for its next cycle
+        self.entries: Dict[str, ScheduledAgent] = {}
+        self._heap: List[tuple] = []  # (next_due, -priority, seq, agent_id)
+        self._seq = 0
+        self._dirty: Set[str] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self.profiler = None  # TickProfiler, see GenesisEngine.enable_profiling()
+
+    def add(self, agent: GenesisAgent, rate_hz: Optional[float] = None, priority: int = 0) -> ScheduledAgent:
+        period = 1.0 / rate_hz if rate_hz else None
+        entry = ScheduledAgent(agent, period, priority, self.clock())
+        self.entries[agent.id] = entry
+        if period:
+            self._push(entry)
+        self.wake()
+        return entry
+
+    def remove(self, agent_id: str) -> None:
+        # Heap items of removed agents are discarded lazily when popped
+        self.entries.pop(agent_id, None)
+        self._dirty.discard(agent_id)
+
+    def notify(self, agent_id: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Delivers new input to an agent and wakes it on the next scheduler pass.
+        Inputs that arrive before the agent runs are coalesced (latest keys win).
+        """
+        entry = self.entries.get(agent_id)
+        if entry is None:
+            raise KeyError(f"Unknown agent: {agent_id}")
+        if data:
+            entry.pending = {**entry.pending, **data} if entry.pending else dict(data)
+        self._dirty.add(agent_id)
+        self.wake()
+
+    def _push(self, entry: ScheduledAgent) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (entry.next_due, -entry.priority, self._seq, entry.agent.id))
+
+    def wake(self) -> None:
+        """Interrupts wait(), e.g. so the engine can notice it was stopped."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def next_deadline(self) -> Optional[float]:
+        while self._heap:
+            due, _, _, agent_id = self._heap[0]
+            entry = self.entries.get(agent_id)
+            if entry is not None and entry.next_due == due:
+                return due
+            heapq.heappop(self._heap)  # Stale item
+        return None
+
+    async def wait(self) -> None:
+        """Sleeps until the earliest deadline or the next notify()/add()."""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._dirty:
+            return
+        deadline = self.next_deadline()
+        timeout = None if deadline is None else max(0.0, deadline - self.clock())
+        if timeout == 0.0:
+            return
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._wakeup.clear()
+
+    def collect_due(self) -> List[ScheduledAgent]:
+        """
+        Returns the agents to run now (period expired or input pending),
+        highest priority first, and advances their deadlines.
+        """
+        now = self.clock()
+        due: Dict[str, ScheduledAgent] = {}
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                break
+            agent_id = heapq.heappop(self._heap)[3]
+            entry = self.entries[agent_id]
+            entry.max_lateness = max(entry.max_lateness, now - deadline)
+            self._advance(entry, now)
+            due[agent_id] = entry
+        for agent_id in self._dirty:
+            entry = self.entries.get(agent_id)
+            if entry is not None:
+                due[agent_id] = entry
+        self._dirty.clear()
+        return sorted(due.values(), key=lambda e: -e.priority)
+
+    def _advance(self, entry: ScheduledAgent, now: float) -> None:
+        entry.next_due += entry.period
+        if entry.next_due <= now:
+            # Whole periods that passed while we were busy are missed, not replayed
+            skipped = int((now - entry.next_due) // entry.period) + 1
+            entry.missed_deadlines += skipped
+            entry.next_due += skipped * entry.period
+        self._push(entry)
+
+    async def _cycle(self, entry: ScheduledAgent) -> None:
+        agent = entry.agent
+        started = time.perf_counter()
+        data, entry.pending = entry.pending or {}, None
+        if self.collect_inputs is not None:
+            messages = self.collect_inputs(agent.id)
+            if messages:
+                data = {**data, 'messages': messages}
+        profiler = self.profiler
+        try:
+            if profiler is None:
+                context = await agent.perceive(data)
+                decision = await agent.reason(context)
+                await agent.act(decision)
+            else:
+                t0 = time.perf_counter()
+                context = await agent.perceive(data)
+                t1 = time.perf_counter()
+                decision = await agent.reason(context)
+                t2 = time.perf_counter()
+                await agent.act(decision)
+                profiler.record_cycle(entry, t1 - t0, t2 - t1, time.perf_counter() - t2)
+        except Exception:
+            agent.logger.exception("Agent cycle failed")
+            if profiler is not None:
+                profiler.record_failure(entry)
+        entry.runs += 1
+        entry.last_run = self.clock()
+        entry.busy += time.perf_counter() - started
+
+    async def dispatch(self, entries: List[ScheduledAgent]) -> None:
+        """
+        Runs the cycles of `entries`. Agents of equal priority run concurrently;
+        higher priority levels complete before lower ones start.
+        """
+        start = 0
+        while start < len(entries):
+            priority = entries[start].priority
+            end = start
+            while end < len(entries) and entries[end].priority == priority:
+                end += 1
+            await asyncio.gather(*(self._cycle(entry) for entry in entries[start:end]))
+            start = end
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            agent_id: {
+                'agent': type(entry.agent).__name__,
+                'rate_hz': 1.0 / entry.period if entry.period else None,
+                'priority': entry.priority,
+                'runs': entry.runs,
+                'missed_deadlines': entry.missed_deadlines,
+                'max_lateness_ms': entry.max_lateness * 1e3,
+                'busy_s': entry.busy,
+            }
+            for agent_id, entry in self.entries.items()
+        }
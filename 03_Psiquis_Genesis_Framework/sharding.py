@@ -0,0 +1,385 @@
+import asyncio
+import importlib
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .genesis_core import GenesisEngine
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """
+    How to build an agent inside a worker process. Agents are rebuilt from
+    their spec whenever they are placed on a shard (first start, restart of a
+    crashed worker, rebalancing), so in-memory state does not move with them.
+    """
+    factory: str                        # 'package.module:ClassName', importable by the worker
+    agent_id: str
+    config: Dict[str, Any] = field(default_factory=dict)
+    rate_hz: Optional[float] = None     # Defaults as in GenesisEngine.register_agent
+    priority: Optional[int] = None
+
+
+def build_agent(spec: AgentSpec):
+    module, _, name = spec.factory.partition(':')
+    agent_class = getattr(importlib.import_module(module), name)
+    return agent_class(agent_id=spec.agent_id, config=dict(spec.config))
+
+
+class _Outbox:
+    """
+    Sends a worker's messages to the supervisor from a daemon thread. A send
+    blocks once the pipe buffer is full, until the supervisor reads; done on
+    the event loop, that would also stop the worker from reading commands,
+    and a supervisor blocked sending one of them would never read again.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.queue: queue.Queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name='genesis-shard-outbox', daemon=True)
+        self.thread.start()
+
+    @property
+    def busy(self) -> bool:
+        """Whether earlier messages are still queued or being sent."""
+        return self.queue.unfinished_tasks > 0
+
+    def send(self, message: tuple) -> None:
+        self.queue.put(message)
+
+    def _run(self) -> None:
+        while True:
+            message = self.queue.get()
+            try:
+                if message is None:
+                    return
+                self.conn.send(message)
+            except OSError:
+                return  # The supervisor is gone
+            finally:
+                self.queue.task_done()
+
+    def close(self, timeout: float) -> None:
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+
+def _worker_main(shard_id: int, conn, report_interval: float) -> None:
+    asyncio.run(_serve_shard(shard_id, conn, report_interval))
+
+
+async def _serve_shard(shard_id: int, conn, report_interval: float) -> None:
+    """
+    Runs one shard: a GenesisEngine with its own event loop, driven by
+    commands from the supervisor over `conn`. Busy time per agent is reported
+    back every `report_interval` seconds.
+    """
+    engine = GenesisEngine()
+    loop = asyncio.get_running_loop()
+    outbox = _Outbox(conn)
+
+    def on_command():
+        try:
+            while conn.poll():
+                op, *args = conn.recv()
+                if op == 'add':
+                    spec = args[0]
+                    try:
+                        engine.register_agent(build_agent(spec), spec.rate_hz, spec.priority)
+                    except Exception as e:
+                        outbox.send(('error', spec.agent_id, f"{type(e).__name__}: {e}"))
+                elif op == 'remove':
+                    engine.unregister_agent(args[0])
+                elif op == 'notify':
+                    if args[0] in engine.scheduler.entries:
+                        engine.notify(args[0], args[1])
+                elif op == 'stop':
+                    engine.stop()
+        except (EOFError, OSError):
+            engine.stop()  # The supervisor is gone
+
+    async def report():
+        while True:
+            # Busy times are cumulative, so a report skipped while the
+            # supervisor is not reading loses nothing
+            if not outbox.busy:
+                entries = engine.scheduler.entries
+                outbox.send(('stats', time.monotonic(),
+                             {agent_id: (e.busy, e.runs, e.missed_deadlines) for agent_id, e in entries.items()}))
+            await asyncio.sleep(report_interval)
+
+    loop.add_reader(conn.fileno(), on_command)
+    reporter = loop.create_task(report())
+    try:
+        await engine.run_loop()
+    finally:
+        reporter.cancel()
+        loop.remove_reader(conn.fileno())
+        outbox.close(timeout=1.0)
+        conn.close()
+
+
+class Shard:
+    """
+    Supervisor-side view of one worker process.
+    """
+
+    __slots__ = ('shard_id', 'process', 'conn', 'agents', 'restarts', 'failed', 'last_report')
+
+    def __init__(self, shard_id: int):
+        self.shard_id = shard_id
+        self.process = None
+        self.conn = None
+        self.agents: Dict[str, AgentSpec] = {}
+        self.restarts: deque = deque()  # Restart times inside the restart window
+        self.failed = False             # Gave up restarting; agents moved elsewhere
+        self.last_report: Optional[float] = None
+
+
+class ShardSupervisor:
+    """
+    Runs agents across a pool of worker processes, each with its own
+    GenesisEngine and event loop, so agent work is not bound to one core.
+
+    The supervisor places each agent on the least-loaded shard, restarts
+    workers that die and re-creates their agents there, and moves agents from
+    the busiest to the idlest shard when their load differs by more than
+    `imbalance` (in seconds of agent work per second, i.e. fractions of a
+    core). A worker that crashes more than `max_restarts` times within
+    `restart_window` seconds is abandoned and its agents spread over the
+    remaining shards. Call poll() periodically (or await supervise()) to
+    collect load reports and apply all of this.
+    """
+
+    def __init__(self, workers: Optional[int] = None, report_interval: float = 1.0,
+                 imbalance: float = 0.25, max_restarts: int = 5, restart_window: float = 60.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.report_interval = report_interval
+        self.imbalance = imbalance
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.shards: List[Shard] = [Shard(i) for i in range(self.workers)]
+        self.assignment: Dict[str, int] = {}              # agent_id -> shard_id
+        self.utilization: Dict[str, float] = {}           # agent_id -> smoothed busy fraction
+        self.errors: Dict[str, str] = {}                  # agent_id -> construction error
+        self._busy: Dict[str, tuple] = {}                 # agent_id -> (report time, busy seconds)
+        self._moved_at: Dict[str, float] = {}
+        self._ctx = multiprocessing.get_context('spawn')
+        self._running = False
+
+    # --- Worker lifecycle ---
+
+    def start(self) -> None:
+        for shard in self.shards:
+            self._spawn(shard)
+        self._running = True
+        print(f"[SUPERVISOR] {self.workers} shard(s) online.")
+
+    def _spawn(self, shard: Shard) -> None:
+        parent, child = self._ctx.Pipe()
+        shard.process = self._ctx.Process(
+            target=_worker_main, args=(shard.shard_id, child, self.report_interval),
+            name=f"genesis-shard-{shard.shard_id}", daemon=True)
+        shard.process.start()
+        child.close()
+        shard.conn = parent
+        shard.last_report = None
+        for spec in shard.agents.values():
+            self._send(shard, ('add', spec))
+
+    def _send(self, shard: Shard, command: tuple) -> None:
+        try:
+            shard.conn.send(command)
+        except (BrokenPipeError, OSError):
+            pass  # The worker died; poll() restarts it and replays its agents
+
+    def _restart(self, shard: Shard) -> None:
+        now = time.monotonic()
+        while shard.restarts and now - shard.restarts[0] > self.restart_window:
+            shard.restarts.popleft()
+        shard.conn.close()
+        for agent_id in shard.agents:
+            self._busy.pop(agent_id, None)
+        if len(shard.restarts) >= self.max_restarts:
+            if len(self._live_shards()) == 1:
+                self._running = False
+                raise RuntimeError(f"All shards have failed (last exit code {shard.process.exitcode}).")
+            shard.failed = True
+            orphans, shard.agents = list(shard.agents.values()), {}
+            print(f"[SUPERVISOR] Shard {shard.shard_id} keeps crashing "
+                  f"(exit code {shard.process.exitcode}); moving {len(orphans)} agent(s) off it.")
+            for spec in orphans:
+                del self.assignment[spec.agent_id]
+                self.add_agent(spec)
+            return
+        shard.restarts.append(now)
+        print(f"[SUPERVISOR] Shard {shard.shard_id} exited with code {shard.process.exitcode}; "
+              f"restarting with {len(shard.agents)} agent(s).")
+        self._spawn(shard)
+
+    def _live_shards(self) -> List[Shard]:
+        return [shard for shard in self.shards if not shard.failed]
+
+    # --- Agent placement ---
+
+    def shard_load(self, shard: Shard) -> float:
+        return sum(self.utilization.get(agent_id, 0.0) for agent_id in shard.agents)
+
+    def add_agent(self, spec: AgentSpec, shard_id: Optional[int] = None) -> int:
+        """
+        Places an agent on `shard_id`, or on the least-loaded shard (fewest
+        agents on a tie). Returns the shard it was placed on.
+        """
+        if spec.agent_id in self.assignment:
+            raise ValueError(f"Agent already placed: {spec.agent_id}")
+        if shard_id is None:
+            shard = min(self._live_shards(), key=lambda s: (self.shard_load(s), len(s.agents)))
+        else:
+            shard = self.shards[shard_id]
+            if shard.failed:
+                raise ValueError(f"Shard {shard_id} has failed.")
+        shard.agents[spec.agent_id] = spec
+        self.assignment[spec.agent_id] = shard.shard_id
+        self.errors.pop(spec.agent_id, None)
+        if shard.conn is not None:
+            self._send(shard, ('add', spec))
+        return shard.shard_id
+
+    def remove_agent(self, agent_id: str) -> AgentSpec:
+        shard = self.shards[self.assignment.pop(agent_id)]
+        spec = shard.agents.pop(agent_id)
+        self.utilization.pop(agent_id, None)
+        self._busy.pop(agent_id, None)
+        self._moved_at.pop(agent_id, None)
+        if shard.conn is not None:
+            self._send(shard, ('remove', agent_id))
+        return spec
+
+    def move_agent(self, agent_id: str, shard_id: int) -> None:
+        """Re-creates an agent on another shard."""
+        utilization = self.utilization.get(agent_id, 0.0)
+        spec = self.remove_agent(agent_id)
+        self.add_agent(spec, shard_id)
+        self.utilization[agent_id] = utilization
+        self._moved_at[agent_id] = time.monotonic()
+
+    def notify(self, agent_id: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Delivers input to an agent on whichever shard it runs."""
+        self._send(self.shards[self.assignment[agent_id]], ('notify', agent_id, data))
+
+    # --- Supervision ---
+
+    def poll(self) -> None:
+        """
+        Drains load reports, restarts dead workers and moves at most one agent
+        to even out load.
+        """
+        for shard in self._live_shards():
+            try:
+                while shard.conn.poll():
+                    self._handle(shard, shard.conn.recv())
+            except (EOFError, OSError):
+                pass
+            if self._running and not shard.process.is_alive():
+                self._restart(shard)
+        self.rebalance()
+
+    def _handle(self, shard: Shard, message: tuple) -> None:
+        if message[0] == 'error':
+            _, agent_id, error = message
+            if self.assignment.get(agent_id) == shard.shard_id:
+                print(f"[SUPERVISOR] Could not build agent {agent_id} on shard {shard.shard_id}: {error}")
+                self.remove_agent(agent_id)
+                self.errors[agent_id] = error
+            return
+        _, reported_at, agents = message
+        shard.last_report = reported_at
+        for agent_id, (busy, _, _) in agents.items():
+            if agent_id not in shard.agents:
+                continue  # Moved or removed since the report was sent
+            previous = self._busy.get(agent_id)
+            self._busy[agent_id] = (reported_at, busy)
+            if previous is None or busy < previous[1] or reported_at <= previous[0]:
+                continue  # First report from this worker
+            sample = (busy - previous[1]) / (reported_at - previous[0])
+            old = self.utilization.get(agent_id)
+            self.utilization[agent_id] = sample if old is None else 0.5 * old + 0.5 * sample
+
+    def rebalance(self) -> Optional[str]:
+        """
+        Moves one agent from the busiest shard to the idlest if that narrows a
+        load gap larger than `imbalance`. Agents moved within the last few
+        report intervals stay put, so a move can show up in the next reports
+        before another is considered. Returns the moved agent's id, if any.
+        """
+        shards = self._live_shards()
+        if len(shards) < 2:
+            return None
+        loads = {shard.shard_id: self.shard_load(shard) for shard in shards}
+        hot = max(shards, key=lambda s: loads[s.shard_id])
+        cold = min(shards, key=lambda s: loads[s.shard_id])
+        gap = loads[hot.shard_id] - loads[cold.shard_id]
+        if gap <= self.imbalance or len(hot.agents) < 2:
+            return None
+
+        cooldown = time.monotonic() - 3 * self.report_interval
+        # Moving an agent with load u leaves a gap of |gap - 2u|: best when u is near gap / 2
+        candidates = [
+            (abs(gap / 2 - self.utilization[agent_id]), agent_id) for agent_id in hot.agents
+            if 0 < self.utilization.get(agent_id, 0.0) < gap and self._moved_at.get(agent_id, 0) < cooldown
+        ]
+        if not candidates:
+            return None
+        agent_id = min(candidates)[1]
+        print(f"[SUPERVISOR] Moving {agent_id} from shard {hot.shard_id} ({loads[hot.shard_id]:.2f}) "
+              f"to shard {cold.shard_id} ({loads[cold.shard_id]:.2f}).")
+        self.move_agent(agent_id, cold.shard_id)
+        return agent_id
+
+    async def supervise(self, interval: Optional[float] = None) -> None:
+        """Calls poll() every `interval` seconds (default: half the report interval) until stop()."""
+        interval = interval or self.report_interval / 2
+        while self._running:
+            self.poll()
+            await asyncio.sleep(interval)
+
+    def placement(self) -> Dict[str, int]:
+        """Which shard each agent runs on."""
+        return dict(self.assignment)
+
+    def report(self) -> Dict[int, Dict[str, Any]]:
+        """Per-shard process, agents, load and restart count."""
+        return {
+            shard.shard_id: {
+                'pid': shard.process.pid if shard.process else None,
+                'alive': bool(shard.process and shard.process.is_alive()),
+                'failed': shard.failed,
+                'agents': sorted(shard.agents),
+                'load': self.shard_load(shard),
+                'restarts': len(shard.restarts),
+            }
+            for shard in self.shards
+        }
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._running = False
+        for shard in self.shards:
+            if shard.process is not None and shard.process.is_alive():
+                self._send(shard, ('stop',))
+        deadline = time.monotonic() + timeout
+        for shard in self.shards:
+            if shard.process is None:
+                continue
+            shard.process.join(max(0.0, deadline - time.monotonic()))
+            if shard.process.is_alive():
+                shard.process.terminate()
+                shard.process.join()
+            shard.conn.close()
+        print("[SUPERVISOR] All shards stopped.")
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The framework is imported as the package "03_Psiquis_Genesis_Framework"
+# (its modules use relative imports), so the repository root goes on the path.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -0,0 +1,25 @@
+"""
+Minimal agents shared by the tests. Importable by name
+('genesis_test_agents:IdleAgent'), so shard workers can build them too.
+"""
+
+import importlib
+
+GenesisAgent = importlib.import_module('03_Psiquis_Genesis_Framework.base_agent').GenesisAgent
+
+
+class IdleAgent(GenesisAgent):
+    __slots__ = ()
+
+    async def perceive(self, environment_data):
+        return environment_data
+
+    async def reason(self, context):
+        return context
+
+    async def act(self, decision):
+        pass
+
+
+class OtherAgent(IdleAgent):
+    __slots__ = ()
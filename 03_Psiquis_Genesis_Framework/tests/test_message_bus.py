@@ -0,0 +1,106 @@
+import asyncio
+import importlib
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+message_bus = importlib.import_module('03_Psiquis_Genesis_Framework.message_bus')
+MessageBus = message_bus.MessageBus
+
+
+def test_freeze_is_read_only_and_copy_free():
+    data = {'a': 1}
+    frozen = message_bus.freeze(data)
+    with pytest.raises(TypeError):
+        frozen['a'] = 2
+    data['a'] = 3  # A view, not a copy
+    assert frozen['a'] == 3
+    array = np.arange(4)
+    view = message_bus.freeze(array)
+    assert not view.flags.writeable and np.shares_memory(view, array)
+    assert message_bus.freeze([1, 2]) == (1, 2)
+
+
+def test_fan_out_delivers_one_message_object():
+    bus = MessageBus()
+    exact = bus.subscribe('market.btc')
+    wildcard = bus.subscribe('market.*')
+    other = bus.subscribe('orders')
+    bus.publish_nowait('market.btc', {'bid': 1.0})
+    first, second = exact.get_nowait(), wildcard.get_nowait()
+    assert first is second and first.payload['bid'] == 1.0
+    assert len(other) == 0
+
+
+def test_backpressure_policies():
+    bus = MessageBus()
+    oldest = bus.subscribe('t.*', maxsize=2)
+    latest = bus.subscribe('t.*', maxsize=2, policy=message_bus.COALESCE_LATEST)
+    for topic, value in (('t.a', 1), ('t.b', 2), ('t.a', 3), ('t.c', 4)):
+        bus.publish_nowait(topic, value)
+    assert [m.payload for m in oldest.drain()] == [3, 4]
+    assert oldest.dropped == 2
+    # t.a is coalesced to its newest value; t.c then evicts the oldest topic, t.b
+    assert [(m.topic, m.payload) for m in latest.drain()] == [('t.a', 3), ('t.c', 4)]
+    assert latest.dropped == 2
+
+
+def test_block_policy_waits_for_the_consumer():
+    async def run():
+        bus = MessageBus()
+        sub = bus.subscribe('t', maxsize=1, policy=message_bus.BLOCK)
+        await bus.publish('t', 1)
+        with pytest.raises(asyncio.QueueFull):
+            bus.publish_nowait('t', 2)
+        publisher = asyncio.create_task(bus.publish('t', 3))
+        await asyncio.sleep(0)
+        assert not publisher.done()
+        assert (await sub.get()).payload == 1
+        await asyncio.wait_for(publisher, timeout=1.0)
+        return [m.payload for m in sub.drain()]
+
+    assert asyncio.run(run()) == [3]
+
+
+def test_full_block_subscriber_rejects_before_any_delivery():
+    bus = MessageBus()
+    first = bus.subscribe('t')
+    blocked = bus.subscribe('t', maxsize=1, policy=message_bus.BLOCK)
+    assert bus.publish_nowait('t', 1).seq == 1
+    with pytest.raises(asyncio.QueueFull):
+        bus.publish_nowait('t', 2)
+    assert [m.payload for m in first.drain()] == [1]
+    assert bus.published == 1
+    blocked.drain()
+    # The rejected message took no sequence number
+    assert bus.publish_nowait('t', 3).seq == 2
+    assert [m.payload for m in first.drain()] == [3]
+
+
+def test_remote_bus_round_trip():
+    async def run(path):
+        server = MessageBus()
+        local_sub = server.subscribe('from.*')
+        bus_server = message_bus.BusServer(server, path)
+        await bus_server.start()
+        remote = message_bus.RemoteBus(path)
+        await remote.connect()
+        try:
+            sub = await remote.subscribe('to.*')
+            await asyncio.sleep(0.05)  # Let the server register the subscription
+            await server.publish('to.agent', np.arange(3, dtype=np.float32))
+            await server.publish('to.agent', {'x': 1})
+            array, mapping = await asyncio.wait_for(sub.get(), 1.0), await asyncio.wait_for(sub.get(), 1.0)
+            await remote.publish('from.agent', b'raw')
+            received = await asyncio.wait_for(local_sub.get(), 1.0)
+            return array.payload, mapping.payload, received.payload
+        finally:
+            await remote.close()
+            await bus_server.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        array, mapping, raw = asyncio.run(run(os.path.join(directory, 'bus.sock')))
+    assert array.dtype == np.float32 and array.tolist() == [0.0, 1.0, 2.0]
+    assert mapping == {'x': 1} and raw == b'raw'
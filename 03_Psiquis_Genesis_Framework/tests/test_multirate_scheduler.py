@@ -0,0 +1,97 @@
+import asyncio
+import importlib
+
+from genesis_test_agents import IdleAgent
+
+scheduler = importlib.import_module('03_Psiquis_Genesis_Framework.scheduler')
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingAgent(IdleAgent):
+    __slots__ = ('seen',)
+
+    def __init__(self, agent_id):
+        super().__init__(agent_id=agent_id)
+        self.seen = []
+
+    async def perceive(self, environment_data):
+        self.seen.append(environment_data)
+        return environment_data
+
+
+def _ids(entries):
+    return [entry.agent.id for entry in entries]
+
+
+def test_agents_run_at_their_own_rates():
+    clock = Clock()
+    sched = scheduler.MultiRateScheduler(clock=clock)
+    sched.add(IdleAgent('fast'), rate_hz=10)
+    sched.add(IdleAgent('slow'), rate_hz=1)
+    sched.add(IdleAgent('idle'))  # Event-driven only
+    assert sched.collect_due() == []
+    assert sched.next_deadline() == 100.1
+
+    clock.now = 100.1
+    assert _ids(sched.collect_due()) == ['fast']
+    clock.now = 101.0
+    assert sorted(_ids(sched.collect_due())) == ['fast', 'slow']
+
+
+def test_missed_deadlines_are_skipped_not_replayed():
+    clock = Clock()
+    sched = scheduler.MultiRateScheduler(clock=clock)
+    entry = sched.add(IdleAgent('a'), rate_hz=10)
+    clock.now = 100.55
+    assert _ids(sched.collect_due()) == ['a']
+    assert entry.missed_deadlines == 4
+    # The schedule stays on the original grid
+    assert abs(entry.next_due - 100.6) < 1e-9
+    assert sched.collect_due() == []
+
+
+def test_notify_coalesces_input_and_orders_by_priority():
+    clock = Clock()
+    sched = scheduler.MultiRateScheduler(clock=clock)
+    low = sched.add(RecordingAgent('low'), priority=0)
+    high = sched.add(RecordingAgent('high'), priority=5)
+    sched.notify('low', {'x': 1, 'y': 1})
+    sched.notify('low', {'x': 2})
+    sched.notify('high')
+    due = sched.collect_due()
+    assert _ids(due) == ['high', 'low']
+    asyncio.run(sched.dispatch(due))
+    assert low.agent.seen == [{'x': 2, 'y': 1}] and high.agent.seen == [{}]
+    assert low.runs == high.runs == 1 and low.pending is None
+
+
+def test_removed_agents_are_dropped_lazily():
+    clock = Clock()
+    sched = scheduler.MultiRateScheduler(clock=clock)
+    sched.add(IdleAgent('a'), rate_hz=10)
+    sched.add(IdleAgent('b'), rate_hz=5)
+    sched.remove('a')
+    assert sched.next_deadline() == 100.2
+    clock.now = 101.0
+    assert _ids(sched.collect_due()) == ['b']
+
+
+def test_wait_returns_on_notify():
+    sched = scheduler.MultiRateScheduler()
+    sched.add(IdleAgent('a'))
+
+    async def run():
+        waiter = asyncio.create_task(sched.wait())
+        await asyncio.sleep(0)
+        sched.notify('a')
+        await asyncio.wait_for(waiter, timeout=1.0)
+        return _ids(sched.collect_due())
+
+    assert asyncio.run(run()) == ['a']
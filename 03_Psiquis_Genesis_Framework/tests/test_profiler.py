@@ -0,0 +1,60 @@
+import asyncio
+import importlib
+import time
+
+import pytest
+
+from genesis_test_agents import IdleAgent
+
+profiler = importlib.import_module('03_Psiquis_Genesis_Framework.profiler')
+scheduler = importlib.import_module('03_Psiquis_Genesis_Framework.scheduler')
+
+
+class FailingAgent(IdleAgent):
+    __slots__ = ()
+
+    async def reason(self, context):
+        raise RuntimeError('boom')
+
+
+def test_summarize():
+    assert profiler.summarize([]) == {'count': 0}
+    summary = profiler.summarize([0.003, 0.001, 0.002])
+    assert summary['count'] == 3 and summary['p50_ms'] == pytest.approx(2.0)
+    assert summary['max_ms'] == pytest.approx(3.0) and summary['mean_ms'] == pytest.approx(2.0)
+
+
+def test_cycles_and_failures_are_recorded_per_agent():
+    tick = profiler.TickProfiler(tick_rate=100, history=8)
+    sched = scheduler.MultiRateScheduler()
+    sched.profiler = tick
+    ok = sched.add(IdleAgent('ok'), rate_hz=1000)
+    bad = sched.add(FailingAgent('bad'))
+    for _ in range(3):
+        asyncio.run(sched.dispatch([ok, bad]))
+    tick.record_tick(0.0, 0.5, 2)  # Over the 10 ms budget
+    tick.record_tick(0.0, 0.001, 2)
+
+    snapshot = tick.snapshot()
+    assert snapshot['ticks'] == 2 and snapshot['overruns'] == 1
+    assert snapshot['phases']['perceive']['count'] == 3
+    assert tick.agents['ok'].cycles == 3 and tick.agents['bad'].failures == 3
+    assert [row['agent_id'] for row in tick.slowest(by='failures')][0] == 'bad'
+    tick.forget('bad')
+    tick.reset()
+    assert tick.snapshot()['ticks'] == 0 and not tick.agents
+
+
+def test_stack_sampler_writes_folded_stacks(tmp_path):
+    tick = profiler.TickProfiler()
+    tick.start_sampling(interval=0.001)
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    tick.stop_sampling()
+    path = tmp_path / 'stacks.folded'
+    samples = tick.write_collapsed(str(path))
+    lines = path.read_text().splitlines()
+    assert samples > 0 and lines
+    stack, count = lines[0].rsplit(' ', 1)
+    assert 'test_stack_sampler_writes_folded_stacks' in stack and int(count) > 0
@@ -0,0 +1,42 @@
+import importlib
+
+import pytest
+
+from genesis_test_agents import IdleAgent, OtherAgent
+
+registry = importlib.import_module('03_Psiquis_Genesis_Framework.registry')
+
+
+def test_index_by_id_and_type():
+    agents = registry.AgentRegistry()
+    idle, other = IdleAgent('idle'), OtherAgent('other')
+    agents.add(idle)
+    agents.add(other)
+    with pytest.raises(ValueError):
+        agents.add(IdleAgent('idle'))
+    assert agents.get('other') is other and 'idle' in agents and len(agents) == 2
+    assert agents.by_type(IdleAgent) == [idle]
+    assert agents.by_type(IdleAgent, subclasses=True) == [idle, other]
+    assert agents.counts() == {'IdleAgent': 1, 'OtherAgent': 1}
+
+    assert agents.remove('other') is other
+    assert agents.remove('other') is None
+    assert agents.by_type(OtherAgent) == [] and list(agents) == [idle]
+
+
+def test_agents_are_compact_and_lazy():
+    agent = IdleAgent()
+    assert not hasattr(agent, '__dict__')
+    assert agent._logger is None and agent._memory is None
+    assert agent.id != IdleAgent().id
+    assert agent.logger is agent.logger and agent.logger.extra == {'agent_id': agent.id}
+
+
+def test_memory_is_created_from_config():
+    agent = IdleAgent(config={'memory_dim': 8, 'memory_capacity': 4})
+    memory = agent.memory_vector
+    assert memory is agent.memory_vector
+    assert (memory.dim, memory.capacity) == (8, 4)
+    shared = IdleAgent()
+    shared.memory_vector = memory
+    assert shared.memory_vector is memory
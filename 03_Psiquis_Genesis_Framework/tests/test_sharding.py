@@ -0,0 +1,72 @@
+import importlib
+import threading
+import time
+
+sharding = importlib.import_module('03_Psiquis_Genesis_Framework.sharding')
+AgentSpec, ShardSupervisor = sharding.AgentSpec, sharding.ShardSupervisor
+
+IDLE = 'genesis_test_agents:IdleAgent'
+
+
+def test_spec_config_is_not_shared():
+    a, b = AgentSpec(IDLE, 'a'), AgentSpec(IDLE, 'b')
+    a.config['key'] = 1
+    assert b.config == {}
+
+
+def test_build_agent_copies_config():
+    spec = AgentSpec(IDLE, 'agent', {'x': 1})
+    agent = sharding.build_agent(spec)
+    agent.config['x'] = 2
+    assert agent.id == 'agent' and spec.config == {'x': 1}
+
+
+def test_placement_prefers_least_loaded_shard():
+    supervisor = ShardSupervisor(workers=2)  # Not started: placement only
+    supervisor.utilization.update({'a': 0.9})
+    assert supervisor.add_agent(AgentSpec(IDLE, 'a'), shard_id=0) == 0
+    assert supervisor.add_agent(AgentSpec(IDLE, 'b')) == 1
+    assert supervisor.add_agent(AgentSpec(IDLE, 'c')) == 1
+
+
+def test_rebalance_moves_agent_closest_to_half_the_gap():
+    supervisor = ShardSupervisor(workers=2, imbalance=0.25)
+    for agent_id in ('a', 'b', 'c'):
+        supervisor.add_agent(AgentSpec(IDLE, agent_id), shard_id=0)
+    supervisor.utilization.update({'a': 0.5, 'b': 0.3, 'c': 0.1})
+    # Gap 0.9: moving 'a' (0.5) leaves the smallest gap
+    assert supervisor.rebalance() == 'a'
+    assert supervisor.placement() == {'b': 0, 'c': 0, 'a': 1}
+    # 'a' is cooling down and the remaining gap is within bounds
+    assert supervisor.rebalance() is None
+
+
+def test_large_reports_do_not_deadlock_the_pipe():
+    # Stats for this many agents far exceed the pipe buffer, and so do the
+    # add commands sent before the supervisor reads anything
+    agents = [AgentSpec(IDLE, f"agent-{i:05d}-" + 'x' * 200, rate_hz=1.0) for i in range(3000)]
+    supervisor = ShardSupervisor(workers=1, report_interval=0.01)
+    result = {}
+
+    def scenario():
+        supervisor.start()
+        for spec in agents:
+            supervisor.add_agent(spec)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            supervisor.poll()
+            if len(supervisor._busy) == len(agents):
+                result['reported'] = True
+                break
+            time.sleep(0.01)
+
+    thread = threading.Thread(target=scenario, daemon=True)
+    thread.start()
+    thread.join(60)
+    try:
+        assert not thread.is_alive(), "supervisor and worker deadlocked on the pipe"
+        assert result.get('reported')
+        assert not supervisor.errors
+    finally:
+        if not thread.is_alive():
+            supervisor.stop()
@@ -0,0 +1,67 @@
+import importlib
+
+import numpy as np
+import pytest
+
+vector_memory = importlib.import_module('03_Psiquis_Genesis_Framework.vector_memory')
+VectorMemory = vector_memory.VectorMemory
+
+
+def _random(n, dim, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def test_search_finds_exact_vector():
+    memory = VectorMemory(dim=16, capacity=100)
+    vectors = _random(50, 16)
+    keys = memory.add(vectors)
+    scores, found = memory.search(vectors[7], k=3)
+    assert found[0][0] == keys[7]
+    assert scores[0][0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_ring_eviction_overwrites_oldest():
+    memory = VectorMemory(dim=4, capacity=3, eviction=vector_memory.RING)
+    memory.add(_random(3, 4), keys=[1, 2, 3])
+    memory.add(_random(1, 4, seed=1), keys=[4])
+    assert len(memory) == 3
+    assert sorted(memory.keys.tolist()) == [2, 3, 4]
+
+
+def test_save_load_round_trip(tmp_path):
+    memory = VectorMemory(dim=8, capacity=64)
+    vectors = _random(40, 8)
+    memory.add(vectors)
+    memory.save(str(tmp_path))
+
+    loaded = VectorMemory.load(str(tmp_path), mmap_mode=None)
+    assert len(loaded) == 40
+    np.testing.assert_array_equal(loaded.vectors, memory.vectors)
+    np.testing.assert_array_equal(loaded.search(vectors[:5], k=1)[1], memory.search(vectors[:5], k=1)[1])
+
+
+def test_save_over_own_mmap_keeps_data(tmp_path):
+    memory = VectorMemory(dim=8, capacity=2000)
+    memory.add(_random(1000, 8))
+    memory.save(str(tmp_path))
+
+    mapped = VectorMemory.load(str(tmp_path), mmap_mode='r+')
+    extra = _random(10, 8, seed=1)
+    keys = mapped.add(extra)
+    mapped.save(str(tmp_path))
+    del mapped
+
+    reopened = VectorMemory.load(str(tmp_path), mmap_mode=None)
+    assert len(reopened) == 1010
+    assert reopened.search(extra[3], k=1)[1][0][0] == keys[3]
+
+
+def test_save_read_only_mmap_elsewhere(tmp_path):
+    memory = VectorMemory(dim=8, capacity=32)
+    memory.add(_random(20, 8))
+    memory.save(str(tmp_path / 'a'))
+    mapped = VectorMemory.load(str(tmp_path / 'a'))
+    mapped.save(str(tmp_path / 'a'))
+    mapped.save(str(tmp_path / 'b'))
+    copy = VectorMemory.load(str(tmp_path / 'b'), mmap_mode=None)
+    np.testing.assert_array_equal(copy.vectors, memory.vectors)
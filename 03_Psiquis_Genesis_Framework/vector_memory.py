@@ -0,0 +1,296 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Eviction policies once the store is full
+LRU = 'lru'    # Evict the vectors recalled least recently
+RING = 'ring'  # Evict the oldest insertions
+
+STATE_FILE = 'state.json'
+ARRAYS = ('vectors', 'keys', 'last_used', 'cells')
+
+
+def _save_array(target: str, array: np.ndarray) -> None:
+    """
+    Writes `array` to the .npy file `target`. If `array` is a memory map of
+    that very file it is flushed instead: np.save would truncate the file
+    under the live mapping. Anything else goes to a temporary file that
+    replaces `target` atomically.
+    """
+    if isinstance(array, np.memmap) and array.filename and os.path.exists(target) \
+            and os.path.samefile(array.filename, target):
+        if array.mode == 'r+':
+            array.flush()
+        if array.mode in ('r', 'r+'):
+            return
+    tmp = target + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, target)
+
+
+class VectorMemory:
+    """
+    Fixed-capacity embedding memory for GenesisAgent.
+
+    Vectors live in one preallocated, contiguous float32 matrix, so adding
+    never reallocates and a batch of queries is answered with a single
+    matrix multiply against every stored vector. Each vector carries an
+    int64 key (the caller maps keys to whatever the memory is about). When
+    the store is full, new vectors overwrite either the least recently
+    recalled ones (LRU) or the oldest ones (ring).
+
+    Exact search reads the whole matrix per batch. For very large stores,
+    build_index() adds an inverted-file index: vectors are grouped under
+    k-means centroids and a query only scores the vectors of its `nprobe`
+    nearest groups. At a million 128-d vectors that takes a single recall
+    from tens of milliseconds to well under one, at the cost of occasionally
+    missing a true neighbour (raise `nprobe` to trade speed for recall).
+
+    With metric='cosine' vectors (and queries) are normalized, so scores
+    are cosine similarities; with 'dot' they are raw inner products.
+    """
+
+    def __init__(self, dim: int, capacity: int, metric: str = 'cosine', eviction: str = LRU):
+        if metric not in ('cosine', 'dot'):
+            raise ValueError(f"Unknown metric: {metric}")
+        if eviction not in (LRU, RING):
+            raise ValueError(f"Unknown eviction policy: {eviction}")
+        self.dim = dim
+        self.capacity = capacity
+        self.metric = metric
+        self.eviction = eviction
+        self.size = 0
+        self.cursor = 0      # Ring: next slot to overwrite once full
+        self.clock = 0       # Bumped on every add/search; LRU timestamps
+        self.next_key = 0
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.keys = np.full(capacity, -1, dtype=np.int64)
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.cells = np.full(capacity, -1, dtype=np.int32)  # Index cell per slot
+        self.centroids: Optional[np.ndarray] = None
+        self.nprobe = 0
+        self._lists: List[np.ndarray] = []  # Slots per cell, first _counts[c] valid
+        self._counts: Optional[np.ndarray] = None
+        self._pos: Optional[np.ndarray] = None  # Slot -> position in its cell's list
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _prepare(self, vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+        if self.metric == 'cosine':
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.maximum(norms, np.float32(1e-12))
+        return vectors
+
+    def _take_slots(self, n: int) -> np.ndarray:
+        """Returns `n` slots to write, evicting per the policy once full."""
+        free = min(n, self.capacity - self.size)
+        slots = np.arange(self.size, self.size + free)
+        self.size += free
+        evict = n - free
+        if evict:
+            if self.eviction == RING:
+                victims = (self.cursor + np.arange(evict)) % self.capacity
+                self.cursor = int((self.cursor + evict) % self.capacity)
+            else:
+                self.last_used[slots] = self.clock + 1  # Slots filled by this batch are not victims
+                victims = np.argpartition(self.last_used, evict - 1)[:evict]
+            slots = np.concatenate([slots, victims])
+        return slots
+
+    def add(self, vectors, keys=None) -> np.ndarray:
+        """
+        Stores a vector or a batch of vectors. Returns their keys (assigned
+        sequentially unless given). Adding more vectors than the capacity
+        keeps only the last `capacity` of them.
+        """
+        vectors = self._prepare(vectors)
+        if keys is None:
+            keys = np.arange(self.next_key, self.next_key + len(vectors), dtype=np.int64)
+            self.next_key += len(vectors)
+        else:
+            keys = np.asarray(keys, dtype=np.int64).reshape(-1)
+            if len(keys) != len(vectors):
+                raise ValueError("Got a different number of keys and vectors.")
+        if len(vectors) > self.capacity:
+            vectors, keys = vectors[-self.capacity:], keys[-self.capacity:]
+
+        slots = self._take_slots(len(vectors))
+        self.clock += 1
+        self.vectors[slots] = vectors
+        self.keys[slots] = keys
+        self.last_used[slots] = self.clock
+        if self.centroids is not None:
+            self._reassign(slots, np.argmax(vectors @ self.centroids.T, axis=1))
+        return keys
+
+    def search(self, queries, k: int = 5, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the `k` most similar stored vectors for each query.
+
+        Args:
+            queries: One vector or a (Q, dim) batch.
+            k (int): Neighbours per query.
+            nprobe (Optional[int]): Index cells to scan per query when an index
+                has been built (default: the one given to build_index). 0 forces
+                an exact search.
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (Q, k) scores and keys, best first.
+            Missing neighbours (fewer than k vectors stored) have key -1 and
+            score -inf.
+        """
+        queries = self._prepare(queries)
+        nprobe = self.nprobe if nprobe is None else nprobe
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        found = np.full((len(queries), k), -1, dtype=np.int64)
+        if not self.size or not k:
+            return scores, found
+
+        if self.centroids is not None and nprobe:
+            candidates, similarity = self._probe(queries, nprobe)
+        else:
+            candidates, similarity = None, queries @ self.vectors[:self.size].T
+
+        self.clock += 1
+        for i, row in enumerate(similarity):
+            n = min(k, len(row))
+            top = np.argpartition(row, -n)[-n:] if n < len(row) else np.arange(len(row))
+            top = top[np.argsort(row[top])[::-1]]
+            top_slots = candidates[i][top] if candidates is not None else top
+            scores[i, :n] = row[top]
+            found[i, :n] = self.keys[top_slots]
+            if self.eviction == LRU and self.last_used.flags.writeable:
+                self.last_used[top_slots] = self.clock
+        return scores, found
+
+    # --- Inverted-file index ---
+
+    def build_index(self, nlist: Optional[int] = None, nprobe: int = 8, iterations: int = 8,
+                    sample: int = 100_000, seed: int = 0) -> None:
+        """
+        Clusters the stored vectors into `nlist` cells (default 4 * sqrt(size))
+        with spherical k-means on at most `sample` vectors, and indexes every
+        slot by its nearest centroid. Vectors added later are assigned as they
+        arrive; rebuild when the data has drifted.
+        """
+        nlist = nlist or max(1, int(4 * np.sqrt(self.size)))
+        if self.size < nlist:
+            raise ValueError(f"Need at least {nlist} stored vectors to build {nlist} cells.")
+        rng = np.random.default_rng(seed)
+        data = self.vectors[:self.size]
+        train = data[rng.choice(self.size, min(sample, self.size), replace=False)]
+        centroids = train[rng.choice(len(train), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(train @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, train)
+            empty = np.bincount(assign, minlength=nlist) == 0
+            sums[empty] = centroids[empty]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        self.centroids = centroids.astype(np.float32)
+        self.nprobe = nprobe
+
+        cells = np.empty(self.size, dtype=np.int32)
+        for start in range(0, self.size, 65536):
+            cells[start:start + 65536] = np.argmax(data[start:start + 65536] @ self.centroids.T, axis=1)
+        self.cells[:self.size] = cells
+        self._rebuild_lists()
+
+    def _rebuild_lists(self) -> None:
+        nlist = len(self.centroids)
+        cells = self.cells[:self.size]
+        order = np.argsort(cells, kind='stable')
+        self._counts = np.bincount(cells, minlength=nlist).astype(np.int64)
+        bounds = np.concatenate([[0], np.cumsum(self._counts)])
+        self._lists = [np.array(order[bounds[c]:bounds[c + 1]], dtype=np.int64) for c in range(nlist)]
+        self._pos = np.zeros(self.capacity, dtype=np.int64)
+        self._pos[order] = np.arange(self.size) - np.repeat(bounds[:-1], self._counts)
+
+    def _reassign(self, slots: np.ndarray, cells: np.ndarray) -> None:
+        lists, counts, pos = self._lists, self._counts, self._pos
+        for slot, cell in zip(slots.tolist(), cells.tolist()):
+            old = self.cells[slot]
+            if old >= 0:
+                # Swap-remove from the old cell's list
+                last = lists[old][counts[old] - 1]
+                lists[old][pos[slot]] = last
+                pos[last] = pos[slot]
+                counts[old] -= 1
+            if counts[cell] == len(lists[cell]):
+                lists[cell] = np.resize(lists[cell], max(16, 2 * len(lists[cell])))
+            lists[cell][counts[cell]] = slot
+            pos[slot] = counts[cell]
+            counts[cell] += 1
+            self.cells[slot] = cell
+
+    def _probe(self, queries: np.ndarray, nprobe: int):
+        nprobe = min(nprobe, len(self.centroids))
+        coarse = queries @ self.centroids.T
+        probes = np.argpartition(coarse, -nprobe, axis=1)[:, -nprobe:]
+        candidates, similarity = [], []
+        for query, cells in zip(queries, probes):
+            slots = np.concatenate([self._lists[c][:self._counts[c]] for c in cells])
+            candidates.append(slots)
+            similarity.append(self.vectors[slots] @ query)
+        return candidates, similarity
+
+    # --- Persistence ---
+
+    def save(self, path: str) -> None:
+        """
+        Writes the store to directory `path` as .npy arrays plus a small JSON
+        state file, ready to be memory-mapped by load(). Saving a store opened
+        with mmap_mode='r+' back to its own directory only flushes the mapped
+        arrays and rewrites the state file.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            _save_array(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        if self.centroids is not None:
+            _save_array(os.path.join(path, 'centroids.npy'), self.centroids)
+        state = {
+            'dim': self.dim, 'capacity': self.capacity, 'metric': self.metric,
+            'eviction': self.eviction, 'size': self.size, 'cursor': self.cursor,
+            'clock': self.clock, 'next_key': self.next_key, 'nprobe': self.nprobe,
+        }
+        tmp = os.path.join(path, STATE_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, os.path.join(path, STATE_FILE))
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r') -> 'VectorMemory':
+        """
+        Opens a saved store. By default the arrays are memory-mapped read-only,
+        so opening is instant and pages are read on demand; recalls then do
+        not update LRU order. Use mmap_mode='r+' to add vectors in place (the
+        changes go to the files; call save() on the same path to flush them
+        and persist the state file) or None to load everything into memory.
+        """
+        with open(os.path.join(path, STATE_FILE)) as f:
+            state = json.load(f)
+        memory = cls.__new__(cls)
+        memory.dim, memory.capacity = state['dim'], state['capacity']
+        memory.metric, memory.eviction = state['metric'], state['eviction']
+        memory.size, memory.cursor = state['size'], state['cursor']
+        memory.clock, memory.next_key = state['clock'], state['next_key']
+        memory.nprobe = state['nprobe']
+        arrays: Dict[str, np.ndarray] = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAYS
+        }
+        for name, array in arrays.items():
+            setattr(memory, name, array)
+        centroids = os.path.join(path, 'centroids.npy')
+        memory.centroids = np.load(centroids) if os.path.exists(centroids) else None
+        memory._lists, memory._counts, memory._pos = [], None, None
+        if memory.centroids is not None:
+            memory._rebuild_lists()
+        return memory
@@ -0,0 +1,450 @@
+"""
+Offline exchange simulator for load-testing the arbitrage scanners.
+
+A MarketSimulator keeps a Level 2 book for every (venue, symbol) pair and
+moves them with a random walk at a configured aggregate update rate: each
+symbol has one fair price, each venue quotes it with a small mean-reverting
+offset, and occasional dislocations push one venue away from the others
+for a while so there is something to detect. Every step is also a
+sequenced book delta, so the same market can be consumed in two ways:
+
+- SimulatedExchange / SyncSimulatedExchange: ccxt-style clients
+  (load_markets, fetch_ticker(s), fetch_order_book) for the async Live
+  Alpha bot and the synchronous Quant Engine, with injectable latency and
+  failures.
+- SimulatedFeed: a BookFeed streaming the snapshot + delta messages into
+  OrderBookManager, with injectable delivery latency and sequence gaps.
+
+Time only advances when someone reads the market (catch_up), so an idle
+simulator costs nothing and a slow consumer sees how far it fell behind.
+"""
+
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import deque, namedtuple
+
+from order_book import BookFeed, BookUpdate, DELTA, SNAPSHOT
+
+try:
+    from ccxt import NetworkError as _NetworkError
+except ImportError:  # ccxt is optional for the simulator
+    _NetworkError = Exception
+
+
+class SimulatedNetworkError(_NetworkError):
+    """Injected request failure. A ccxt.NetworkError when ccxt is installed."""
+
+
+# One injected dislocation: `venue` quotes `symbol` `pct` percent away from
+# the fair price from `started` (perf_counter seconds) until `ends`.
+Dislocation = namedtuple('Dislocation', ['venue', 'symbol', 'pct', 'started', 'ends', 'sequence'])
+
+
+class SimulatedBook:
+    """
+    One venue's book for one symbol. Prices are integer tick indexes around
+    `mid`; the best bid sits one tick below it and the best ask one above.
+    Level sizes average `unit` base units.
+    """
+
+    __slots__ = ('venue', 'symbol', 'tick', 'unit', 'mid', 'bids', 'asks', 'sequence', 'offset', 'dislocation')
+
+    def __init__(self, venue, symbol, tick, unit, mid, depth, rng):
+        self.venue = venue
+        self.symbol = symbol
+        self.tick = tick
+        self.unit = unit
+        self.mid = mid
+        self.bids = {mid - 1 - i: _size(rng) * unit for i in range(depth)}
+        self.asks = {mid + 1 + i: _size(rng) * unit for i in range(depth)}
+        self.sequence = 0
+        self.offset = 0.0          # Relative offset from the symbol's fair price
+        self.dislocation = None    # Active Dislocation, if any
+
+    def levels(self, side, limit=None):
+        ladder = self.bids if side == 'bids' else self.asks
+        keys = sorted(ladder, reverse=(side == 'bids'))
+        if limit:
+            keys = keys[:limit]
+        return [[k * self.tick, ladder[k]] for k in keys]
+
+
+def _size(rng):
+    return round(rng.expovariate(1.0), 4)
+
+
+# Sizes for levels touched by updates are drawn in turn from a table of this
+# many random sizes (a power of two) rather than sampled one by one, which
+# was close to half the cost of generating an update
+SIZE_TABLE = 4096
+
+
+def _outside(a, b):
+    """Keys of the contiguous range `a` that are not in the range `b`."""
+    if a.start >= b.stop or b.start >= a.stop:
+        return a
+    return range(a.start, b.start) if a.start < b.start else range(b.stop, a.stop)
+
+
+def _tick_for(price):
+    """A tick of roughly one basis point, rounded down to a power of ten."""
+    return 10.0 ** math.floor(math.log10(price * 1e-4))
+
+
+class MarketSimulator:
+    """
+    Random-walk books for `venues` x `symbols`.
+
+    Args:
+        update_rate: Book updates per second across all books.
+        volatility: Standard deviation of the fair price's log return per update.
+        venue_noise: Standard deviation of each venue's offset from fair, kept
+            mean-reverting so venues stay within a few basis points.
+        dislocation_rate: Dislocations started per second across all books.
+        dislocation_pct: Size of a dislocation, in percent of the price.
+        dislocation_s: How long a dislocation lasts.
+        level_notional: Average size of a level in quote currency, so books
+            hold comparable depth whatever the symbol's price.
+        max_batch: Most updates generated per catch_up(); a consumer that falls
+            further behind skips time instead of replaying a burst.
+    """
+
+    def __init__(self, venues, symbols, depth=20, update_rate=1000.0, volatility=0.00005,
+                 venue_noise=0.00005, dislocation_rate=0.0, dislocation_pct=1.0, dislocation_s=0.5,
+                 level_notional=1000.0, base_prices=None, fee=0.001, max_batch=10_000, seed=None):
+        self.venues = list(venues)
+        self.symbols = list(symbols)
+        self.depth = depth
+        self.update_rate = update_rate
+        self.volatility = volatility
+        self.venue_noise = venue_noise
+        self.dislocation_rate = dislocation_rate
+        self.dislocation_pct = dislocation_pct
+        self.dislocation_s = dislocation_s
+        self.level_notional = level_notional
+        self.fee = fee
+        self.max_batch = max_batch
+        self.rng = random.Random(seed)
+
+        base_prices = base_prices or {}
+        self.fair = {s: float(base_prices.get(s) or 10 ** self.rng.uniform(0, 4.7)) for s in self.symbols}
+        self.books = {}
+        for symbol in self.symbols:
+            tick = _tick_for(self.fair[symbol])
+            unit = level_notional / self.fair[symbol]
+            for venue in self.venues:
+                mid = round(self.fair[symbol] / tick)
+                self.books[(venue, symbol)] = SimulatedBook(venue, symbol, tick, unit, mid, depth, self.rng)
+        self._keys = list(self.books)
+        self._sizes = [_size(self.rng) for _ in range(SIZE_TABLE)]
+        self._next_size = 0
+        self.listeners = []        # Callables receiving each generated batch of updates
+        self.dislocations = []     # Every Dislocation started so far
+        self.generated = 0
+        self.skipped = 0           # Updates dropped because a consumer fell behind
+        self._last = None
+        self._carry = 0.0
+        self._lock = threading.Lock()   # The Quant Engine polls from a thread pool
+
+    # --- Market evolution ---
+
+    def catch_up(self, now=None):
+        """
+        Generates the updates due since the previous call, hands them to the
+        listeners and returns them.
+        """
+        with self._lock:
+            return self._catch_up(time.perf_counter() if now is None else now)
+
+    def _catch_up(self, now):
+        if self._last is None:
+            self._last = now
+            return []
+        due = (now - self._last) * self.update_rate + self._carry
+        self._last = now
+        n = int(due)
+        self._carry = due - n
+        if n > self.max_batch:
+            self.skipped += n - self.max_batch
+            n = self.max_batch
+        if not n:
+            return []
+        rng = self.rng
+        keys = self._keys
+        start_p = self.dislocation_rate / self.update_rate if self.update_rate else 0.0
+        updates = [self.step(*keys[int(rng.random() * len(keys))], now, rng.random() < start_p)
+                   for _ in range(n)]
+        self.generated += n
+        for listener in self.listeners:
+            listener(updates)
+        return updates
+
+    def step(self, venue, symbol, now=None, dislocate=False):
+        """Moves one book and returns the change as a sequenced delta BookUpdate."""
+        now = time.perf_counter() if now is None else now
+        rng = self.rng
+        book = self.books[(venue, symbol)]
+        self.fair[symbol] *= math.exp(rng.gauss(0.0, self.volatility))
+        book.offset += -0.05 * book.offset + rng.gauss(0.0, self.venue_noise * 0.3)
+
+        if book.dislocation is not None and now >= book.dislocation.ends:
+            book.dislocation = None
+        if dislocate and book.dislocation is None:
+            pct = self.dislocation_pct * (1 if rng.random() < 0.5 else -1)
+            book.dislocation = Dislocation(venue, symbol, pct, now, now + self.dislocation_s, book.sequence + 1)
+            self.dislocations.append(book.dislocation)
+        shift = book.dislocation.pct / 100 if book.dislocation is not None else 0.0
+
+        target = round(self.fair[symbol] * (1 + book.offset + shift) / book.tick)
+        bids, asks = self._move(book, target)
+        # Refresh one resting level per side, as other participants would:
+        # the touch or the far end of the ladder
+        far = self.depth if rng.random() < 0.5 else 1
+        sizes, i, unit = self._sizes, self._next_size, book.unit
+        for ladder, changes, key in ((book.bids, bids, book.mid - far), (book.asks, asks, book.mid + far)):
+            ladder[key] = size = sizes[i & (SIZE_TABLE - 1)] * unit
+            i += 1
+            changes.append((key * book.tick, size))
+        self._next_size = i
+
+        book.sequence += 1
+        return BookUpdate(venue, symbol, DELTA, bids, asks, book.sequence, time.time() * 1000)
+
+    def _move(self, book, target):
+        """Re-centres the ladders on `target`; returns the level changes."""
+        bids, asks = [], []
+        if target == book.mid:
+            return bids, asks
+        depth, tick, unit = self.depth, book.tick, book.unit
+        sizes, i = self._sizes, self._next_size
+        # Each ladder covers mid +/- 1..depth ticks; only the levels that fall
+        # out of (or into) that window change, so a move costs O(|shift|)
+        old = (range(book.mid - depth, book.mid), range(book.mid + 1, book.mid + depth + 1))
+        new = (range(target - depth, target), range(target + 1, target + depth + 1))
+        for ladder, changes, was, now in ((book.bids, bids, old[0], new[0]), (book.asks, asks, old[1], new[1])):
+            for key in _outside(was, now):
+                del ladder[key]
+                changes.append((key * tick, 0.0))
+            for key in _outside(now, was):
+                ladder[key] = size = sizes[i & (SIZE_TABLE - 1)] * unit
+                i += 1
+                changes.append((key * tick, size))
+        self._next_size = i
+        book.mid = target
+        return bids, asks
+
+    def snapshot(self, venue, symbol, limit=None):
+        book = self.books[(venue, symbol)]
+        with self._lock:
+            return BookUpdate(venue, symbol, SNAPSHOT, book.levels('bids', limit), book.levels('asks', limit),
+                              book.sequence, time.time() * 1000)
+
+    # --- Reference data ---
+
+    def markets(self, venue):
+        markets = {}
+        for symbol in self.symbols:
+            base, _, quote = symbol.partition('/')
+            markets[symbol] = {
+                'id': symbol.replace('/', ''), 'symbol': symbol, 'base': base, 'quote': quote,
+                'active': True, 'spot': True, 'type': 'spot',
+                'maker': self.fee, 'taker': self.fee,
+                'precision': {'price': self.books[(venue, symbol)].tick, 'amount': 1e-4},
+                'limits': {'amount': {'min': 1e-4, 'max': None}},
+            }
+        return markets
+
+    def ticker(self, venue, symbol):
+        book = self.books[(venue, symbol)]
+        with self._lock:
+            bid, ask = book.mid - 1, book.mid + 1
+            bid_volume, ask_volume = book.bids[bid], book.asks[ask]
+        return {
+            'symbol': symbol,
+            'timestamp': int(time.time() * 1000),
+            'bid': bid * book.tick, 'bidVolume': bid_volume,
+            'ask': ask * book.tick, 'askVolume': ask_volume,
+            'last': book.mid * book.tick,
+        }
+
+
+class _SimulatedVenue:
+    """State and fault injection shared by the async and sync clients."""
+
+    def __init__(self, exchange_id, simulator, latency=0.0, jitter=0.0, failure_rate=0.0,
+                 rate_limit=50, seed=None):
+        self.id = exchange_id
+        self.simulator = simulator
+        self.latency = latency          # Seconds added to every request
+        self.jitter = jitter            # Uniform extra latency, 0..jitter seconds
+        self.failure_rate = failure_rate
+        self.rateLimit = rate_limit     # ms between requests, read by RefreshScheduler
+        self.has = {'fetchTicker': True, 'fetchTickers': True, 'fetchOrderBook': True}
+        self.markets = {}
+        self.currencies = {}
+        self.symbols = []
+        self.requests = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.symbols = sorted(markets)
+        self.currencies = currencies or {}
+
+    def _delay(self):
+        return self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+
+    def _check(self, symbol=None):
+        self.requests += 1
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            self.failures += 1
+            raise SimulatedNetworkError(f"{self.id}: injected failure")
+        if symbol is not None and (self.id, symbol) not in self.simulator.books:
+            raise KeyError(f"{self.id} does not list {symbol}")
+        self.simulator.catch_up()
+
+    def _load_markets(self):
+        if not self.markets:
+            self.set_markets(self.simulator.markets(self.id))
+        return self.markets
+
+    def _tickers(self, symbols):
+        return {s: self.simulator.ticker(self.id, s) for s in (symbols or self.symbols or self.simulator.symbols)}
+
+    def _order_book(self, symbol, limit):
+        update = self.simulator.snapshot(self.id, symbol, limit)
+        return {'symbol': symbol, 'bids': update.bids, 'asks': update.asks,
+                'nonce': update.sequence, 'timestamp': int(update.timestamp)}
+
+
+class SimulatedExchange(_SimulatedVenue):
+    """ccxt.async_support-style client over a MarketSimulator."""
+
+    async def _request(self, symbol=None):
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        self._check(symbol)
+
+    async def load_markets(self, reload=False):
+        await self._request()
+        if reload:
+            self.markets = {}
+        return self._load_markets()
+
+    async def fetch_ticker(self, symbol):
+        await self._request(symbol)
+        return self.simulator.ticker(self.id, symbol)
+
+    async def fetch_tickers(self, symbols=None):
+        await self._request()
+        return self._tickers(symbols)
+
+    async def fetch_order_book(self, symbol, limit=None):
+        await self._request(symbol)
+        return self._order_book(symbol, limit)
+
+    async def close(self):
+        pass
+
+
+class SyncSimulatedExchange(_SimulatedVenue):
+    """Synchronous ccxt-style client, for the Quant Engine's threaded poller."""
+
+    def _request(self, symbol=None):
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        self._check(symbol)
+
+    def load_markets(self, reload=False):
+        self._request()
+        if reload:
+            self.markets = {}
+        return self._load_markets()
+
+    def fetch_ticker(self, symbol):
+        self._request(symbol)
+        return self.simulator.ticker(self.id, symbol)
+
+    def fetch_tickers(self, symbols=None):
+        self._request()
+        return self._tickers(symbols)
+
+    def fetch_order_book(self, symbol, limit=None):
+        self._request(symbol)
+        return self._order_book(symbol, limit)
+
+    def close(self):
+        pass
+
+
+class SimulatedFeed(BookFeed):
+    """
+    Streams a MarketSimulator as a snapshot per book followed by deltas.
+
+    The feed drives the simulator: it generates the updates that became due
+    and yields them, sleeping `interval` seconds only when nothing was due. `latency` holds each update back
+    before delivery; `gap_rate` drops deltas so the consumer sees a sequence
+    gap and calls resync(), which queues a fresh snapshot.
+    """
+
+    def __init__(self, simulator, venues=None, symbols=None, depth=None, interval=0.001,
+                 latency=0.0, gap_rate=0.0, seed=None):
+        self.simulator = simulator
+        self.venues = set(venues or simulator.venues)
+        self.symbols = set(symbols or simulator.symbols)
+        self.depth = depth
+        self.interval = interval
+        self.latency = latency
+        self.gap_rate = gap_rate
+        self.delivered = 0
+        self.dropped = 0
+        self.lag = 0.0            # Generation to delivery of the last update, seconds
+        self._pending = deque()   # (release time, update)
+        self._resync = deque()
+        self._rng = random.Random(seed)
+        self._closed = False
+        simulator.listeners.append(self._on_updates)
+
+    def _on_updates(self, updates):
+        release = time.perf_counter() + self.latency
+        for update in updates:
+            if update.exchange not in self.venues or update.symbol not in self.symbols:
+                continue
+            if self.gap_rate and self._rng.random() < self.gap_rate:
+                self.dropped += 1
+                continue
+            self._pending.append((release, update))
+
+    async def stream(self):
+        for venue in self.venues:
+            for symbol in self.symbols:
+                yield self.simulator.snapshot(venue, symbol, self.depth)
+        pending = self._pending
+        while not self._closed:
+            self.simulator.catch_up()
+            now = time.perf_counter()
+            while self._resync:
+                yield self.simulator.snapshot(*self._resync.popleft(), self.depth)
+            delivered = self.delivered
+            while pending and pending[0][0] <= now:
+                self.delivered += 1
+                release, update = pending.popleft()
+                self.lag = time.perf_counter() - release + self.latency
+                yield update
+            # Only idle when there was nothing to deliver; a consumer that is
+            # keeping up just yields to the loop and immediately catches up
+            await asyncio.sleep(0 if self.delivered > delivered else self.interval)
+
+    async def resync(self, exchange, symbol):
+        self._resync.append((exchange, symbol))
+
+    async def close(self):
+        self._closed = True
+        if self._on_updates in self.simulator.listeners:
+            self.simulator.listeners.remove(self._on_updates)
@@ -0,0 +1,216 @@
+"""
+Hot-path latency instrumentation for the Live Alpha loop.
+
+Spans are timed with the monotonic `perf_counter_ns` clock and recorded
+into HDR-style log-linear histograms (constant relative precision, fixed
+memory, O(1) record), one per span name such as `fetch.binance`,
+`apply.kraken` or `strategy.evaluate`. Snapshots report p50/p99/p99.9 and
+can be exported periodically as JSON lines to a local file or POSTed to an
+HTTP endpoint. A disabled Instrumentation turns every call into a no-op.
+"""
+
+import asyncio
+import json
+import time
+import urllib.request
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of nanosecond values. Each power-of-two range is
+    split into 2**sub_bits buckets, so any reported percentile is within
+    1 / 2**sub_bits of the true value.
+    """
+
+    __slots__ = ('sub_bits', 'sub_count', 'counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self, sub_bits=5):
+        self.sub_bits = sub_bits
+        self.sub_count = 1 << sub_bits
+        self.counts = [0] * ((64 - sub_bits) * self.sub_count)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        if value < 2 * self.sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits - 1
+        return (shift + 1) * self.sub_count + (value >> shift) - self.sub_count
+
+    def _value(self, index):
+        """Midpoint of the value range covered by bucket `index`."""
+        if index < 2 * self.sub_count:
+            return index
+        shift = index // self.sub_count - 1
+        low = (index - shift * self.sub_count) << shift
+        return low + ((1 << shift) >> 1)
+
+    def record(self, value_ns):
+        value_ns = max(0, int(value_ns))
+        self.counts[self._index(value_ns)] += 1
+        self.count += 1
+        self.total += value_ns
+        if self.min is None or value_ns < self.min:
+            self.min = value_ns
+        if value_ns > self.max:
+            self.max = value_ns
+
+    def percentile(self, pct):
+        """Returns the value at percentile `pct` (0-100) in nanoseconds."""
+        if not self.count:
+            return 0
+        target = max(1, int(round(pct / 100 * self.count)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            if n:
+                seen += n
+                if seen >= target:
+                    return min(self._value(index), self.max)
+        return self.max
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def summary(self):
+        """Summary in microseconds."""
+        return {
+            'count': self.count,
+            'mean_us': self.total / self.count / 1e3 if self.count else 0.0,
+            'min_us': (self.min or 0) / 1e3,
+            'p50_us': self.percentile(50) / 1e3,
+            'p99_us': self.percentile(99) / 1e3,
+            'p999_us': self.percentile(99.9) / 1e3,
+            'max_us': self.max / 1e3,
+        }
+
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'started')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter_ns() - self.started)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Instrumentation:
+    """
+    Registry of named latency histograms.
+
+    Hot-path usage avoids allocations:
+        t0 = metrics.start()
+        ...
+        metrics.stop('fetch.binance', t0)
+    `with metrics.span(name):` is available where a block reads better.
+    """
+
+    def __init__(self, enabled=True, export_path=None, export_url=None, sub_bits=5):
+        self.enabled = enabled
+        self.export_path = export_path
+        self.export_url = export_url
+        self.sub_bits = sub_bits
+        self.histograms = {}
+        self.window_started = time.time()
+
+    def start(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def stop(self, name, started):
+        if self.enabled:
+            self.record(name, time.perf_counter_ns() - started)
+
+    def record(self, name, value_ns):
+        if not self.enabled:
+            return
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LatencyHistogram(self.sub_bits)
+        hist.record(value_ns)
+
+    def span(self, name):
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def snapshot(self, reset=False):
+        """Returns {name: summary} for every span, optionally starting a new window."""
+        now = time.time()
+        snap = {
+            'window_start': self.window_started,
+            'window_end': now,
+            'spans': {name: hist.summary() for name, hist in sorted(self.histograms.items())},
+        }
+        if reset:
+            for hist in self.histograms.values():
+                hist.reset()
+            self.window_started = now
+        return snap
+
+    def export(self, reset=True):
+        """Writes one snapshot as a JSON line to the file and/or endpoint."""
+        if not self.enabled or not self.histograms:
+            return None
+        snap = self.snapshot(reset=reset)
+        self._write(snap)
+        return snap
+
+    def _write(self, snap):
+        payload = json.dumps(snap)
+        if self.export_path:
+            with open(self.export_path, 'a') as f:
+                f.write(payload + '\n')
+        if self.export_url:
+            request = urllib.request.Request(
+                self.export_url, data=payload.encode(), headers={'Content-Type': 'application/json'},
+            )
+            try:
+                urllib.request.urlopen(request, timeout=2).close()
+            except OSError:
+                pass
+
+    async def export_loop(self, interval=10.0):
+        """
+        Exports every `interval` seconds until cancelled. The snapshot is
+        taken on the loop; only the file/HTTP I/O runs in a thread.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if self.enabled and self.histograms:
+                await asyncio.to_thread(self._write, self.snapshot(reset=True))
+
+    def format_table(self):
+        lines = [f"{'SPAN':<24}{'COUNT':>9}{'P50':>11}{'P99':>11}{'P99.9':>11}{'MAX':>11}"]
+        for name, s in self.snapshot()['spans'].items():
+            lines.append(
+                f"{name:<24}{s['count']:>9}"
+                f"{s['p50_us'] / 1e3:>9.2f}ms{s['p99_us'] / 1e3:>9.2f}ms"
+                f"{s['p999_us'] / 1e3:>9.2f}ms{s['max_us'] / 1e3:>9.2f}ms"
+            )
+        return "\n".join(lines)
+
+
+NULL_METRICS = Instrumentation(enabled=False)
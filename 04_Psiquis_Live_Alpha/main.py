@@ -6,6 +6,15 @@ import argparse
 import random
 from datetime import datetime
 
+from order_book import OrderBook, OrderBookManager, RestSnapshotFeed, WebSocketFeed, FileFeed
+from pricing import DepthCurveCache, VenuePriceIndex, optimal_size, walk_price
+from market_data import MarketDataRecorder, ReplayFeed
+from instrumentation import Instrumentation
+from scheduler import RefreshScheduler
+from market_cache import MarketCache, DEFAULT_CACHE_DIR, MISS, STALE
+from exchange_sim import MarketSimulator, SimulatedExchange, SimulatedFeed
+import numpy as np
+
 # --- HACKER UI CONSTANTS ---
 class Colors:
     HEADER = '\033[95m'
@@ -32,41 +41,131 @@ def print_banner():
     print()
 
 class HFTArbitrageBot:
-    def __init__(self, symbol="BTC/USDT", simulate=False):
+    def __init__(self, symbol="BTC/USDT", simulate=False, depth=20, feed="rest", feed_file=None,
+                 exchange_ids=("binance", "kraken"), record_path=None, metrics=None,
+                 market_cache_dir=DEFAULT_CACHE_DIR, offline=False, simulator=None, sim_latency=0.0,
+                 sim_failure_rate=0.0):
         self.symbol = symbol
+        self.exchange_ids = list(exchange_ids)
         self.simulate = simulate
         self.investment = 1000.0  # USD size for weighted price calc
         self.fee_rate = 0.001     # 0.1% per trade
+        self.min_profit_pct = 0.05  # Net profit needed to flag an opportunity
         self.iteration = 0
         self.exchanges = {}
+        self.depth = depth        # Levels kept per side in the local books
+        self.feed_type = feed
+        self.feed_file = feed_file
+        self.feeds = []
+        self.feed_tasks = []
+        self.recorder = MarketDataRecorder(record_path) if record_path else None
+        self.metrics = metrics or Instrumentation(enabled=False)
+        self.metrics_interval = 10.0  # Seconds between metric exports
+        self.metrics_task = None
+        self.scheduler = RefreshScheduler()
+        self.offline = offline    # Start from cached market metadata only
+        # With an exchange_sim.MarketSimulator every venue is simulated locally
+        self.simulator = simulator
+        self.sim_latency = sim_latency
+        self.sim_failure_rate = sim_failure_rate
+        self.market_cache = MarketCache(
+            market_cache_dir, library_version=getattr(ccxt, '__version__', None)
+        ) if market_cache_dir and simulator is None else None
+        self.refresh_tasks = []
+        self.alert_hold = 2.0     # Seconds the radar line stays paused after an alert
+        self.book_manager = OrderBookManager(max_depth=depth, recorder=self.recorder, metrics=self.metrics)
+        self.curves = DepthCurveCache()
+        self.venue_prices = VenuePriceIndex()  # Weighted prices of `investment`, ranked per side
+        # Trade sizes evaluated when sizing a detected opportunity ($100 -> $1M)
+        self.size_grid = np.geomspace(100.0, 1_000_000.0, 64)
         
     async def initialize(self):
         print(f"{Colors.BLUE}[INIT] Initializing Async Event Loop...{Colors.ENDC}")
-        self.exchanges['binance'] = ccxt.binance({'enableRateLimit': True})
-        self.exchanges['kraken'] = ccxt.kraken({'enableRateLimit': True})
+        for name in self.exchange_ids:
+            if self.simulator:
+                self.exchanges[name] = SimulatedExchange(name, self.simulator, latency=self.sim_latency,
+                                                         failure_rate=self.sim_failure_rate)
+            else:
+                self.exchanges[name] = getattr(ccxt, name)({'enableRateLimit': True})
         
-        # Warmup
-        tasks = [ex.load_markets() for ex in self.exchanges.values()]
-        await asyncio.gather(*tasks)
+        # Warmup: markets come from the local cache when possible, so only
+        # cache misses wait on the network; stale entries refresh in the background
+        cold = []
+        for name, ex in self.exchanges.items():
+            status = self.market_cache.warm(name, ex, self.offline) if self.market_cache else MISS
+            if status == MISS:
+                if self.offline:
+                    raise RuntimeError(f"No cached markets for {name} (offline mode)")
+                cold.append(name)
+            elif status == STALE and not self.offline:
+                self.refresh_tasks.append(
+                    self.market_cache.refresh_in_background(name, ex, on_error=self.report_refresh_error)
+                )
+        await asyncio.gather(*(self.exchanges[name].load_markets() for name in cold))
+        if self.market_cache:
+            for name in cold:
+                self.market_cache.store(name, self.exchanges[name])
+        print(f"{Colors.BLUE}[CACHE] Markets warmed from disk: {len(self.exchanges) - len(cold)}/{len(self.exchanges)}{Colors.ENDC}")
+        for name, ex in self.exchanges.items():
+            self.scheduler.register(name, ex)
         print(f"{Colors.GREEN}[OK] Connected to Liquidity Providers (Public API){Colors.ENDC}\n")
 
+        self.start_feeds()
+
+    def report_refresh_error(self, name, e):
+        print(f"\n{Colors.WARNING}[CACHE] Background market refresh failed for {name}: {e}{Colors.ENDC}")
+
+    def start_feeds(self):
+        """
+        Wires the order book feeds into the local book manager.
+        """
+        if self.feed_type == "file":
+            self.feeds = [FileFeed(self.feed_file)]
+        elif self.feed_type == "sim":
+            self.feeds = [SimulatedFeed(self.simulator, self.exchange_ids, [self.symbol], depth=self.depth,
+                                        latency=self.sim_latency)]
+        elif self.feed_type == "ws":
+            self.feeds = [
+                WebSocketFeed(name, [self.symbol], depth=self.depth, metrics=self.metrics)
+                for name in self.exchanges
+            ]
+        else:
+            self.feeds = [
+                RestSnapshotFeed(name, ex, [self.symbol], depth=self.depth,
+                                 metrics=self.metrics, scheduler=self.scheduler)
+                for name, ex in self.exchanges.items()
+            ]
+        self.feed_tasks = [asyncio.create_task(self.book_manager.consume(feed)) for feed in self.feeds]
+        if self.metrics.enabled and (self.metrics.export_path or self.metrics.export_url):
+            self.metrics_task = asyncio.create_task(self.metrics.export_loop(self.metrics_interval))
+        print(f"{Colors.BLUE}[BOOK] Local order books online ({self.feed_type} feed, depth {self.depth}){Colors.ENDC}")
+
     async def close(self):
+        if self.metrics_task:
+            self.metrics_task.cancel()
+        if self.metrics.enabled and self.metrics.histograms:
+            print(f"\n{Colors.BLUE}[METRICS] Latency since last export{Colors.ENDC}")
+            print(self.metrics.format_table())
+            self.metrics.export()
+        for task in self.feed_tasks + self.refresh_tasks:
+            task.cancel()
+        for feed in self.feeds:
+            await feed.close()
         for ex in self.exchanges.values():
             await ex.close()
-
-    async def fetch_book(self, exchange_name):
-        try:
-            # Fetch Level 2 Order Book (Limit 5 for speed)
-            return await self.exchanges[exchange_name].fetch_order_book(self.symbol, limit=5)
-        except Exception:
-            return None
+        if self.recorder:
+            self.recorder.close()
 
     def get_weighted_price(self, order_book, side, amount_usd):
         """
         Calculates the real execution price for a given USD amount 
         by walking the order book depth.
         side: 'bids' (selling into) or 'asks' (buying from)
+        Local OrderBooks are walked in place (pricing.walk_price); ccxt
+        order book dicts are walked level by level below.
         """
+        if isinstance(order_book, OrderBook):
+            return walk_price(order_book.side(side), amount_usd)
         if not order_book or side not in order_book:
             return None
             
@@ -95,6 +194,108 @@ class HFTArbitrageBot:
             
         return weighted_sum / total_qty
 
+    def size_opportunity(self, buy_book, sell_book):
+        """
+        Walks the whole size grid on both books at once and returns the
+        most profitable (amount_usd, profit_pct, profit_usd), or None.
+        """
+        return optimal_size(
+            self.curves.get(buy_book, 'asks'),
+            self.curves.get(sell_book, 'bids'),
+            self.size_grid,
+            self.fee_rate,
+        )
+
+    def venue_price(self, name, book):
+        """
+        Weighted (buy, sell) prices of `self.investment` on one venue's book.
+        Local books are re-priced (and re-ranked in `venue_prices`) only when
+        their version changes; ccxt order book dicts are priced every time.
+        """
+        if not isinstance(book, OrderBook):
+            buy_p = self.get_weighted_price(book, 'asks', self.investment)
+            sell_p = self.get_weighted_price(book, 'bids', self.investment)
+            self.venue_prices.set(name, buy_p, sell_p)
+            return buy_p, sell_p
+        return self.venue_prices.update(name, book, self.investment)
+
+    def find_opportunity(self, books):
+        """
+        Pairs the cheapest weighted ask with the richest weighted bid across
+        every venue (N prices per side instead of N*(N-1) hand-written
+        strategies). Only venues whose book changed since the last call are
+        re-priced, and the best ones are read off the ranked price index
+        instead of sorting every venue. Returns (opportunity, best_gross_spread_pct).
+        """
+        for name, book in books.items():
+            self.venue_price(name, book)
+        buys, sells = self.venue_prices.best(books, 2)
+
+        opportunity = None
+        best_spread = -99
+        # The best cross-venue pair always uses a top-two entry on each side
+        for buy_p, buy_ex in buys:
+            for sell_p, sell_ex in sells:
+                if buy_ex == sell_ex:
+                    continue
+                best_spread = max(best_spread, (sell_p - buy_p) / buy_p * 100)
+                # Net Profit = (Sell * (1-fee)) - (Buy * (1+fee))
+                net_sell = sell_p * (1 - self.fee_rate)
+                net_buy = buy_p * (1 + self.fee_rate)
+                profit_pct = ((net_sell - net_buy) / net_buy) * 100
+
+                if profit_pct > self.min_profit_pct and (not opportunity or profit_pct > opportunity[4]):
+                    opportunity = (buy_ex.upper(), sell_ex.upper(), buy_p, sell_p, profit_pct)
+        return opportunity, best_spread
+
+    def ready_books(self):
+        """
+        Returns the local books for self.symbol that are in sync and two-sided.
+        """
+        books = {}
+        for name in self.exchange_ids:
+            book = self.book_manager.get(name, self.symbol)
+            if book and book.bids and book.asks:
+                books[name] = book
+        return books
+
+    async def backtest(self, path, speed=None):
+        """
+        Replays a capture log through the same opportunity logic as run(),
+        with no network. `speed=None` replays as fast as possible.
+        """
+        feed = ReplayFeed(path, speed)
+        print(f"{Colors.BLUE}[REPLAY] {len(feed.replay)} updates / {feed.replay.duration_s:.1f}s of market data from {path}{Colors.ENDC}")
+        print(f"{Colors.BLUE}[CONFIG] Investment: ${self.investment} | Fee: {self.fee_rate*100}% | Min: {self.min_profit_pct}%{Colors.ENDC}")
+
+        evaluations = 0
+        hits = 0
+        est_profit = 0.0
+        t0 = time.perf_counter()
+        async for update in feed.stream():
+            book = self.book_manager.apply(update)
+            if book is None or update.symbol != self.symbol:
+                continue
+            books = self.ready_books()
+            if len(books) < 2:
+                continue
+            evaluations += 1
+            t_eval = self.metrics.start()
+            opportunity, _ = self.find_opportunity(books)
+            self.metrics.stop('strategy.evaluate', t_eval)
+            if opportunity:
+                hits += 1
+                est_profit += self.investment * (opportunity[4] / 100)
+        elapsed = time.perf_counter() - t0
+
+        speedup = feed.replay.duration_s / elapsed if elapsed > 0 else float('inf')
+        print(f"{Colors.GREEN}[DONE] {evaluations} evaluations | {hits} opportunities | EST. PROFIT: ${est_profit:,.2f}{Colors.ENDC}")
+        print(f"{Colors.GREEN}[DONE] Replayed in {elapsed:.2f}s ({speedup:,.0f}x real time){Colors.ENDC}")
+        if self.metrics.enabled:
+            print(self.metrics.format_table())
+            self.metrics.export()
+        return hits, est_profit
+
     async def run(self):
         await self.initialize()
         
@@ -102,66 +303,53 @@ class HFTArbitrageBot:
         print(f"{Colors.BLUE}[CONFIG] Investment: ${self.investment} | Fee: {self.fee_rate*100}% | Sim: {self.simulate}{Colors.ENDC}\n")
 
         try:
+            last_versions = None
+            hold_until = 0.0
             while True:
-                self.iteration += 1
-                
-                # 1. Async Fetch
-                t0 = time.time()
-                tasks = {
-                    'binance': self.fetch_book('binance'),
-                    'kraken': self.fetch_book('kraken')
-                }
-                results = await asyncio.gather(*tasks.values(), return_exceptions=True)
-                books = dict(zip(tasks.keys(), results))
+                # 1. Wait for the feeds to change a book, then read the local books.
+                # Feeds are paced by the per-venue rate limits, not by this loop.
+                if not await self.book_manager.wait_for_change():
+                    print(f"\n{Colors.WARNING}[STOP] All order book feeds ended.{Colors.ENDC}")
+                    break
+                books = self.ready_books()
                 
-                if not books['binance'] or not books['kraken'] or isinstance(books['binance'], Exception):
+                if len(books) < 2:
                     continue
+                versions = tuple(book.version for book in books.values())
+                if versions == last_versions:
+                    continue # The update was for another symbol
+                last_versions = versions
+
+                self.iteration += 1
+                t0 = time.perf_counter_ns()
 
                 # 2. Simulation Injection (The "10/10" Demo Feature)
                 if self.simulate and self.iteration % 10 == 0:
-                    # Inject a massive anomaly in Kraken's book
-                    # We lower Kraken ASK to create a BUY opportunity there
-                    best_bid_binance = books['binance']['bids'][0][0]
-                    fake_ask = best_bid_binance * 0.990 # 1% lower than Binance Bid
+                    # Inject a massive anomaly in the second venue's book (Kraken by default)
+                    # We lower its ASK to create a BUY opportunity there
+                    ref_ex, sim_ex = list(books)[:2]
+                    best_bid_ref = books[ref_ex].bids.best_price()
+                    fake_ask = best_bid_ref * 0.990 # 1% lower than the reference Bid
                     
-                    # Overwrite the first level of Kraken Asks
-                    books['kraken']['asks'][0] = [fake_ask, 5.0] # Price, Volume
+                    # Overwrite the first level of Asks on a scratch copy
+                    # so the anomaly never leaks into the live local book
+                    books[sim_ex] = books[sim_ex].copy()
+                    books[sim_ex].asks.update(books[sim_ex].asks.best_price(), 0)
+                    books[sim_ex].asks.update(fake_ask, 5.0) # Price, Volume
 
-                # 3. Calculate Real Execution Prices (Weighted)
-                # Strategy A: Buy Binance (Ask), Sell Kraken (Bid)
-                price_buy_bin = self.get_weighted_price(books['binance'], 'asks', self.investment)
-                price_sell_krk = self.get_weighted_price(books['kraken'], 'bids', self.investment)
-                
-                # Strategy B: Buy Kraken (Ask), Sell Binance (Bid)
-                price_buy_krk = self.get_weighted_price(books['kraken'], 'asks', self.investment)
-                price_sell_bin = self.get_weighted_price(books['binance'], 'bids', self.investment)
-
-                opportunity = None
-                
-                # Check Strategy A
-                if price_buy_bin and price_sell_krk:
-                    # Net Profit = (Sell * (1-fee)) - (Buy * (1+fee))
-                    net_sell = price_sell_krk * (1 - self.fee_rate)
-                    net_buy = price_buy_bin * (1 + self.fee_rate)
-                    profit_pct = ((net_sell - net_buy) / net_buy) * 100
-                    
-                    if profit_pct > 0.05: # Min threshold
-                        opportunity = ('BINANCE', 'KRAKEN', price_buy_bin, price_sell_krk, profit_pct)
-
-                # Check Strategy B
-                if not opportunity and price_buy_krk and price_sell_bin:
-                    net_sell = price_sell_bin * (1 - self.fee_rate)
-                    net_buy = price_buy_krk * (1 + self.fee_rate)
-                    profit_pct = ((net_sell - net_buy) / net_buy) * 100
-                    
-                    if profit_pct > 0.05:
-                        opportunity = ('KRAKEN', 'BINANCE', price_buy_krk, price_sell_bin, profit_pct)
+                # 3. Calculate Real Execution Prices (Weighted) across all venues
+                t_eval = self.metrics.start()
+                opportunity, best_spread = self.find_opportunity(books)
+                self.metrics.stop('strategy.evaluate', t_eval)
 
                 # 4. UI / UX
-                latency = (time.time() - t0) * 1000
+                tick_ns = time.perf_counter_ns() - t0
+                self.metrics.record('tick.total', tick_ns)
+                latency = tick_ns / 1e6
                 
                 if opportunity:
                     buy_ex, sell_ex, buy_p, sell_p, profit = opportunity
+                    sizing = self.size_opportunity(books[buy_ex.lower()], books[sell_ex.lower()])
                     # Clear line
                     sys.stdout.write('\r' + ' ' * 100 + '\r')
                     
@@ -169,28 +357,28 @@ class HFTArbitrageBot:
                     print(f"  {Colors.CYAN}BUY :{Colors.ENDC} {buy_ex:<8} @ {buy_p:.2f}")
                     print(f"  {Colors.CYAN}SELL:{Colors.ENDC} {sell_ex:<8} @ {sell_p:.2f}")
                     print(f"  {Colors.GREEN}EST. PROFIT: ${self.investment * (profit/100):.2f} (Lat: {latency:.1f}ms){Colors.ENDC}")
+                    if sizing:
+                        size_usd, size_pct, size_profit = sizing
+                        print(f"  {Colors.GREEN}OPT. SIZE  : ${size_usd:,.0f} -> ${size_profit:.2f} ({size_pct:.3f}% NET){Colors.ENDC}")
                     print("-" * 50)
-                    time.sleep(2) # Pause to let the user see it
-                else:
+                    # Keep the alert visible without stalling the event loop
+                    hold_until = time.monotonic() + self.alert_hold
+                elif time.monotonic() >= hold_until:
                     # Radar Scan Line (Overwrites itself)
                     # Show best spread found (even if negative)
-                    spread_a = (price_sell_krk - price_buy_bin) / price_buy_bin * 100 if (price_buy_bin and price_sell_krk) else -99
-                    spread_b = (price_sell_bin - price_buy_krk) / price_buy_krk * 100 if (price_buy_krk and price_sell_bin) else -99
-                    best_spread = max(spread_a, spread_b)
-                    
                     color = Colors.FAIL if best_spread < 0 else Colors.WARNING
                     status = f"{Colors.BLUE}SCANNING{Colors.ENDC}"
                     
+                    venues = " | ".join(
+                        f"{name[:3].capitalize()}: {book.asks.best_price():.2f}/{book.bids.best_price():.2f}"
+                        for name, book in books.items()
+                    )
                     sys.stdout.write(
-                        f"\r{status} | {self.symbol} | "
-                        f"Bin: {books['binance']['asks'][0][0]:.2f}/{books['binance']['bids'][0][0]:.2f} | "
-                        f"Krk: {books['kraken']['asks'][0][0]:.2f}/{books['kraken']['bids'][0][0]:.2f} | "
+                        f"\r{status} | {self.symbol} | {venues} | "
                         f"Spread: {color}{best_spread:.3f}%{Colors.ENDC} | "
                         f"Lat: {latency:.0f}ms"
                     )
                     sys.stdout.flush()
-                
-                await asyncio.sleep(0.5)
 
         except KeyboardInterrupt:
             print(f"\n\n{Colors.WARNING}[STOP] HFT Engine Halted.{Colors.ENDC}")
@@ -201,10 +389,53 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--simulate", action="store_true", help="Inject artificial arbitrage opportunities")
     parser.add_argument("--asset", type=str, default="BTC/USDT", help="Trading pair")
+    parser.add_argument("--exchanges", type=str, default="binance,kraken", help="Comma-separated ccxt exchange ids")
+    parser.add_argument("--depth", type=int, default=20, help="Order book levels kept per side")
+    parser.add_argument("--feed", choices=["rest", "ws", "file", "sim"], default="rest", help="Order book update source")
+    parser.add_argument("--feed-file", type=str, default=None, help="JSON-lines update file for --feed file")
+    parser.add_argument("--offline", action="store_true", help="Use cached market metadata only (no load_markets)")
+    parser.add_argument("--market-cache", type=str, default=DEFAULT_CACHE_DIR, help="Market metadata cache directory ('' to disable)")
+    parser.add_argument("--record", type=str, default=None, help="Append every book update to this capture log")
+    parser.add_argument("--replay", type=str, default=None, help="Backtest offline from a capture log")
+    parser.add_argument("--speed", type=float, default=None, help="Replay speed multiplier (default: as fast as possible)")
+    parser.add_argument("--metrics", action="store_true", help="Record per-venue / per-stage latency histograms")
+    parser.add_argument("--metrics-file", type=str, default=None, help="Append metric snapshots (JSON lines) to this file")
+    parser.add_argument("--metrics-url", type=str, default=None, help="POST metric snapshots to this endpoint")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="Seconds between metric exports")
+    parser.add_argument("--fee", type=float, default=None, help="Fee rate per trade, e.g. 0.001")
+    parser.add_argument("--min-profit", type=float, default=None, help="Minimum net profit %% to flag")
+    parser.add_argument("--sim", action="store_true", help="Run against local simulated exchanges (no network)")
+    parser.add_argument("--sim-rate", type=float, default=200.0, help="Simulated book updates per second")
+    parser.add_argument("--sim-dislocations", type=float, default=0.2,
+                        help="Simulated price dislocations per second")
+    parser.add_argument("--sim-latency", type=float, default=0.0, help="Simulated request/feed latency in seconds")
+    parser.add_argument("--sim-failure-rate", type=float, default=0.0,
+                        help="Fraction of simulated requests that fail")
     args = parser.parse_args()
 
     try:
-        bot = HFTArbitrageBot(symbol=args.asset, simulate=args.simulate)
-        asyncio.run(bot.run())
+        metrics = Instrumentation(
+            enabled=bool(args.metrics or args.metrics_file or args.metrics_url),
+            export_path=args.metrics_file,
+            export_url=args.metrics_url,
+        )
+        bot = HFTArbitrageBot(symbol=args.asset, simulate=args.simulate, depth=args.depth,
+                              feed=args.feed, feed_file=args.feed_file,
+                              exchange_ids=args.exchanges.split(","), record_path=args.record,
+                              metrics=metrics, market_cache_dir=args.market_cache, offline=args.offline,
+                              simulator=MarketSimulator(
+                                  args.exchanges.split(","), [args.asset], depth=args.depth,
+                                  update_rate=args.sim_rate, dislocation_rate=args.sim_dislocations,
+                              ) if args.sim or args.feed == "sim" else None,
+                              sim_latency=args.sim_latency, sim_failure_rate=args.sim_failure_rate)
+        bot.metrics_interval = args.metrics_interval
+        if args.fee is not None:
+            bot.fee_rate = args.fee
+        if args.min_profit is not None:
+            bot.min_profit_pct = args.min_profit
+        if args.replay:
+            asyncio.run(bot.backtest(args.replay, args.speed))
+        else:
+            asyncio.run(bot.run())
     except KeyboardInterrupt:
         pass
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+On-disk cache of exchange market and currency metadata (async flavour).
+
+Same file format as the Quant Engine's cache, so both can share one cache
+directory. Exchanges are warmed from disk immediately at startup; stale
+entries are refreshed by a background asyncio task, and offline runs
+(tests, replays) use the cache as-is without touching the network.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+CACHE_SCHEMA = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'psiquis', 'markets')
+DEFAULT_TTL_S = 6 * 3600
+
+# warm() outcomes
+MISS = 'miss'
+FRESH = 'fresh'
+STALE = 'stale'
+
+
+class MarketCache:
+    """
+    Per-exchange JSON files under `directory`, valid for `ttl` seconds.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL_S, library_version=None):
+        self.directory = directory
+        self.ttl = ttl
+        self.library_version = library_version
+
+    def _path(self, exchange_id):
+        return os.path.join(self.directory, f"{exchange_id}.json")
+
+    def load(self, exchange_id):
+        """
+        Returns (entry, is_fresh), or (None, False) when there is no usable
+        entry (missing, unreadable, or written by another schema/ccxt version).
+        """
+        try:
+            with open(self._path(exchange_id)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None, False
+        if entry.get('schema') != CACHE_SCHEMA or entry.get('exchange') != exchange_id:
+            return None, False
+        if self.library_version and entry.get('library_version') != self.library_version:
+            return None, False
+        return entry, time.time() - entry.get('saved_at', 0) < self.ttl
+
+    def store(self, exchange_id, exchange):
+        """Writes the exchange's loaded markets/currencies atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {
+            'schema': CACHE_SCHEMA,
+            'exchange': exchange_id,
+            'library_version': self.library_version,
+            'saved_at': time.time(),
+            'markets': exchange.markets,
+            'currencies': exchange.currencies,
+        }
+        path = self._path(exchange_id)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp, path)
+
+    def warm(self, exchange_id, exchange, offline=False):
+        """
+        Installs cached markets on `exchange` without touching the network.
+        Returns FRESH, STALE or MISS. In offline mode a stale entry counts
+        as fresh since it cannot be refreshed anyway.
+        """
+        entry, fresh = self.load(exchange_id)
+        if entry is None:
+            return MISS
+        exchange.set_markets(entry['markets'], entry.get('currencies'))
+        return FRESH if fresh or offline else STALE
+
+    async def refresh(self, exchange_id, exchange):
+        """
+        Reloads markets over the network; the file write runs off the loop.
+        Everything else runs on the same loop, so `exchange` can reload in
+        place without racing its other users.
+        """
+        await exchange.load_markets(reload=True)
+        await asyncio.to_thread(self.store, exchange_id, exchange)
+
+    def refresh_in_background(self, exchange_id, exchange, on_error=None):
+        """Schedules refresh() as a task; errors go to `on_error`."""
+        async def worker():
+            try:
+                await self.refresh(exchange_id, exchange)
+            except Exception as e:
+                if on_error:
+                    on_error(exchange_id, e)
+        return asyncio.create_task(worker())
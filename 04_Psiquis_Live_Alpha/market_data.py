@@ -0,0 +1,254 @@
+"""
+Binary market-data capture and memory-mapped replay.
+
+Every order book update is appended to a log of fixed-width 48-byte
+records, one per price level, in the order it was applied. Venue and
+symbol names are interned to small ids kept in a JSON sidecar
+(`<log>.meta.json`), which also records how much of the log holds complete
+updates. Replay memory-maps the log as a NumPy structured array and
+rebuilds the same BookUpdate stream, either as fast as possible or paced
+at a multiple of the recorded speed. Replays are deterministic: updates
+come back in exactly the order they were captured.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+
+from order_book import BookFeed, BookUpdate, SNAPSHOT, DELTA
+
+MAGIC = 'psiquis-l2-v2'
+
+# Record flags
+FLAG_SNAPSHOT = 0x01  # Level belongs to a snapshot (else a delta)
+FLAG_END = 0x02       # Last record of its update
+FLAG_EMPTY = 0x04     # Placeholder for an update with no levels
+
+SIDE_BID = 0
+SIDE_ASK = 1
+
+RECORD_DTYPE = np.dtype([
+    ('ts_ns', '<i8'),       # Local receive time (time.time_ns)
+    ('sequence', '<i8'),    # Venue sequence number, -1 if unknown
+    ('timestamp', '<f8'),   # Venue timestamp in ms, NaN if unknown
+    ('venue', '<u2'),
+    ('symbol', '<u2'),
+    ('side', 'u1'),
+    ('flags', 'u1'),
+    ('_pad', 'V2'),
+    ('price', '<f8'),
+    ('size', '<f8'),
+])
+assert RECORD_DTYPE.itemsize == 48
+
+
+def meta_path(path):
+    return path + '.meta.json'
+
+
+class MarketDataRecorder:
+    """
+    Appends BookUpdates to a binary capture log.
+
+    Records are buffered and written `flush_every` records at a time, but
+    only ever at the end of an update, and the sidecar then records the
+    length of the log as complete. Reopening a log after a crash truncates
+    whatever follows the last complete update, so a torn write is never
+    merged into the next recorded update.
+    """
+
+    def __init__(self, path, flush_every=4096):
+        self.path = path
+        self.flush_every = flush_every
+        self.venues = []
+        self.symbols = []
+        self.complete = 0   # Bytes of the log that hold whole updates
+        if os.path.exists(meta_path(path)):
+            with open(meta_path(path)) as f:
+                meta = json.load(f)
+            if meta.get('magic') != MAGIC:
+                raise ValueError(f"{path} was captured as {meta.get('magic')}; record to a new file")
+            self.venues, self.symbols = meta['venues'], meta['symbols']
+            self.complete = meta.get('complete_bytes', 0)
+        self._venue_ids = {name: i for i, name in enumerate(self.venues)}
+        self._symbol_ids = {name: i for i, name in enumerate(self.symbols)}
+        self._pending = []
+        self._file = open(path, 'ab')
+        self._recover()
+        self.records = 0
+
+    def _recover(self):
+        """Truncates the log after its last complete update."""
+        size = self._file.seek(0, os.SEEK_END)
+        start = min(self.complete, size)
+        start -= start % RECORD_DTYPE.itemsize
+        count = (size - start) // RECORD_DTYPE.itemsize
+        end = start
+        if count:
+            with open(self.path, 'rb') as f:
+                f.seek(start)
+                tail = np.frombuffer(f.read(count * RECORD_DTYPE.itemsize), dtype=RECORD_DTYPE)
+            ends = np.flatnonzero(tail['flags'] & FLAG_END)
+            if len(ends):
+                end = start + (int(ends[-1]) + 1) * RECORD_DTYPE.itemsize
+        if end != size:
+            self._file.truncate(end)
+        if end != self.complete:
+            self.complete = end
+            self._write_meta()
+
+    def _intern(self, ids, names, name):
+        index = ids.get(name)
+        if index is None:
+            index = ids[name] = len(names)
+            names.append(name)
+            self._write_meta()
+        return index
+
+    def _write_meta(self):
+        tmp = meta_path(self.path) + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'magic': MAGIC, 'venues': self.venues, 'symbols': self.symbols,
+                       'complete_bytes': self.complete}, f)
+        os.replace(tmp, meta_path(self.path))
+
+    def _append(self, ts_ns, sequence, timestamp, venue, symbol, side, flags, price, size):
+        self._pending.append((ts_ns, sequence, timestamp, venue, symbol, side, flags, b'', price, size))
+        self.records += 1
+
+    def record(self, update, ts_ns=None):
+        ts_ns = time.time_ns() if ts_ns is None else ts_ns
+        venue = self._intern(self._venue_ids, self.venues, update.exchange)
+        symbol = self._intern(self._symbol_ids, self.symbols, update.symbol)
+        sequence = -1 if update.sequence is None else update.sequence
+        timestamp = np.nan if update.timestamp is None else update.timestamp
+        base = FLAG_SNAPSHOT if update.kind == SNAPSHOT else 0
+
+        levels = [(SIDE_BID, level) for level in update.bids]
+        levels += [(SIDE_ASK, level) for level in update.asks]
+        if not levels:
+            self._append(ts_ns, sequence, timestamp, venue, symbol, 0, base | FLAG_EMPTY | FLAG_END, 0.0, 0.0)
+        else:
+            last = len(levels) - 1
+            for i, (side, level) in enumerate(levels):
+                flags = base | (FLAG_END if i == last else 0)
+                self._append(ts_ns, sequence, timestamp, venue, symbol, side, flags, level[0], level[1])
+        # Only whole updates are ever written
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            data = np.array(self._pending, dtype=RECORD_DTYPE).tobytes()
+            self._file.write(data)
+            self._pending = []
+            self._file.flush()
+            self.complete += len(data)
+            self._write_meta()
+        else:
+            self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class MarketDataReplay:
+    """
+    Memory-maps a capture log and rebuilds its BookUpdate stream.
+    """
+
+    def __init__(self, path):
+        with open(meta_path(path)) as f:
+            meta = json.load(f)
+        if meta.get('magic') != MAGIC:
+            raise ValueError(f"{path} is not a {MAGIC} capture")
+        self.venues = meta['venues']
+        self.symbols = meta['symbols']
+        size = os.path.getsize(path)
+        count = size // RECORD_DTYPE.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        # Index of the last record of every update; a torn trailing write is ignored
+        self._ends = np.flatnonzero(self.records['flags'] & FLAG_END)
+
+    def __len__(self):
+        return len(self._ends)
+
+    @property
+    def duration_s(self):
+        if not len(self._ends):
+            return 0.0
+        ts = self.records['ts_ns']
+        return (int(ts[self._ends[-1]]) - int(ts[0])) / 1e9
+
+    def updates(self):
+        """
+        Yields (ts_ns, BookUpdate) in capture order. ts_ns is the local
+        receive time; the BookUpdate carries the venue timestamp.
+        """
+        recs = self.records
+        ts, seq = recs['ts_ns'], recs['sequence']
+        venue_ts = recs['timestamp']
+        venue, symbol = recs['venue'], recs['symbol']
+        side, flags = recs['side'], recs['flags']
+        price, size = recs['price'], recs['size']
+        start = 0
+        for end in self._ends.tolist():
+            f = int(flags[end])
+            if f & FLAG_EMPTY:
+                bids, asks = (), ()
+            else:
+                stop = end + 1
+                px = price[start:stop].tolist()
+                qty = size[start:stop].tolist()
+                sd = side[start:stop].tolist()
+                bids = [(p, q) for p, q, s in zip(px, qty, sd) if s == SIDE_BID]
+                asks = [(p, q) for p, q, s in zip(px, qty, sd) if s == SIDE_ASK]
+            sequence = int(seq[end])
+            ts_ns = int(ts[end])
+            timestamp = float(venue_ts[end])
+            if timestamp != timestamp:  # NaN: the venue sent none
+                timestamp = None
+            elif timestamp.is_integer():
+                timestamp = int(timestamp)
+            yield ts_ns, BookUpdate(
+                self.venues[int(venue[end])],
+                self.symbols[int(symbol[end])],
+                SNAPSHOT if f & FLAG_SNAPSHOT else DELTA,
+                bids, asks,
+                None if sequence < 0 else sequence,
+                timestamp,
+            )
+            start = end + 1
+
+
+class ReplayFeed(BookFeed):
+    """
+    Feeds a capture log into an OrderBookManager. `speed=None` replays as
+    fast as possible; otherwise updates are paced at `speed` x real time.
+    """
+
+    def __init__(self, path, speed=None):
+        self.replay = MarketDataReplay(path)
+        self.speed = speed
+
+    async def stream(self):
+        first_ts = None
+        started = time.monotonic()
+        for i, (ts_ns, update) in enumerate(self.replay.updates()):
+            if self.speed:
+                if first_ts is None:
+                    first_ts = ts_ns
+                due = (ts_ns - first_ts) / 1e9 / self.speed
+                delay = due - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif i % 1024 == 0:
+                await asyncio.sleep(0)
+            yield update
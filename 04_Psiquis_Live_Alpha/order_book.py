@@ -0,0 +1,486 @@
+"""
+Local Level 2 order book engine for the Live Alpha scanner.
+
+Books are kept per (exchange, symbol) as sorted, array-backed price ladders
+that are mutated in place by incremental updates instead of being rebuilt
+from a REST snapshot on every tick. Updates arrive from a pluggable feed
+(REST polling, ccxt.pro websockets, a recorded file or an in-process queue)
+so the engine can run fully offline.
+"""
+
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+from instrumentation import NULL_METRICS
+from scheduler import Backoff
+
+SNAPSHOT = 'snapshot'
+DELTA = 'delta'
+
+# One message from a feed. `bids`/`asks` are iterables of (price, size);
+# in a delta a size of 0 removes the level.
+BookUpdate = namedtuple(
+    'BookUpdate',
+    ['exchange', 'symbol', 'kind', 'bids', 'asks', 'sequence', 'timestamp'],
+)
+
+
+class SequenceGapError(Exception):
+    """Raised when a delta does not follow the last applied sequence number."""
+
+
+class BookSide:
+    """
+    One side of a book as two parallel contiguous arrays.
+    Prices are stored as sort keys (negated for bids) so both sides are
+    ascending and index 0 is always the best level.
+    """
+
+    __slots__ = ('descending', 'keys', 'sizes')
+
+    def __init__(self, descending):
+        self.descending = descending
+        self.keys = array('d')
+        self.sizes = array('d')
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _key(self, price):
+        return -price if self.descending else price
+
+    def _price(self, key):
+        return -key if self.descending else key
+
+    def clear(self):
+        del self.keys[:]
+        del self.sizes[:]
+
+    def load(self, levels):
+        """Replaces the ladder with a full set of (price, size) levels."""
+        ordered = sorted(
+            (self._key(float(level[0])), float(level[1]))
+            for level in levels if level[1] > 0
+        )
+        self.keys = array('d', [key for key, _ in ordered])
+        self.sizes = array('d', [size for _, size in ordered])
+
+    def update(self, price, size):
+        """Sets the size at `price`; a size of 0 removes the level."""
+        self.update_many(((price, size),))
+
+    def update_many(self, levels):
+        """Sets the size of every (price, size) in `levels`, in order; 0 removes a level."""
+        keys, sizes = self.keys, self.sizes
+        sign = -1.0 if self.descending else 1.0
+        for price, size in levels:
+            key = sign * price
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                if size > 0:
+                    sizes[i] = size
+                else:
+                    del keys[i]
+                    del sizes[i]
+            elif size > 0:
+                keys.insert(i, key)
+                sizes.insert(i, size)
+
+    def best(self):
+        """Returns the top level as (price, size), or None if empty."""
+        if not self.keys:
+            return None
+        return self._price(self.keys[0]), self.sizes[0]
+
+    def best_price(self):
+        return self._price(self.keys[0]) if self.keys else None
+
+    def level(self, i):
+        return self._price(self.keys[i]), self.sizes[i]
+
+    def levels(self, depth=None):
+        """Yields (price, size) from the best level outwards."""
+        n = len(self.keys) if depth is None else min(depth, len(self.keys))
+        sign = -1.0 if self.descending else 1.0
+        keys, sizes = self.keys, self.sizes
+        for i in range(n):
+            yield sign * keys[i], sizes[i]
+
+    def truncate(self, depth):
+        """Drops every level beyond `depth`."""
+        if len(self.keys) > depth:
+            del self.keys[depth:]
+            del self.sizes[depth:]
+
+    def copy(self):
+        other = BookSide(self.descending)
+        other.keys = array('d', self.keys)
+        other.sizes = array('d', self.sizes)
+        return other
+
+
+class OrderBook:
+    """
+    Local Level 2 book for one symbol on one exchange.
+    """
+
+    def __init__(self, exchange, symbol, max_depth=None):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.max_depth = max_depth
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.sequence = None
+        self.timestamp = None
+        self.version = 0      # Bumped on every update that changed the book
+        self.in_sync = False  # False until a snapshot lands / after a gap
+        self.resync_pending = False  # A snapshot was requested; drop deltas until it lands
+
+    def side(self, name):
+        """Returns the ladder for a ccxt side name ('bids' or 'asks')."""
+        if name == 'bids':
+            return self.bids
+        if name == 'asks':
+            return self.asks
+        raise KeyError(name)
+
+    def apply_snapshot(self, bids, asks, sequence=None, timestamp=None):
+        """
+        Replaces the book. Returns False if it was already in sync with
+        exactly these levels (e.g. a REST re-poll of a quiet book), in which
+        case `version` is left alone so nothing re-evaluates it.
+        """
+        previous = (self.bids.keys, self.bids.sizes, self.asks.keys, self.asks.sizes)
+        self.bids.load(bids)
+        self.asks.load(asks)
+        if self.max_depth:
+            self.bids.truncate(self.max_depth)
+            self.asks.truncate(self.max_depth)
+        self.sequence = sequence
+        self.timestamp = timestamp
+        changed = not self.in_sync or previous != (self.bids.keys, self.bids.sizes, self.asks.keys, self.asks.sizes)
+        self.in_sync = True
+        self.resync_pending = False
+        if changed:
+            self.version += 1
+        return changed
+
+    def apply_delta(self, bids, asks, sequence=None, timestamp=None):
+        """
+        Applies an incremental update in place. Returns False if the delta
+        was dropped: stale, or the book is waiting for a requested snapshot.
+        Raises:
+            SequenceGapError: If `sequence` skips ahead of the last one seen,
+                or the book is out of sync and no snapshot was requested yet.
+                The book is flagged out of sync until the next snapshot.
+        """
+        if not self.in_sync:
+            if self.resync_pending:
+                return False
+            raise SequenceGapError(f"{self.exchange} {self.symbol}: book awaiting snapshot")
+        if sequence is not None and self.sequence is not None:
+            if sequence <= self.sequence:
+                return False  # Stale or duplicate message
+            if sequence != self.sequence + 1:
+                self.in_sync = False
+                raise SequenceGapError(
+                    f"{self.exchange} {self.symbol}: expected seq {self.sequence + 1}, got {sequence}"
+                )
+        self.bids.update_many(bids)
+        self.asks.update_many(asks)
+        if self.max_depth:
+            self.bids.truncate(self.max_depth)
+            self.asks.truncate(self.max_depth)
+        if sequence is not None:
+            self.sequence = sequence
+        if timestamp is not None:
+            self.timestamp = timestamp
+        self.version += 1
+        return True
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def copy(self):
+        other = OrderBook(self.exchange, self.symbol, self.max_depth)
+        other.bids = self.bids.copy()
+        other.asks = self.asks.copy()
+        other.sequence = self.sequence
+        other.timestamp = self.timestamp
+        other.version = self.version
+        other.in_sync = self.in_sync
+        other.resync_pending = self.resync_pending
+        return other
+
+    def to_ccxt(self, depth=None):
+        """Materialises the book as a ccxt-style dict (allocates, avoid on the hot path)."""
+        return {
+            'symbol': self.symbol,
+            'bids': [[p, q] for p, q in self.bids.levels(depth)],
+            'asks': [[p, q] for p, q in self.asks.levels(depth)],
+            'nonce': self.sequence,
+            'timestamp': self.timestamp,
+        }
+
+
+class OrderBookManager:
+    """
+    Owns every local book and applies feed updates to them.
+    """
+
+    def __init__(self, max_depth=None, recorder=None, metrics=NULL_METRICS):
+        self.max_depth = max_depth
+        self.recorder = recorder  # Optional market_data.MarketDataRecorder
+        self.metrics = metrics
+        self._span_names = {}
+        self.books = {}
+        self.gaps = 0
+        self.updates = 0
+        self.changed = asyncio.Event()
+        self.feeds = 0          # consume() calls still running
+        self._dirty = False     # A book changed since the last wait_for_change()
+
+    def book(self, exchange, symbol):
+        key = (exchange, symbol)
+        book = self.books.get(key)
+        if book is None:
+            book = self.books[key] = OrderBook(exchange, symbol, self.max_depth)
+        return book
+
+    def get(self, exchange, symbol):
+        book = self.books.get((exchange, symbol))
+        if book is None or not book.in_sync:
+            return None
+        return book
+
+    def apply(self, update):
+        """
+        Applies one BookUpdate. Returns the book it changed, or None if the
+        update was dropped (duplicate, unchanged snapshot, or the book needs
+        a resync).
+        """
+        t0 = self.metrics.start()
+        if self.recorder is not None:
+            self.recorder.record(update)
+        book = self.book(update.exchange, update.symbol)
+        if update.kind == SNAPSHOT:
+            if not book.apply_snapshot(update.bids, update.asks, update.sequence, update.timestamp):
+                return None
+        else:
+            try:
+                if not book.apply_delta(update.bids, update.asks, update.sequence, update.timestamp):
+                    return None
+            except SequenceGapError:
+                self.gaps += 1
+                return None
+        span = self._span_names.get(update.exchange)
+        if span is None:
+            span = self._span_names[update.exchange] = f"apply.{update.exchange}"
+        self.metrics.stop(span, t0)
+        self.updates += 1
+        self._dirty = True
+        self.changed.set()
+        return book
+
+    def resync_due(self, exchange, symbol):
+        """
+        True if the book is out of sync and no snapshot has been requested
+        for it yet. Marks the request as made, so each gap asks the feed for
+        exactly one snapshot and later deltas are dropped quietly meanwhile.
+        """
+        book = self.books.get((exchange, symbol))
+        if book is None or book.in_sync or book.resync_pending:
+            return False
+        book.resync_pending = True
+        return True
+
+    async def wait_for_change(self):
+        """
+        Suspends until at least one book has changed since the last call and
+        returns True, or returns False once every feed passed to consume()
+        has ended and there is no change left to read.
+        """
+        while True:
+            await self.changed.wait()
+            self.changed.clear()
+            if self._dirty:
+                self._dirty = False
+                return True
+            if not self.feeds:
+                return False
+
+    async def consume(self, feed):
+        """Applies every update from `feed` until it is exhausted or cancelled."""
+        self.feeds += 1
+        try:
+            async for update in feed.stream():
+                if self.apply(update) is None and self.resync_due(update.exchange, update.symbol):
+                    await feed.resync(update.exchange, update.symbol)
+        finally:
+            self.feeds -= 1
+            self.changed.set()  # Lets wait_for_change() notice the feed ended
+
+
+class BookFeed(ABC):
+    """
+    Interface for order book sources. Subclasses implement `stream()` as an
+    async generator of BookUpdate and may override `resync()`.
+    """
+
+    @abstractmethod
+    def stream(self):
+        """Returns an async iterator of BookUpdate."""
+
+    async def resync(self, exchange, symbol):
+        """Called after a sequence gap; should arrange for a fresh snapshot."""
+
+    async def close(self):
+        pass
+
+
+class RestSnapshotFeed(BookFeed):
+    """
+    Polls `fetch_order_book` and emits snapshots. Fallback for venues
+    without a streaming API.
+    With a scheduler.RefreshScheduler each request fires as soon as the
+    venue's rate budget allows; otherwise it polls every `interval` seconds.
+    """
+
+    def __init__(self, exchange_id, exchange, symbols, depth=20, interval=0.5, metrics=NULL_METRICS,
+                 scheduler=None):
+        self.exchange_id = exchange_id
+        self.exchange = exchange
+        self.symbols = list(symbols)
+        self.depth = depth
+        self.interval = interval
+        self.metrics = metrics
+        self.scheduler = scheduler
+        self.backoff = Backoff()
+
+    async def stream(self):
+        span = f"fetch.{self.exchange_id}"
+        while True:
+            for symbol in self.symbols:
+                if self.scheduler:
+                    await self.scheduler.acquire(self.exchange_id)
+                else:
+                    await self.backoff.wait()
+                t0 = self.metrics.start()
+                try:
+                    ob = await self.exchange.fetch_order_book(symbol, limit=self.depth)
+                except Exception:
+                    if self.scheduler:
+                        self.scheduler.failure(self.exchange_id)
+                    else:
+                        self.backoff.failure()
+                    continue
+                self.metrics.stop(span, t0)
+                if self.scheduler:
+                    self.scheduler.success(self.exchange_id)
+                else:
+                    self.backoff.success()
+                yield BookUpdate(self.exchange_id, symbol, SNAPSHOT,
+                                 ob['bids'], ob['asks'], None, ob.get('timestamp'))
+            if not self.scheduler:
+                await asyncio.sleep(self.interval)
+
+
+class WebSocketFeed(BookFeed):
+    """
+    Streams books through ccxt.pro `watch_order_book`. ccxt.pro maintains
+    the venue's delta stream itself, so each message is forwarded as a
+    depth-limited snapshot carrying the venue nonce.
+    """
+
+    def __init__(self, exchange_id, symbols, depth=20, config=None, metrics=NULL_METRICS):
+        import ccxt.pro as ccxtpro
+        self.exchange_id = exchange_id
+        self.exchange = getattr(ccxtpro, exchange_id)(config or {'enableRateLimit': True})
+        self.symbols = list(symbols)
+        self.depth = depth
+        self.metrics = metrics
+
+    async def _watch(self, symbol, queue):
+        span = f"feed_lag.{self.exchange_id}"
+        backoff = Backoff(base=0.5)
+        while True:
+            try:
+                ob = await self.exchange.watch_order_book(symbol, self.depth)
+            except Exception:
+                backoff.failure()
+                await backoff.wait()
+                continue
+            backoff.success()
+            if ob.get('timestamp'):
+                # Venue timestamp to local receipt (wall clock, includes skew)
+                self.metrics.record(span, (time.time() * 1000 - ob['timestamp']) * 1_000_000)
+            await queue.put(BookUpdate(
+                self.exchange_id, symbol, SNAPSHOT,
+                ob['bids'][:self.depth], ob['asks'][:self.depth],
+                ob.get('nonce'), ob.get('timestamp'),
+            ))
+
+    async def stream(self):
+        queue = asyncio.Queue(maxsize=1024)
+        watchers = [asyncio.create_task(self._watch(s, queue)) for s in self.symbols]
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            for task in watchers:
+                task.cancel()
+
+    async def close(self):
+        await self.exchange.close()
+
+
+class FileFeed(BookFeed):
+    """
+    Replays updates from a JSON-lines file, one object per line with the
+    BookUpdate fields. Intended for offline tests.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    async def stream(self):
+        with open(self.path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                msg = json.loads(line)
+                yield BookUpdate(
+                    msg['exchange'], msg['symbol'], msg.get('kind', DELTA),
+                    msg.get('bids', []), msg.get('asks', []),
+                    msg.get('sequence'), msg.get('timestamp'),
+                )
+                await asyncio.sleep(0)
+
+
+class QueueFeed(BookFeed):
+    """
+    In-process feed: producers call `push()` and the manager consumes.
+    A None sentinel ends the stream.
+    """
+
+    def __init__(self, maxsize=0):
+        self.queue = asyncio.Queue(maxsize)
+
+    def push(self, update):
+        self.queue.put_nowait(update)
+
+    async def stream(self):
+        while True:
+            update = await self.queue.get()
+            if update is None:
+                return
+            yield update
@@ -0,0 +1,227 @@
+"""
+Vectorized depth-walk pricing over local order books.
+
+Each book side is turned into cumulative notional/quantity arrays once per
+book update. Weighted execution prices for any number of trade sizes are
+then answered with a single `searchsorted` call instead of a Python loop
+per size, which makes full slippage curves cheap enough to run every tick.
+
+A single trade size is cheaper to price with walk_price(), a plain walk
+over the book's arrays: it usually stops within a few levels and avoids
+NumPy's per-call overhead, which dominates at that size.
+"""
+
+import sys
+import weakref
+from bisect import bisect_left, insort
+
+try:
+    import numpy as np
+except ImportError:
+    print("The 'numpy' library is not installed.")
+    print("Please install it by running: pip install numpy")
+    sys.exit(1)
+
+
+def walk_price(side, amount_usd):
+    """
+    Volume-weighted execution price for one USD amount on an
+    order_book.BookSide, walking levels from the best one outwards.
+    Returns None if the side cannot fill the amount.
+    """
+    if amount_usd <= 0:
+        return None
+    remaining = amount_usd
+    qty = 0.0
+    sign = -1.0 if side.descending else 1.0
+    for key, size in zip(side.keys, side.sizes):
+        price = sign * key
+        cost = price * size
+        if cost >= remaining:
+            return amount_usd / (qty + remaining / price)
+        qty += size
+        remaining -= cost
+    return None
+
+
+class DepthCurve:
+    """
+    Cumulative liquidity for one side of a book, best level first.
+    """
+
+    __slots__ = ('prices', 'cum_qty', 'cum_notional')
+
+    def __init__(self, prices, sizes):
+        self.prices = np.asarray(prices, dtype=np.float64)
+        sizes = np.asarray(sizes, dtype=np.float64)
+        self.cum_qty = np.cumsum(sizes)
+        self.cum_notional = np.cumsum(self.prices * sizes)
+
+    @classmethod
+    def from_side(cls, side):
+        """Builds a curve from an order_book.BookSide without walking it in Python."""
+        prices = np.array(side.keys, dtype=np.float64)
+        if side.descending:
+            np.negative(prices, out=prices)
+        return cls(prices, np.array(side.sizes, dtype=np.float64))
+
+    @classmethod
+    def from_levels(cls, levels):
+        """Builds a curve from ccxt-style [[price, qty], ...] levels."""
+        arr = np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+        return cls(arr[:, 0], arr[:, 1])
+
+    @property
+    def total_notional(self):
+        return float(self.cum_notional[-1]) if len(self.cum_notional) else 0.0
+
+    @property
+    def total_qty(self):
+        return float(self.cum_qty[-1]) if len(self.cum_qty) else 0.0
+
+    def weighted_prices(self, amounts_usd):
+        """
+        Returns the volume-weighted execution price for every USD amount in
+        `amounts_usd`. Sizes the book cannot fill come back as NaN.
+        """
+        amounts = np.asarray(amounts_usd, dtype=np.float64)
+        n = len(self.prices)
+        if n == 0:
+            return np.full(amounts.shape, np.nan)
+
+        # First level whose cumulative notional covers the amount
+        idx = np.searchsorted(self.cum_notional, amounts, side='left')
+        fillable = idx < n
+        idx = np.minimum(idx, n - 1)
+
+        prev = idx - 1
+        has_prev = prev >= 0
+        prev = np.maximum(prev, 0)
+        prev_notional = np.where(has_prev, self.cum_notional[prev], 0.0)
+        prev_qty = np.where(has_prev, self.cum_qty[prev], 0.0)
+
+        qty = prev_qty + (amounts - prev_notional) / self.prices[idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vwap = amounts / qty
+        return np.where(fillable, vwap, np.nan)
+
+    def weighted_price(self, amount_usd):
+        """Scalar form of weighted_prices(); returns None if liquidity runs out."""
+        price = self.weighted_prices(amount_usd)
+        return None if np.isnan(price) else float(price)
+
+    def fill_qty(self, amounts_usd):
+        """Base-asset quantity obtained for each USD amount (NaN if unfillable)."""
+        amounts = np.asarray(amounts_usd, dtype=np.float64)
+        return amounts / self.weighted_prices(amounts)
+
+
+class DepthCurveCache:
+    """
+    Holds one DepthCurve per (book, side), rebuilt only when the book's
+    version changes. Books are held weakly so scratch copies are released.
+    """
+
+    def __init__(self):
+        self._curves = weakref.WeakKeyDictionary()
+
+    def get(self, book, side):
+        entry = self._curves.get(book)
+        if entry is None:
+            entry = self._curves[book] = {}
+        cached = entry.get(side)
+        if cached is not None and cached[0] == book.version:
+            return cached[1]
+        curve = DepthCurve.from_side(book.side(side))
+        entry[side] = (book.version, curve)
+        return curve
+
+
+class VenuePriceIndex:
+    """
+    Weighted buy and sell prices of one trade size per venue, each side
+    kept ranked best first. A venue is re-priced only when its book, or the
+    book's version, changes and is then re-ranked with a binary search, so
+    reading the best venues never sorts them.
+    """
+
+    def __init__(self):
+        self.prices = {}  # venue -> (book, version, amount, buy, sell)
+        self.buys = []    # Sorted (buy price, venue): cheapest first
+        self.sells = []   # Sorted (-sell price, venue): richest first
+
+    def update(self, venue, book, amount_usd):
+        """
+        (buy, sell) weighted prices of `amount_usd` on an order_book.OrderBook,
+        re-walked only if `book` is not the one last priced for `venue`
+        (scratch copies share the version, so identity is checked too).
+        """
+        cached = self.prices.get(venue)
+        if cached is not None and cached[0] is book and cached[1] == book.version and cached[2] == amount_usd:
+            return cached[3], cached[4]
+        buy = walk_price(book.asks, amount_usd)
+        sell = walk_price(book.bids, amount_usd)
+        self.set(venue, buy, sell, (book, book.version, amount_usd))
+        return buy, sell
+
+    def set(self, venue, buy, sell, source=(None, None, None)):
+        """Re-ranks `venue` at prices computed elsewhere; None leaves a side out."""
+        old = self.prices.get(venue)
+        if old is not None:
+            if old[3]:
+                del self.buys[bisect_left(self.buys, (old[3], venue))]
+            if old[4]:
+                del self.sells[bisect_left(self.sells, (-old[4], venue))]
+        self.prices[venue] = (*source, buy, sell)
+        if buy:
+            insort(self.buys, (buy, venue))
+        if sell:
+            insort(self.sells, (-sell, venue))
+
+    def best(self, venues, count=2):
+        """
+        The top `count` (buy, venue) and (sell, venue) entries, best first,
+        among the venues in `venues`.
+        """
+        buys = []
+        for price, venue in self.buys:
+            if venue in venues:
+                buys.append((price, venue))
+                if len(buys) == count:
+                    break
+        sells = []
+        for key, venue in self.sells:
+            if venue in venues:
+                sells.append((-key, venue))
+                if len(sells) == count:
+                    break
+        return buys, sells
+
+
+def net_profit_pct(buy_prices, sell_prices, fee_rate):
+    """
+    Net round-trip profit in percent after paying `fee_rate` on both legs.
+    Works element-wise on arrays of weighted prices.
+    """
+    net_sell = np.asarray(sell_prices) * (1 - fee_rate)
+    net_buy = np.asarray(buy_prices) * (1 + fee_rate)
+    return (net_sell - net_buy) / net_buy * 100
+
+
+def optimal_size(buy_curve, sell_curve, amounts_usd, fee_rate):
+    """
+    Evaluates a buy-on-one-book / sell-on-the-other trade at every size in
+    `amounts_usd` and returns (best_amount, profit_pct, profit_usd), or
+    None if no size is both fillable and profitable.
+    """
+    amounts = np.asarray(amounts_usd, dtype=np.float64)
+    profit_pct = net_profit_pct(
+        buy_curve.weighted_prices(amounts),
+        sell_curve.weighted_prices(amounts),
+        fee_rate,
+    )
+    profit_usd = np.where(np.isnan(profit_pct), -np.inf, amounts * profit_pct / 100)
+    i = int(np.argmax(profit_usd))
+    if profit_usd[i] <= 0:
+        return None
+    return float(amounts[i]), float(profit_pct[i]), float(profit_usd[i])
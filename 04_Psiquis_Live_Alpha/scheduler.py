@@ -0,0 +1,115 @@
+"""
+Rate-limit-aware refresh scheduling for the Live Alpha feeds.
+
+Each venue gets a token bucket sized to its published rate limit (ccxt's
+`rateLimit`, milliseconds per request) and an adaptive exponential backoff
+for errors. Feeds ask the scheduler for a slot before each request and
+fire as soon as budget is available, instead of sleeping a fixed interval,
+so we get as many refreshes per second as each venue allows without ever
+blocking the event loop.
+"""
+
+import asyncio
+import random
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket on the monotonic clock.
+    """
+
+    def __init__(self, rate, capacity=1.0):
+        self.rate = float(rate)          # Tokens per second
+        self.capacity = float(capacity)  # Burst size
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, cost=1.0):
+        self._refill()
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+    def delay(self, cost=1.0):
+        """Seconds until `cost` tokens are available."""
+        self._refill()
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    async def acquire(self, cost=1.0):
+        while not self.try_acquire(cost):
+            await asyncio.sleep(self.delay(cost))
+
+
+class Backoff:
+    """
+    Exponential backoff with full jitter, reset on the first success.
+    """
+
+    def __init__(self, base=0.25, cap=30.0):
+        self.base = base
+        self.cap = cap
+        self.failures = 0
+        self.resume_at = 0.0
+
+    def failure(self):
+        self.failures += 1
+        delay = random.uniform(0, min(self.cap, self.base * (2 ** self.failures)))
+        self.resume_at = time.monotonic() + delay
+        return delay
+
+    def success(self):
+        self.failures = 0
+        self.resume_at = 0.0
+
+    async def wait(self):
+        delay = self.resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RefreshScheduler:
+    """
+    Per-venue token buckets and backoffs shared by every feed of a venue.
+    """
+
+    def __init__(self, headroom=0.9):
+        self.headroom = headroom  # Fraction of the published limit we use
+        self.buckets = {}
+        self.backoffs = {}
+        self.requests = {}
+        self.errors = {}
+
+    def register(self, venue, exchange=None, rate=None, burst=1.0):
+        """
+        Adds a venue. The rate defaults to the ccxt exchange's `rateLimit`
+        (ms between requests) scaled by `headroom`.
+        """
+        if rate is None:
+            rate_limit_ms = getattr(exchange, 'rateLimit', None) or 1000
+            rate = self.headroom * 1000.0 / rate_limit_ms
+        self.buckets[venue] = TokenBucket(rate, burst)
+        self.backoffs[venue] = Backoff()
+        self.requests[venue] = 0
+        self.errors[venue] = 0
+
+    async def acquire(self, venue, cost=1.0):
+        """Waits (without blocking the loop) until `venue` may be hit again."""
+        await self.backoffs[venue].wait()
+        await self.buckets[venue].acquire(cost)
+        self.requests[venue] += 1
+
+    def success(self, venue):
+        self.backoffs[venue].success()
+
+    def failure(self, venue):
+        self.errors[venue] += 1
+        return self.backoffs[venue].failure()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the arbitrage scanners against exchange_sim.
+
+Drives a MarketSimulator with many venues and symbols at a fixed update
+rate, with dislocations injected at a known time, and measures:
+
+- live:  SimulatedFeed -> OrderBookManager -> HFTArbitrageBot.find_opportunity
+         on every applied update (the Live Alpha hot path)
+- quant: the Quant Engine's TickerPoller + CrossExchangeScanner polling
+         SyncSimulatedExchange clients back to back (the Quant Engine's
+         modules must be importable, e.g. PYTHONPATH=../01_Psiquis_Quant_Engine)
+
+For each target it reports updates (or quotes) per second actually
+processed, evaluations and opportunities per second, how many injected
+dislocations were detected, and the detection latency from injection to
+first detection. Results can be appended as JSON lines.
+
+    python sim_benchmark.py --venues 5 --symbols 50 --rate 20000 --seconds 10
+"""
+
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+
+from exchange_sim import MarketSimulator, SimulatedFeed, SyncSimulatedExchange
+from instrumentation import LatencyHistogram
+
+
+class DetectionTracker:
+    """
+    Matches detected opportunities to injected dislocations. A dislocation
+    counts as detected the first time an opportunity on its symbol involves
+    its venue while it is active.
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.latency = LatencyHistogram()
+        self.active = {}      # (venue, symbol) -> Dislocation
+        self.seen = 0
+        self.detected = 0
+        self.missed = 0
+
+    def refresh(self, now):
+        """
+        Picks up new dislocations and expires those that ended before `now`.
+        A consumer working through a backlog should pass the time its
+        current data was generated, not the wall clock.
+        """
+        dislocations = self.simulator.dislocations
+        while self.seen < len(dislocations):
+            d = dislocations[self.seen]
+            self.active[(d.venue, d.symbol)] = d
+            self.seen += 1
+        for key, d in list(self.active.items()):
+            if now > d.ends:
+                del self.active[key]
+                self.missed += 1
+
+    def opportunity(self, symbol, venues, now):
+        for venue in venues:
+            d = self.active.pop((venue, symbol), None)
+            if d is not None:
+                self.detected += 1
+                self.latency.record((now - d.started) * 1e9)
+
+    def summary(self):
+        lat = self.latency.summary()
+        return {
+            'dislocations': self.seen,
+            'detected': self.detected,
+            'missed': self.missed,
+            'detection_p50_ms': lat['p50_us'] / 1e3,
+            'detection_p99_ms': lat['p99_us'] / 1e3,
+            'detection_max_ms': lat['max_us'] / 1e3,
+        }
+
+
+def make_simulator(args):
+    venues = [f"venue{i}" for i in range(args.venues)]
+    symbols = [f"SYM{i}/USDT" for i in range(args.symbols)]
+    return MarketSimulator(venues, symbols, depth=args.depth, update_rate=args.rate,
+                           dislocation_rate=args.dislocations, dislocation_pct=args.dislocation_pct,
+                           seed=args.seed)
+
+
+async def bench_live(args):
+    from main import HFTArbitrageBot
+
+    sim = make_simulator(args)
+    feed = SimulatedFeed(sim, depth=args.depth, latency=args.latency, gap_rate=args.gap_rate, seed=args.seed)
+    bot = HFTArbitrageBot(symbol=sim.symbols[0], depth=args.depth, exchange_ids=sim.venues,
+                          market_cache_dir=None, simulator=sim)
+    manager = bot.book_manager
+    tracker = DetectionTracker(sim)
+    evaluate = LatencyHistogram()
+    evaluations = opportunities = resyncs = 0
+
+    started = time.perf_counter()
+    deadline = started + args.seconds
+    async for update in feed.stream():
+        book = manager.apply(update)
+        if book is None:
+            if manager.resync_due(update.exchange, update.symbol):
+                resyncs += 1
+                await feed.resync(update.exchange, update.symbol)
+            continue
+        books = {}
+        for venue in sim.venues:
+            other = manager.get(venue, update.symbol)
+            if other is not None and other.bids and other.asks:
+                books[venue] = other
+        if len(books) < 2:
+            continue
+        t0 = time.perf_counter()
+        opportunity, _ = bot.find_opportunity(books)
+        now = time.perf_counter()
+        evaluate.record((now - t0) * 1e9)
+        evaluations += 1
+        tracker.refresh(now - feed.lag)
+        if opportunity:
+            opportunities += 1
+            tracker.opportunity(update.symbol, (opportunity[0].lower(), opportunity[1].lower()), now)
+        if now >= deadline:
+            break
+    elapsed = time.perf_counter() - started
+    await feed.close()
+
+    return {
+        'updates_per_s': manager.updates / elapsed,
+        'generated_per_s': sim.generated / elapsed,
+        'evaluations_per_s': evaluations / elapsed,
+        'opportunities_per_s': opportunities / elapsed,
+        'evaluate_p99_us': evaluate.summary()['p99_us'],
+        'feed_lag_ms': feed.lag * 1e3,
+        'skipped_updates': sim.skipped,
+        'resyncs': resyncs,
+        **tracker.summary(),
+    }
+
+
+def bench_quant(args):
+    try:
+        from poller import TickerPoller
+        from scanner import CrossExchangeScanner
+    except ImportError:
+        print("[ERROR] The quant target needs the Quant Engine's modules on PYTHONPATH "
+              "(e.g. PYTHONPATH=../01_Psiquis_Quant_Engine).")
+        sys.exit(1)
+
+    sim = make_simulator(args)
+    exchanges = {
+        venue: SyncSimulatedExchange(venue, sim, latency=args.latency, failure_rate=args.failure_rate,
+                                     seed=args.seed)
+        for venue in sim.venues
+    }
+    for exchange in exchanges.values():
+        exchange.load_markets()
+    scanner = CrossExchangeScanner(sim.venues, sim.symbols, args.min_spread_pct)
+    poller = TickerPoller(exchanges, sim.symbols)
+    tracker = DetectionTracker(sim)
+    quotes = opportunities = cycles = errors = 0
+
+    started = time.perf_counter()
+    try:
+        while time.perf_counter() - started < args.seconds:
+            result = poller.poll()
+            cycles += 1
+            errors += len(result.errors)
+            now = time.perf_counter()
+            tracker.refresh(now)
+            for quote in result.quotes:
+                quotes += 1
+                opportunity = scanner.update(quote)
+                if opportunity:
+                    opportunities += 1
+                    tracker.opportunity(quote.symbol, (opportunity.buy_exchange, opportunity.sell_exchange), now)
+    finally:
+        poller.close()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'quotes_per_s': quotes / elapsed,
+        'generated_per_s': sim.generated / elapsed,
+        'cycles_per_s': cycles / elapsed,
+        'opportunities_per_s': opportunities / elapsed,
+        'request_errors': errors,
+        'skipped_updates': sim.skipped,
+        **tracker.summary(),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load-test the arbitrage scanners on simulated exchanges.")
+    parser.add_argument("--target", nargs='+', choices=['live', 'quant'], default=['live', 'quant'])
+    parser.add_argument("--venues", type=int, default=5)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=20_000, help="Simulated book updates per second.")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--dislocations", type=float, default=5.0, help="Injected dislocations per second.")
+    parser.add_argument("--dislocation-pct", type=float, default=1.0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Injected feed/request latency in seconds.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests that fail (quant).")
+    parser.add_argument("--gap-rate", type=float, default=0.0, help="Fraction of deltas dropped (live).")
+    parser.add_argument("--min-spread-pct", type=float, default=0.5, help="Scanner threshold (quant).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON-lines file to append results to.")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    for target in args.target:
+        outcome = asyncio.run(bench_live(args)) if target == 'live' else bench_quant(args)
+        result = {
+            'timestamp': time.time(), 'target': target, 'venues': args.venues, 'symbols': args.symbols,
+            'rate': args.rate, 'seconds': args.seconds, 'latency': args.latency,
+            **outcome, 'python': platform.python_version(),
+        }
+        results.append(result)
+        print(f"[{target.upper()}]")
+        for key, value in outcome.items():
+            print(f"  {key:<22}{value:>14,.2f}" if isinstance(value, float) else f"  {key:<22}{value!s:>14}")
+
+    if args.output:
+        with open(args.output, 'a') as f:
+            for result in results:
+                f.write(json.dumps(result) + '\n')
+        print(f"[SUCCESS] {len(results)} results appended to '{args.output}'.")
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from exchange_sim import MarketSimulator, SimulatedExchange, SimulatedFeed, SimulatedNetworkError
+from order_book import SNAPSHOT, OrderBookManager
+
+VENUES = ['a', 'b', 'c']
+SYMBOLS = ['BTC/USDT', 'DOGE/USDT']
+
+
+def _simulator(**kwargs):
+    kwargs.setdefault('base_prices', {'BTC/USDT': 50_000.0, 'DOGE/USDT': 0.1})
+    return MarketSimulator(VENUES, SYMBOLS, depth=10, update_rate=1000, seed=1, **kwargs)
+
+
+def test_deltas_rebuild_the_simulated_books():
+    sim = _simulator(dislocation_rate=50)
+    manager = OrderBookManager()
+    for venue in VENUES:
+        for symbol in SYMBOLS:
+            manager.apply(sim.snapshot(venue, symbol))
+    sim.catch_up(0.0)
+    updates = sim.catch_up(2.0)
+    assert len(updates) == 2000 and sim.dislocations
+    for update in updates:
+        assert manager.apply(update) is not None  # Every delta is in sequence
+    for (venue, symbol), simulated in sim.books.items():
+        book = manager.get(venue, symbol)
+        assert list(book.bids.levels()) == [tuple(level) for level in simulated.levels('bids')]
+        assert list(book.asks.levels()) == [tuple(level) for level in simulated.levels('asks')]
+
+
+def test_levels_hold_comparable_notional_at_any_price():
+    sim = _simulator()
+    for symbol in SYMBOLS:
+        book = sim.snapshot('a', symbol)
+        notional = sum(price * size for price, size in book.asks)
+        assert 2_000 < notional < 50_000  # 10 levels of about $1,000
+
+
+def test_falling_behind_skips_time():
+    sim = _simulator()
+    sim.max_batch = 100
+    sim.catch_up(0.0)
+    assert len(sim.catch_up(1.0)) == 100 and sim.skipped == 900
+
+
+def test_feed_gap_triggers_one_snapshot():
+    async def run():
+        sim = _simulator()
+        feed = SimulatedFeed(sim, venues=['a'], symbols=['BTC/USDT'], gap_rate=0.5, seed=3)
+        manager = OrderBookManager()
+        kinds = []
+        async for update in feed.stream():
+            kinds.append(update.kind)
+            if manager.apply(update) is None and manager.resync_due(update.exchange, update.symbol):
+                await feed.resync(update.exchange, update.symbol)
+            if kinds.count(SNAPSHOT) > 1 or len(kinds) > 10_000:
+                break
+        await feed.close()
+        return kinds, manager, feed
+
+    kinds, manager, feed = asyncio.run(run())
+    assert feed.dropped and manager.gaps
+    assert kinds.count(SNAPSHOT) == 2 and kinds[-1] == SNAPSHOT  # The initial one, then the resync
+    assert manager.gaps == 1 and manager.get('a', 'BTC/USDT') is not None
+
+
+def test_exchange_client_injects_failures():
+    async def run():
+        sim = _simulator()
+        exchange = SimulatedExchange('a', sim, failure_rate=1.0, seed=0)
+        with pytest.raises(SimulatedNetworkError):
+            await exchange.fetch_ticker('BTC/USDT')
+        exchange.failure_rate = 0.0
+        markets = await exchange.load_markets()
+        ticker = await exchange.fetch_ticker('BTC/USDT')
+        book = await exchange.fetch_order_book('BTC/USDT', limit=5)
+        return markets, ticker, book, exchange
+
+    markets, ticker, book, exchange = asyncio.run(run())
+    assert set(markets) == set(SYMBOLS)
+    assert ticker['bid'] < ticker['ask'] and ticker['bid'] == book['bids'][0][0]
+    assert len(book['asks']) == 5 and exchange.failures == 1
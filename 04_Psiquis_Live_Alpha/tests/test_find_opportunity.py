@@ -0,0 +1,50 @@
+import pytest
+
+pytest.importorskip('ccxt')
+
+from main import HFTArbitrageBot  # noqa: E402
+from order_book import OrderBook  # noqa: E402
+
+
+def _books(names, mid=100.0):
+    books = {}
+    for i, name in enumerate(names):
+        book = OrderBook(name, 'BTC/USDT')
+        book.apply_snapshot([[mid - 0.5 - i * 0.1, 50.0]], [[mid + 0.5 + i * 0.1, 50.0]])
+        books[name] = book
+    return books
+
+
+@pytest.fixture
+def bot():
+    return HFTArbitrageBot(exchange_ids=['a', 'b', 'c'], market_cache_dir=None)
+
+
+def test_no_opportunity_on_a_normal_market(bot):
+    opportunity, spread = bot.find_opportunity(_books('abc'))
+    assert opportunity is None
+    assert spread < 0
+
+
+def test_reprices_only_changed_books(bot, monkeypatch):
+    books = _books('abc')
+    bot.find_opportunity(books)
+    walked = []
+    monkeypatch.setattr('pricing.walk_price', lambda side, amount: walked.append(side) or 100.0)
+    bot.find_opportunity(books)
+    assert walked == []
+
+    books['c'].apply_delta([], [[95.0, 50.0]])
+    monkeypatch.undo()
+    opportunity, _ = bot.find_opportunity(books)
+    assert opportunity[:2] == ('C', 'A')
+
+
+def test_scratch_copy_is_priced_separately(bot):
+    books = _books('abc')
+    bot.find_opportunity(books)
+    scratch = books['a'].copy()
+    scratch.asks.update(90.0, 50.0)
+    opportunity, _ = bot.find_opportunity({**books, 'a': scratch})
+    assert opportunity[0] == 'A' and opportunity[2] == 90.0
+    assert bot.find_opportunity(books)[0] is None
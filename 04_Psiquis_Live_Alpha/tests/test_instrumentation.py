@@ -0,0 +1,50 @@
+import json
+import random
+
+import pytest
+
+from instrumentation import NULL_METRICS, Instrumentation, LatencyHistogram
+
+
+def test_histogram_percentiles_within_bucket_precision():
+    hist = LatencyHistogram(sub_bits=5)
+    values = sorted(random.Random(7).randint(1_000, 50_000_000) for _ in range(10_000))
+    for value in values:
+        hist.record(value)
+    for pct in (50, 99, 99.9):
+        exact = values[max(0, int(round(pct / 100 * len(values))) - 1)]
+        assert hist.percentile(pct) == pytest.approx(exact, rel=1 / 32)
+    assert hist.min == values[0] and hist.max == values[-1]
+    assert hist.percentile(100) <= hist.max
+
+
+def test_small_values_are_exact():
+    hist = LatencyHistogram(sub_bits=5)
+    for value in (0, 1, 5, 63):
+        hist.record(value)
+    assert [hist.percentile(p) for p in (25, 50, 75, 100)] == [0, 1, 5, 63]
+    hist.reset()
+    assert hist.summary()['count'] == 0 and hist.percentile(50) == 0
+
+
+def test_spans_and_json_export(tmp_path):
+    path = tmp_path / 'metrics.jsonl'
+    metrics = Instrumentation(export_path=str(path))
+    with metrics.span('strategy.evaluate'):
+        pass
+    metrics.stop('apply.kraken', metrics.start())
+    metrics.record('apply.kraken', 2_000_000)
+    snap = metrics.export()
+    assert set(snap['spans']) == {'apply.kraken', 'strategy.evaluate'}
+    assert snap['spans']['apply.kraken']['count'] == 2
+    line = json.loads(path.read_text().splitlines()[0])
+    assert line['spans']['apply.kraken']['max_us'] == pytest.approx(2000.0)
+    # export() starts a new window
+    assert metrics.snapshot()['spans']['apply.kraken']['count'] == 0
+
+
+def test_disabled_metrics_record_nothing():
+    with NULL_METRICS.span('x'):
+        pass
+    NULL_METRICS.stop('y', NULL_METRICS.start())
+    assert NULL_METRICS.histograms == {} and NULL_METRICS.export() is None
@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+from market_cache import CACHE_SCHEMA, FRESH, MISS, STALE, MarketCache
+
+
+class FakeExchange:
+    """Just enough of a ccxt.async_support exchange for the cache."""
+
+    def __init__(self):
+        self.markets = None
+        self.currencies = None
+        self.reloads = 0
+
+    async def load_markets(self, reload=False):
+        self.reloads += 1
+        self.set_markets({'ETH/USDT': {'symbol': 'ETH/USDT'}}, {'ETH': {'code': 'ETH'}})
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = dict(markets)
+        self.currencies = currencies
+
+
+def test_warm_installs_fresh_entries_only_for_the_same_library(tmp_path):
+    exchange = FakeExchange()
+    exchange.set_markets({'BTC/USDT': {'symbol': 'BTC/USDT'}})
+    MarketCache(str(tmp_path), library_version='4.0').store('binance', exchange)
+
+    warmed = FakeExchange()
+    assert MarketCache(str(tmp_path), library_version='4.0').warm('binance', warmed) == FRESH
+    assert list(warmed.markets) == ['BTC/USDT']
+    assert MarketCache(str(tmp_path), library_version='4.1').warm('binance', FakeExchange()) == MISS
+
+
+def test_stale_entries_warm_but_count_as_fresh_offline(tmp_path):
+    # The on-disk format is shared with the Quant Engine's cache
+    with open(tmp_path / 'kraken.json', 'w') as f:
+        json.dump({'schema': CACHE_SCHEMA, 'exchange': 'kraken', 'library_version': None, 'saved_at': 0,
+                   'markets': {'ETH/USDT': {}}, 'currencies': None}, f)
+    cache = MarketCache(str(tmp_path))
+    assert cache.warm('kraken', FakeExchange()) == STALE
+    assert cache.warm('kraken', FakeExchange(), offline=True) == FRESH
+
+
+def test_background_refresh_rewrites_the_entry(tmp_path):
+    cache = MarketCache(str(tmp_path))
+    exchange = FakeExchange()
+    errors = []
+
+    async def run():
+        await cache.refresh_in_background('kraken', exchange, on_error=lambda *e: errors.append(e))
+
+    asyncio.run(run())
+    assert not errors and exchange.reloads == 1
+    entry, fresh = cache.load('kraken')
+    assert fresh and list(entry['markets']) == ['ETH/USDT']
@@ -0,0 +1,91 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from market_data import FLAG_END, RECORD_DTYPE, MarketDataRecorder, MarketDataReplay, meta_path
+from order_book import DELTA, SNAPSHOT, BookUpdate
+
+
+def _updates():
+    return [
+        BookUpdate('binance', 'BTC/USDT', SNAPSHOT, [(99.0, 1.0), (98.0, 2.0)], [(101.0, 1.5)], 7, 1_700_000_000_123),
+        BookUpdate('kraken', 'BTC/USDT', DELTA, [(99.5, 0.5)], [], None, 1_700_000_000_456.5),
+        BookUpdate('binance', 'ETH/USDT', DELTA, [], [], 8, None),
+    ]
+
+
+def _replayed(path):
+    return [update for _, update in MarketDataReplay(path).updates()]
+
+
+def test_round_trip_keeps_venue_timestamps(tmp_path):
+    path = str(tmp_path / 'capture.bin')
+    recorder = MarketDataRecorder(path)
+    for i, update in enumerate(_updates()):
+        recorder.record(update, ts_ns=1_000 + i)
+    recorder.close()
+
+    replayed = _replayed(path)
+    assert [u.timestamp for u in replayed] == [1_700_000_000_123, 1_700_000_000_456.5, None]
+    assert replayed[0].bids == [(99.0, 1.0), (98.0, 2.0)] and replayed[0].asks == [(101.0, 1.5)]
+    assert [u.sequence for u in replayed] == [7, None, 8]
+    assert [u.kind for u in replayed] == [SNAPSHOT, DELTA, DELTA]
+
+
+def test_flushes_only_whole_updates(tmp_path):
+    path = str(tmp_path / 'capture.bin')
+    recorder = MarketDataRecorder(path, flush_every=2)
+    recorder.record(_updates()[0])  # Three records: written together once the update is complete
+    assert os.path.getsize(path) == 3 * RECORD_DTYPE.itemsize
+    with open(meta_path(path)) as f:
+        assert json.load(f)['complete_bytes'] == 3 * RECORD_DTYPE.itemsize
+    recorder.close()
+
+
+def test_reopen_truncates_a_torn_update(tmp_path):
+    path = str(tmp_path / 'capture.bin')
+    recorder = MarketDataRecorder(path)
+    recorder.record(_updates()[0])
+    recorder.close()
+
+    # A crash mid-write: two levels of an update without its last record, plus half a record
+    torn = np.zeros(2, dtype=RECORD_DTYPE)
+    torn['price'] = [1.0, 2.0]
+    torn['flags'] = 0
+    with open(path, 'ab') as f:
+        f.write(torn.tobytes() + b'\0' * 17)
+
+    recorder = MarketDataRecorder(path)
+    assert os.path.getsize(path) == 3 * RECORD_DTYPE.itemsize
+    recorder.record(_updates()[1])
+    recorder.close()
+    replayed = _replayed(path)
+    assert len(replayed) == 2
+    assert replayed[1].bids == [(99.5, 0.5)]
+
+
+def test_reopen_keeps_updates_written_after_the_last_meta(tmp_path):
+    path = str(tmp_path / 'capture.bin')
+    recorder = MarketDataRecorder(path)
+    recorder.record(_updates()[0])
+    recorder.flush()
+    complete = np.zeros(1, dtype=RECORD_DTYPE)
+    complete['flags'] = FLAG_END
+    with open(path, 'ab') as f:  # Written, but the sidecar was never updated
+        f.write(complete.tobytes())
+    recorder = MarketDataRecorder(path)
+    assert os.path.getsize(path) == 4 * RECORD_DTYPE.itemsize
+    recorder.close()
+
+
+def test_other_capture_formats_are_rejected(tmp_path):
+    path = str(tmp_path / 'old.bin')
+    open(path, 'wb').close()
+    with open(meta_path(path), 'w') as f:
+        json.dump({'magic': 'psiquis-l2-v1', 'venues': [], 'symbols': []}, f)
+    with pytest.raises(ValueError):
+        MarketDataReplay(path)
+    with pytest.raises(ValueError):
+        MarketDataRecorder(path)
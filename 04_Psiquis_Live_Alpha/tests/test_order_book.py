@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from order_book import (DELTA, SNAPSHOT, BookFeed, BookSide, BookUpdate, OrderBook, OrderBookManager,
+                        QueueFeed, SequenceGapError)
+
+
+def _snapshot(sequence=1, exchange='ex', symbol='BTC/USDT'):
+    return BookUpdate(exchange, symbol, SNAPSHOT, [[99.0, 1.0], [98.0, 2.0]], [[101.0, 1.0], [102.0, 2.0]],
+                      sequence, None)
+
+
+def _delta(sequence, bids=(), asks=(), exchange='ex', symbol='BTC/USDT'):
+    return BookUpdate(exchange, symbol, DELTA, list(bids), list(asks), sequence, None)
+
+
+def test_book_side_keeps_best_first():
+    bids = BookSide(descending=True)
+    for price, size in ((99.0, 1.0), (100.0, 2.0), (98.0, 3.0)):
+        bids.update(price, size)
+    assert list(bids.levels()) == [(100.0, 2.0), (99.0, 1.0), (98.0, 3.0)]
+    bids.update(100.0, 0)
+    assert bids.best() == (99.0, 1.0)
+    bids.update(99.0, 5.0)
+    assert bids.best() == (99.0, 5.0)
+
+
+def test_book_side_applies_levels_in_order():
+    asks = BookSide(descending=False)
+    asks.update_many([(101.0, 1.0), (100.0, 2.0), (102.0, 3.0), (101.0, 0.0), (100.0, 4.0), (99.0, 0.0)])
+    assert list(asks.levels()) == [(100.0, 4.0), (102.0, 3.0)]
+
+def test_deltas_apply_in_sequence():
+    book = OrderBook('ex', 'BTC/USDT')
+    book.apply_snapshot([[99.0, 1.0]], [[101.0, 1.0]], sequence=10)
+    assert book.apply_delta([[99.5, 1.0]], [[101.0, 0]], sequence=11)
+    assert book.best_bid() == (99.5, 1.0)
+    assert book.best_ask() is None
+    assert book.apply_delta([], [[100.5, 1.0]], sequence=11) is False  # Duplicate
+    with pytest.raises(SequenceGapError):
+        book.apply_delta([], [], sequence=13)
+    assert not book.in_sync
+
+
+def test_deltas_respect_max_depth():
+    book = OrderBook('ex', 'BTC/USDT', max_depth=2)
+    book.apply_snapshot([[99.0, 1.0], [98.0, 1.0], [97.0, 1.0]], [[101.0, 1.0]])
+    assert len(book.bids) == 2
+    book.apply_delta([[99.5, 1.0], [99.2, 1.0]], [[100.5, 1.0], [100.8, 1.0], [100.9, 1.0]])
+    assert list(book.bids.levels()) == [(99.5, 1.0), (99.2, 1.0)]
+    assert list(book.asks.levels()) == [(100.5, 1.0), (100.8, 1.0)]
+
+
+def test_gap_requests_one_resync_until_snapshot():
+    manager = OrderBookManager()
+    manager.apply(_snapshot(sequence=1))
+    assert manager.apply(_delta(3)) is None
+    assert manager.gaps == 1
+    assert manager.resync_due('ex', 'BTC/USDT')
+
+    for sequence in range(4, 10):
+        assert manager.apply(_delta(sequence, bids=[[99.9, 1.0]])) is None
+        assert not manager.resync_due('ex', 'BTC/USDT')
+    assert manager.gaps == 1
+    assert manager.get('ex', 'BTC/USDT') is None
+
+    assert manager.apply(_snapshot(sequence=20)) is not None
+    assert manager.apply(_delta(21, bids=[[99.5, 1.0]])) is not None
+    assert manager.get('ex', 'BTC/USDT').best_bid() == (99.5, 1.0)
+
+
+def test_duplicates_do_not_resync():
+    manager = OrderBookManager()
+    manager.apply(_snapshot(sequence=5))
+    assert manager.apply(_delta(5)) is None
+    assert not manager.resync_due('ex', 'BTC/USDT')
+
+
+def test_consume_resyncs_once_per_gap():
+    class RecordingFeed(QueueFeed):
+        def __init__(self):
+            super().__init__()
+            self.resyncs = []
+
+        async def resync(self, exchange, symbol):
+            self.resyncs.append((exchange, symbol))
+
+    async def run():
+        manager = OrderBookManager()
+        feed = RecordingFeed()
+        for update in [_snapshot(sequence=1), _delta(2), _delta(5), _delta(6), _delta(7), None]:
+            feed.push(update)
+        await manager.consume(feed)
+        return manager, feed
+
+    manager, feed = asyncio.run(run())
+    assert feed.resyncs == [('ex', 'BTC/USDT')]
+    assert manager.gaps == 1
+
+
+def test_book_feed_is_abstract():
+    with pytest.raises(TypeError):
+        BookFeed()
+
+
+def test_unchanged_snapshot_keeps_version():
+    manager = OrderBookManager()
+    book = manager.apply(_snapshot(sequence=None))
+    version = book.version
+    assert manager.apply(_snapshot(sequence=None)) is None
+    assert book.version == version
+    changed = BookUpdate('ex', 'BTC/USDT', SNAPSHOT, [[99.0, 1.5]], [[101.0, 1.0]], None, None)
+    assert manager.apply(changed) is book
+    assert book.version == version + 1
+
+
+def test_wait_for_change_ends_with_the_feeds():
+    async def run():
+        manager = OrderBookManager()
+        feed = QueueFeed()
+        task = asyncio.create_task(manager.consume(feed))
+        feed.push(_snapshot())
+        assert await manager.wait_for_change() is True
+        feed.push(None)
+        result = await asyncio.wait_for(manager.wait_for_change(), timeout=1.0)
+        await task
+        return result
+
+    assert asyncio.run(run()) is False
@@ -0,0 +1,89 @@
+import random
+
+import numpy as np
+import pytest
+
+from order_book import OrderBook
+from pricing import DepthCurve, DepthCurveCache, VenuePriceIndex, optimal_size, walk_price
+
+
+def _book(rng, mid=100.0, levels=20):
+    book = OrderBook('test', 'BTC/USDT')
+    book.apply_snapshot(
+        [[mid - 0.5 - i * 0.1, rng.uniform(0.1, 2.0)] for i in range(levels)],
+        [[mid + 0.5 + i * 0.1, rng.uniform(0.1, 2.0)] for i in range(levels)],
+    )
+    return book
+
+
+def test_walk_price_matches_depth_curve():
+    rng = random.Random(1)
+    for _ in range(50):
+        book = _book(rng)
+        for side in ('bids', 'asks'):
+            curve = DepthCurve.from_side(book.side(side))
+            for amount in (1.0, 50.0, 500.0, 2000.0, 10_000.0):
+                expected = curve.weighted_price(amount)
+                got = walk_price(book.side(side), amount)
+                if expected is None:
+                    assert got is None
+                else:
+                    assert got == pytest.approx(expected, rel=1e-12)
+
+
+def test_walk_price_single_level_and_exhaustion():
+    book = OrderBook('test', 'BTC/USDT')
+    book.apply_snapshot([[99.0, 1.0], [98.0, 1.0]], [[101.0, 1.0], [102.0, 1.0]])
+    assert walk_price(book.asks, 50.5) == 101.0
+    assert walk_price(book.asks, 101.0 + 51.0) == pytest.approx(152.0 / 1.5)
+    assert walk_price(book.bids, 99.0 + 98.0) == pytest.approx(98.5)
+    assert walk_price(book.asks, 1_000.0) is None
+    assert walk_price(book.asks, 0) is None
+    assert walk_price(OrderBook('test', 'X').bids, 10.0) is None
+
+
+def test_depth_curve_batch_prices():
+    curve = DepthCurve.from_levels([[100.0, 1.0], [110.0, 1.0]])
+    prices = curve.weighted_prices([50.0, 100.0, 155.0, 210.0, 500.0])
+    np.testing.assert_allclose(prices[:4], [100.0, 100.0, 155.0 / 1.5, 105.0])
+    assert np.isnan(prices[4])
+    assert curve.total_notional == 210.0
+    assert curve.total_qty == 2.0
+
+
+def test_depth_curve_cache_rebuilds_on_new_version():
+    book = _book(random.Random(2))
+    cache = DepthCurveCache()
+    first = cache.get(book, 'asks')
+    assert cache.get(book, 'asks') is first
+    book.apply_delta([], [[100.5, 5.0]], sequence=None)
+    assert cache.get(book, 'asks') is not first
+
+
+def test_optimal_size_finds_profitable_amount():
+    cheap = DepthCurve.from_levels([[100.0, 1.0], [101.0, 10.0]])
+    rich = DepthCurve.from_levels([[103.0, 1.0], [102.0, 10.0]])
+    best = optimal_size(cheap, rich, [50.0, 100.0, 500.0], fee_rate=0.001)
+    assert best is not None and best[0] in (100.0, 500.0)
+    assert optimal_size(rich, cheap, [50.0], fee_rate=0.001) is None
+
+
+def test_venue_price_index_ranks_and_reprices_on_change():
+    rng = random.Random(4)
+    books = {name: _book(rng, mid) for name, mid in (('a', 100.0), ('b', 101.0), ('c', 99.0))}
+    index = VenuePriceIndex()
+    for name, book in books.items():
+        index.update(name, book, 50.0)
+    buys, sells = index.best(books)
+    assert [venue for _, venue in buys] == ['c', 'a']
+    assert [venue for _, venue in sells] == ['b', 'a']
+
+    books['a'].apply_delta([[102.0, 5.0]], [[98.0, 5.0]])
+    assert index.update('a', books['a'], 50.0) == (98.0, 102.0)
+    buys, sells = index.best(books)
+    assert buys[0] == (98.0, 'a') and sells[0] == (102.0, 'a')
+    # Venues outside `venues` are skipped, and a missing side drops out
+    index.set('b', None, 103.0)
+    buys, sells = index.best({'b', 'c'}, count=3)
+    assert [venue for _, venue in buys] == ['c'] and sells[0] == (103.0, 'b')
+    assert len(index.buys) == 2 and len(index.sells) == 3
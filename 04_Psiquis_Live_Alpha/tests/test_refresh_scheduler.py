@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+import scheduler
+from scheduler import Backoff, RefreshScheduler, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler.time, 'monotonic', clock)
+    return clock
+
+
+def test_token_bucket_refills_at_rate(clock):
+    bucket = TokenBucket(rate=4, capacity=2)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.delay() == pytest.approx(0.25)
+    clock.now += 0.125
+    assert not bucket.try_acquire()
+    clock.now += 0.125
+    assert bucket.try_acquire()
+    clock.now += 10
+    bucket._refill()
+    assert bucket.tokens == 2  # Capped at the burst size
+
+
+def test_backoff_grows_and_resets(clock, monkeypatch):
+    monkeypatch.setattr(scheduler.random, 'uniform', lambda low, high: high)
+    backoff = Backoff(base=0.25, cap=1.0)
+    assert backoff.failure() == 0.5
+    assert backoff.failure() == 1.0
+    assert backoff.failure() == 1.0  # Capped
+    assert backoff.resume_at == clock.now + 1.0
+    backoff.success()
+    assert backoff.failures == 0 and backoff.resume_at == 0.0
+
+
+def test_register_uses_exchange_rate_limit():
+    class Exchange:
+        rateLimit = 50  # ms per request
+
+    refresh = RefreshScheduler(headroom=0.5)
+    refresh.register('venue', Exchange())
+    refresh.register('fallback')
+    refresh.register('explicit', rate=3)
+    assert refresh.buckets['venue'].rate == pytest.approx(10.0)
+    assert refresh.buckets['fallback'].rate == pytest.approx(0.5)
+    assert refresh.buckets['explicit'].rate == 3
+
+
+def test_acquire_counts_requests_and_failures():
+    refresh = RefreshScheduler()
+    refresh.register('venue', rate=1000, burst=5)
+
+    async def run():
+        for _ in range(3):
+            await refresh.acquire('venue')
+
+    asyncio.run(run())
+    assert refresh.requests['venue'] == 3
+    refresh.failure('venue')
+    assert refresh.errors['venue'] == 1
+    refresh.success('venue')
+    assert refresh.backoffs['venue'].failures == 0